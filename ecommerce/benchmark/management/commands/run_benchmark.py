@@ -0,0 +1,73 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from benchmark.scenarios import (
+    SCENARIOS,
+    compare,
+    describe_environment,
+    run_http,
+    run_in_process,
+)
+
+
+class Command(BaseCommand):
+    """Django command to run the API benchmark scenarios and report JSON."""
+
+    help = (
+        "Run the scripted scenarios (browse by category, filter by price and "
+        "rating, product detail, place order, order history) against data from "
+        "seed_benchmark_data, through the Django test client or, with "
+        "--base-url, over HTTP against a running server. Prints throughput, "
+        "p50/p95/p99 latency and query counts as JSON; --baseline compares "
+        "with an earlier result file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=list(SCENARIOS),
+            help="Scenario to run (repeatable, default: all).",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--base-url", help="e.g. http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--output", help="Also write the JSON result here.")
+        parser.add_argument("--baseline", help="Earlier result file to compare with.")
+
+    def handle(self, *args, **options):
+        names = options["scenarios"] or list(SCENARIOS)
+        mode = "http" if options["base_url"] else "in-process"
+        result = {"environment": describe_environment(mode, options["seed"])}
+        try:
+            if options["base_url"]:
+                scenarios = run_http(
+                    names,
+                    options["base_url"],
+                    options["concurrency"],
+                    options["duration"],
+                    options["seed"],
+                )
+            else:
+                scenarios = run_in_process(
+                    names, options["requests"], options["warmup"], options["seed"]
+                )
+        except ValueError as exc:
+            raise CommandError(exc)
+        result["scenarios"] = scenarios
+
+        encoded = json.dumps(result, indent=2)
+        self.stdout.write(encoded)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(encoded + "\n")
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as file:
+                baseline = json.load(file)
+            # The comparison goes to stderr so stdout stays valid JSON.
+            for name, metric, old, new, change in compare(result, baseline):
+                self.stderr.write(f"{name} {metric}: {old} -> {new} ({change:+.1f}%)")
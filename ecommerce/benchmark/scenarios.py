@@ -0,0 +1,259 @@
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from urllib.parse import urlencode
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from ecommerce import loadtest
+from ecommerce.loadtest import percentile
+from order.models import Order
+from product.cache import get_cache
+from product.models import Category, Product
+from .seed import SKU_PREFIX
+
+""" Scripted API scenarios, run in-process or over HTTP, reported as JSON """
+
+
+# Issued by the atomic blocks nested in the run's own transaction.
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class Rollback(Exception):
+    pass
+
+
+class ScenarioData:
+    """Ids, names and tokens the scenarios draw their requests from."""
+
+    def __init__(self):
+        self.product_ids = list(
+            Product.objects.filter(sku__startswith=SKU_PREFIX)
+            .order_by("id")
+            .values_list("pk", flat=True)
+        )
+        self.category_names = list(
+            Category.objects.filter(level__gte=1)
+            .order_by("id")
+            .values_list("name", flat=True)
+        )
+        self.tokens = list(
+            Token.objects.filter(user__email__startswith="bench-")
+            .order_by("user_id")
+            .values_list("key", flat=True)
+        )
+        if not (self.product_ids and self.category_names and self.tokens):
+            raise ValueError("No benchmark data; run seed_benchmark_data first.")
+
+
+# A scenario returns (method, path, JSON body or None, token or None).
+
+
+def browse_category(rng, data):
+    query = {"category": rng.choice(data.category_names), "ordering": "price"}
+    return "GET", f"/api/products/?{urlencode(query)}", None, None
+
+
+def filter_price_rating(rng, data):
+    low = rng.choice([10, 20, 50, 100, 200])
+    query = {
+        "price_min": low,
+        "price_max": low * 2,
+        "average_rating_min": rng.choice([3, 4, 4.5]),
+        "ordering": "-average_rating",
+    }
+    return "GET", f"/api/products/?{urlencode(query)}", None, None
+
+
+def product_detail(rng, data):
+    return "GET", f"/api/products/{rng.choice(data.product_ids)}/", None, None
+
+
+def place_order(rng, data):
+    items = [
+        {"product": product_id, "quantity": rng.randint(1, 2)}
+        for product_id in rng.sample(data.product_ids, rng.randint(1, 3))
+    ]
+    return "POST", "/api/orders/", {"items": items}, rng.choice(data.tokens)
+
+
+def order_history(rng, data):
+    return "GET", "/api/orders/", None, rng.choice(data.tokens)
+
+
+SCENARIOS = {
+    "browse_category": browse_category,
+    "filter_price_rating": filter_price_rating,
+    "product_detail": product_detail,
+    "place_order": place_order,
+    "order_history": order_history,
+}
+# Writes cannot be undone on a live server, so runs would stop being comparable.
+HTTP_SCENARIOS = [
+    "browse_category",
+    "filter_price_rating",
+    "product_detail",
+    "order_history",
+]
+
+
+def summarize(latencies, elapsed, statuses, queries=None):
+    summary = {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+    }
+    for name, fraction in [("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)]:
+        value = percentile(latencies, fraction)
+        summary[name] = None if value is None else round(value * 1000, 2)
+    if queries:
+        summary["mean_queries"] = round(sum(queries) / len(queries), 2)
+        summary["max_queries"] = max(queries)
+    summary["statuses"] = {str(status): count for status, count in statuses.items()}
+    return summary
+
+
+def run_in_process(names, requests=500, warmup=20, seed=0):
+    """
+    Run each scenario through the Django test client, one request at a time.
+
+    Caches are cleared before and after the run and every write is rolled
+    back at the end, so the same seed replays the same requests against the
+    same data. The on_commit hooks a request queues (cache version bumps,
+    token invalidation) are run as part of that request, and the savepoints
+    standing in for its transactions are left out of the query counts.
+    """
+    data = ScenarioData()
+    client = Client()
+    results = {}
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        get_cache().clear()
+        try:
+            with transaction.atomic():
+                hooks = len(connection.run_on_commit)
+                for name in names:
+                    rng = random.Random(f"{seed}:{name}")
+                    specs = [
+                        SCENARIOS[name](rng, data) for _ in range(warmup + requests)
+                    ]
+                    for spec in specs[:warmup]:
+                        send(client, *spec)
+                        run_commit_hooks(hooks)
+                    latencies, queries, statuses = [], [], Counter()
+                    started = time.perf_counter()
+                    for spec in specs[warmup:]:
+                        with CaptureQueriesContext(connection) as captured:
+                            request_started = time.perf_counter()
+                            status = send(client, *spec)
+                            run_commit_hooks(hooks)
+                            latencies.append(time.perf_counter() - request_started)
+                        queries.append(count_queries(captured))
+                        statuses[status] += 1
+                    elapsed = time.perf_counter() - started
+                    results[name] = summarize(latencies, elapsed, statuses, queries)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            # Entries cached during the run describe rows that were rolled back.
+            get_cache().clear()
+    return results
+
+
+def run_commit_hooks(start):
+    """Run and drop the on_commit callbacks queued after the first `start`."""
+    while len(connection.run_on_commit) > start:
+        hooks = connection.run_on_commit[start:]
+        del connection.run_on_commit[start:]
+        for _, callback, _ in hooks:
+            callback()
+
+
+def count_queries(captured):
+    return sum(
+        1
+        for query in captured.captured_queries
+        if not query["sql"].startswith(SAVEPOINT_STATEMENTS)
+    )
+
+
+def send(client, method, path, body, token):
+    headers = {"Authorization": f"Token {token}"} if token else {}
+    if method == "POST":
+        response = client.post(
+            path, json.dumps(body), content_type="application/json", headers=headers
+        )
+    else:
+        response = client.get(path, headers=headers)
+    return response.status_code
+
+
+def run_http(names, base_url, concurrency=50, duration=10.0, seed=0, urls=200):
+    """Drive a running server with `ecommerce.loadtest`, one scenario at a time."""
+    data = ScenarioData()
+    results = {}
+    for name in names:
+        if name not in HTTP_SCENARIOS:
+            results[name] = {"skipped": "writes only run in-process"}
+            continue
+        rng = random.Random(f"{seed}:{name}")
+        specs = [SCENARIOS[name](rng, data) for _ in range(urls)]
+        # The driver sends the same headers on every request: one user per run.
+        token = specs[0][3]
+        results[name] = asyncio.run(
+            loadtest.run(
+                [base_url.rstrip("/") + path for _, path, _, _ in specs],
+                concurrency=concurrency,
+                duration=duration,
+                headers={"Authorization": f"Token {token}"} if token else None,
+            )
+        )
+    return results
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def describe_environment(mode, seed):
+    return {
+        "commit": get_commit(),
+        "mode": mode,
+        "seed": seed,
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "rows": {
+            "products": Product.objects.count(),
+            "orders": Order.objects.count(),
+        },
+    }
+
+
+def compare(current, baseline):
+    """Yield `(scenario, metric, baseline, current, change %)` for shared results."""
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name, {})
+        for metric in ["requests_per_second", "p95_ms", "mean_queries"]:
+            old, new = previous.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            yield name, metric, old, new, round(change, 1)
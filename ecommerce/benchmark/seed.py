@@ -0,0 +1,231 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from order.models import Order, OrderItem
+from product.models import Brand, Category, Comment, Product
+from product.search import refresh_search_vectors
+
+""" Deterministic bulk seeding of benchmark data at realistic volumes """
+
+# At --scale 1.
+VOLUMES = {
+    "users": 20_000,
+    "brands": 500,
+    "products": 100_000,
+    "comments": 1_000_000,
+    "orders": 200_000,
+}
+# Children per node on each of the five category levels: 8 roots, 1,648 nodes.
+CATEGORY_FANOUT = (8, 5, 4, 3, 2)
+# Users that get an API token, for the authenticated scenarios.
+TOKEN_USERS = 100
+
+EMAIL = "bench-{}@example.com"
+PASSWORD = "benchmark-password"
+SKU_PREFIX = "BENCH-"
+ADJECTIVES = ["Compact", "Classic", "Wireless", "Smart", "Premium", "Eco", "Pro"]
+NOUNS = ["Phone", "Laptop", "Chair", "Lamp", "Speaker", "Watch", "Camera", "Desk"]
+RATING_WEIGHTS = [5, 5, 15, 35, 40]
+STATUS_WEIGHTS = {
+    Order.StatusChoices.PENDING: 10,
+    Order.StatusChoices.PREPARING: 20,
+    Order.StatusChoices.RECIEVED: 70,
+}
+
+
+def is_seeded():
+    return get_user_model().objects.filter(email=EMAIL.format(0)).exists()
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class Seeder:
+    """
+    Bulk-inserts users, a five-level category tree, brands, products,
+    comments and orders with their items.
+
+    The same `seed` and `scale` always produce the same rows, so results
+    measured on different commits are comparable. Product popularity is
+    skewed: a few products get most comments and order lines.
+    """
+
+    def __init__(self, scale=1.0, seed=0, batch_size=5000, log=None):
+        self.volumes = {
+            name: max(int(count * scale), 1) for name, count in VOLUMES.items()
+        }
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+
+    def run(self):
+        """Seed everything; return the seconds each step took."""
+        timings = {}
+        for step in ["users", "categories", "brands", "products", "comments", "orders"]:
+            started = time.perf_counter()
+            with transaction.atomic():
+                count = getattr(self, f"seed_{step}")()
+            timings[step] = round(time.perf_counter() - started, 2)
+            self.log(f"{step}: {count:,} rows in {timings[step]} s")
+        return timings
+
+    def seed_users(self):
+        password = make_password(PASSWORD)
+        self.user_ids = []
+        for batch in chunks(range(self.volumes["users"]), self.batch_size):
+            users = get_user_model().objects.bulk_create(
+                get_user_model()(
+                    email=EMAIL.format(index), name=f"User {index}", password=password
+                )
+                for index in batch
+            )
+            self.user_ids += [user.pk for user in users]
+        Token.objects.bulk_create(
+            Token(user_id=user_id, key=f"{self.random.getrandbits(160):040x}")
+            for user_id in self.user_ids[:TOKEN_USERS]
+        )
+        return len(self.user_ids)
+
+    def seed_categories(self):
+        # Created a level at a time with placeholder tree fields, then rebuilt.
+        level = [(None, "Category ")]
+        total = 0
+        for fanout in CATEGORY_FANOUT:
+            categories = Category.objects.bulk_create(
+                Category(
+                    name=f"{prefix}{index + 1}",
+                    parent_id=parent_id,
+                    tree_id=0,
+                    lft=0,
+                    rght=0,
+                    level=0,
+                )
+                for parent_id, prefix in level
+                for index in range(fanout)
+            )
+            # "Category 3" is the parent of "Category 3.1".
+            level = [(category.pk, f"{category.name}.") for category in categories]
+            total += len(categories)
+        Category.objects.rebuild()
+        Category.objects.update(updated_at=Now())
+        self.leaf_category_ids = [pk for pk, _ in level]
+        return total
+
+    def seed_brands(self):
+        brands = Brand.objects.bulk_create(
+            Brand(name=f"Brand {index}") for index in range(self.volumes["brands"])
+        )
+        self.brand_ids = [brand.pk for brand in brands]
+        return len(brands)
+
+    def make_product(self, index):
+        rng = self.random
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {index}"
+        price = Decimal(round(rng.lognormvariate(4, 1), 2)).quantize(Decimal("0.01"))
+        # One in ten products has tracked stock.
+        stock = rng.randint(0, 500) if rng.random() < 0.1 else None
+        return Product(
+            sku=f"{SKU_PREFIX}{index:07d}",
+            name=name,
+            description=f"{name} by a benchmark brand. " * rng.randint(1, 5),
+            price=min(price, Decimal("99999.99")),
+            stock_quantity=stock,
+            in_stock=stock is None or stock > 0,
+            brand_id=rng.choice(self.brand_ids),
+            category_id=rng.choice(self.leaf_category_ids),
+        )
+
+    def seed_products(self):
+        self.product_ids, self.prices = [], []
+        for batch in chunks(range(self.volumes["products"]), self.batch_size):
+            products = Product.objects.bulk_create(
+                self.make_product(index) for index in batch
+            )
+            self.product_ids += [product.pk for product in products]
+            self.prices += [product.price for product in products]
+        refresh_search_vectors(Product.objects.filter(sku__startswith=SKU_PREFIX))
+        # Popularity follows a Pareto distribution.
+        self.popularity = list(
+            accumulate(self.random.paretovariate(1.2) for _ in self.product_ids)
+        )
+        return len(self.product_ids)
+
+    def seed_comments(self):
+        total_weight = self.popularity[-1]
+        users = len(self.user_ids)
+        comments, total, previous = [], 0, 0.0
+        for index, product_id in enumerate(self.product_ids):
+            weight = self.popularity[index] - previous
+            previous = self.popularity[index]
+            count = min(round(self.volumes["comments"] * weight / total_weight), users)
+            # One comment per user and product.
+            for user_index in self.random.sample(range(users), count):
+                comments.append(
+                    Comment(
+                        product_id=product_id,
+                        user_id=self.user_ids[user_index],
+                        rating=self.random.choices(range(1, 6), RATING_WEIGHTS)[0],
+                        comment_text="Benchmark review.",
+                    )
+                )
+            if len(comments) >= self.batch_size:
+                Comment.objects.bulk_create(comments)
+                total += len(comments)
+                comments = []
+        Comment.objects.bulk_create(comments)
+        return total + len(comments)
+
+    def seed_orders(self):
+        rng = self.random
+        now = timezone.now()
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        total = 0
+        for batch in chunks(range(self.volumes["orders"]), self.batch_size):
+            orders, lines = [], []
+            for _ in batch:
+                order = Order(
+                    user_id=rng.choice(self.user_ids),
+                    status=rng.choices(statuses, weights)[0],
+                )
+                picked = rng.choices(
+                    range(len(self.product_ids)),
+                    cum_weights=self.popularity,
+                    k=rng.randint(1, 4),
+                )
+                items = [
+                    OrderItem(
+                        order=order,
+                        product_id=self.product_ids[index],
+                        quantity=rng.randint(1, 3),
+                        unit_price=self.prices[index],
+                    )
+                    for index in picked
+                ]
+                for item in items:
+                    item.line_total = item.unit_price * item.quantity
+                order.calculate_total_price(items)
+                orders.append(order)
+                lines += items
+            Order.objects.bulk_create(orders)
+            # created_at is auto_now_add; spread orders over the last year.
+            for order in orders:
+                order.created_at = order.updated_at = now - timedelta(
+                    seconds=rng.randint(0, 365 * 24 * 3600)
+                )
+            Order.objects.bulk_update(orders, ["created_at", "updated_at"])
+            for item in lines:
+                item.order_id = item.order.pk
+            OrderItem.objects.bulk_create(lines)
+            total += len(orders)
+        return total
@@ -0,0 +1,83 @@
+import io
+import json
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from order.models import Order
+from product.cache import get_cache
+from product.models import Category, Comment, Product
+from ..scenarios import SCENARIOS, compare, run_in_process
+from ..seed import CATEGORY_FANOUT, Seeder
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(scale=0.001, seed=1).run()
+
+    def test_seeded_volumes(self):
+        self.assertEqual(Product.objects.count(), 100)
+        self.assertEqual(Order.objects.count(), 200)
+        self.assertGreater(Comment.objects.count(), 0)
+        self.assertEqual(
+            Category.objects.order_by("-level").values_list("level", flat=True)[0],
+            len(CATEGORY_FANOUT) - 1,
+        )
+        # Tree fields were rebuilt and ratings aggregated.
+        leaf = Category.objects.filter(level=4).first()
+        self.assertEqual(leaf.get_ancestors().count(), 4)
+        product = Product.objects.filter(rating_count__gt=0).first()
+        self.assertEqual(product.comments.count(), product.rating_count)
+        order = Order.objects.prefetch_related("items").first()
+        self.assertEqual(
+            order.total_price, sum(item.line_total for item in order.items.all())
+        )
+
+    def test_scenarios_run_and_roll_back(self):
+        orders = Order.objects.count()
+
+        results = run_in_process(list(SCENARIOS), requests=5, warmup=1)
+
+        self.assertEqual(set(results), set(SCENARIOS))
+        for result in results.values():
+            self.assertEqual(result["requests"], 5)
+            self.assertTrue(
+                all(status.startswith("2") for status in result["statuses"])
+            )
+            self.assertGreaterEqual(result["p99_ms"], result["p50_ms"])
+        self.assertEqual(Order.objects.count(), orders)
+
+    def test_run_settles_commit_hooks_and_cache(self):
+        cache = get_cache()
+        hooks = len(connection.run_on_commit)
+
+        with mock.patch.object(cache, "clear", wraps=cache.clear) as clear:
+            results = run_in_process(["place_order"], requests=3, warmup=0)
+            # Hooks the orders queued ran rather than waiting on the rollback.
+            self.assertEqual(len(connection.run_on_commit), hooks)
+
+        self.assertEqual(clear.call_count, 2)
+        self.assertEqual(results["place_order"]["statuses"], {"201": 3})
+
+    def test_command_writes_json_and_compares(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "run_benchmark",
+            scenario=["product_detail"],
+            requests=3,
+            warmup=0,
+            stdout=out,
+            stderr=err,
+        )
+        result = json.loads(out.getvalue())
+
+        self.assertEqual(result["environment"]["mode"], "in-process")
+        self.assertEqual(result["scenarios"]["product_detail"]["requests"], 3)
+        baseline = {"scenarios": {"product_detail": {"mean_queries": 100}}}
+        changes = list(compare(result, baseline))
+        self.assertEqual(changes[0][:3], ("product_detail", "mean_queries", 100))
+
+    def test_seeding_twice_is_refused(self):
+        with self.assertRaisesMessage(CommandError, "already seeded"):
+            call_command("seed_benchmark_data", stdout=io.StringIO())
@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+# Serve the catalogue read endpoints as async views (see ecommerce/viewsets.py).
+# Set before the settings are imported, since they read it at import time.
+os.environ.setdefault('ASYNC_READ_VIEWS', 'true')
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+from django.core.asgi import get_asgi_application  # noqa: E402
+from ecommerce.settings import base  # noqa: E402
+
+if base.DEBUG:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings.dev')
+else:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings.prod')
 
 application = get_asgi_application()
@@ -0,0 +1,141 @@
+"""
+Closed-loop HTTP load driver.
+
+    python -m ecommerce.loadtest http://127.0.0.1:8000/api/products/ \
+        --concurrency 200 --duration 20 --slow-send 0.2
+
+Every client keeps one keep-alive connection and requests the URLs round-robin.
+`--slow-send` trickles each request out in two halves to mimic slow mobile
+clients, which hold a worker thread on a sync server but not on an event loop.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from itertools import cycle
+from urllib.parse import urlsplit
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return values[index]
+
+
+class Client:
+    def __init__(self, urls, headers, slow_send):
+        self.urls = cycle(urls)
+        self.headers = headers
+        self.slow_send = slow_send
+        self.connection = None
+
+    async def connect(self, url):
+        if self.connection is None:
+            self.connection = await asyncio.open_connection(
+                url.hostname, url.port or 80
+            )
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection[1].close()
+            self.connection = None
+
+    async def read_body(self, reader, headers):
+        if headers.get("transfer-encoding") == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    return body
+                body += chunk[:-2]
+        return await reader.readexactly(int(headers.get("content-length", 0)))
+
+    async def request(self):
+        url = urlsplit(next(self.urls))
+        reader, writer = await self.connect(url)
+        path = url.path + (f"?{url.query}" if url.query else "")
+        lines = [f"GET {path} HTTP/1.1", f"Host: {url.netloc}"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+        started = time.perf_counter()
+        if self.slow_send:
+            writer.write(raw[: len(raw) // 2])
+            await writer.drain()
+            await asyncio.sleep(self.slow_send)
+            raw = raw[len(raw) // 2 :]
+        writer.write(raw)
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        await self.read_body(reader, headers)
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, time.perf_counter() - started
+
+
+async def run_client(client, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        try:
+            status, latency = await client.request()
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as exc:
+            client.close()
+            statuses[type(exc).__name__] += 1
+            continue
+        statuses[status] += 1
+        latencies.append(latency)
+    client.close()
+
+
+async def run(urls, concurrency=50, duration=10.0, headers=None, slow_send=0.0):
+    """Return requests/second, latency percentiles (ms) and status counts."""
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            run_client(
+                Client(urls, headers or {}, slow_send), deadline, latencies, statuses
+            )
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Closed-loop HTTP load driver.")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--slow-send", type=float, default=0.0)
+    parser.add_argument("--token", help="Send `Authorization: Token <token>`.")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Token {args.token}"} if args.token else {}
+    result = asyncio.run(
+        run(args.urls, args.concurrency, args.duration, headers, args.slow_send)
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+import atexit
+import fcntl
+import hmac
+import heapq
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from glob import glob
+from itertools import count
+from threading import Lock
+from uuid import uuid4
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+""" Per-route request metrics in Prometheus text format, and a slow request log """
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# With METRICS_DIR, how often a process writes its totals there.
+FLUSH_SECONDS = 1.0
+ARCHIVE_NAME = "archive.json"
+
+logger = logging.getLogger("ecommerce.slow_requests")
+
+# The stats of the request being handled, if any; follows it into
+# sync_to_async threads.
+current_stats = ContextVar("current_stats", default=None)
+
+
+class RequestStats:
+    """SQL, serializer and encoding timings of one request, plus its slowest SQL."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serialize_action = None
+        self.serializing = False
+        self.encode_time = 0.0
+        self.encode_started = None
+        self.slowest = []
+        self.order = count()
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        entry = (duration, next(self.order), sql)
+        if len(self.slowest) < settings.SLOW_REQUEST_MAX_QUERIES:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def start_encode(self):
+        self.encode_started = time.perf_counter()
+
+    def finish_encode(self, response):
+        if self.encode_started is not None:
+            self.encode_time += time.perf_counter() - self.encode_started
+
+
+@contextmanager
+def measure_serialization(action):
+    """Count the block as serializer time of the current request's `action`."""
+    stats = current_stats.get()
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    stats.serialize_action = action
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_time += time.perf_counter() - started
+        stats.serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+
+def install(connection):
+    # Outermost, so `connection.execute_wrapper()` blocks still pop their own.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@receiver(connection_created)
+def install_on_connect(sender, connection, **kwargs):
+    install(connection)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def merge(self, counts, total):
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, counts)]
+        self.sum += total
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += bucket_count
+            yield f"{name}_bucket", {**labels, "le": str(bound)}, cumulative
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, cumulative
+
+
+LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def labels(route, method, **extra):
+    return {"route": route, "method": method, **extra}
+
+
+def format_labels(labels):
+    escaped = (
+        f'{name}="{str(value).translate(LABEL_ESCAPES)}"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(path, snapshot):
+    # Readers only ever see a complete file.
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(snapshot, file)
+    os.replace(temporary, path)
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms keyed by route and method.
+
+    Each process counts its own requests. With `METRICS_DIR` set, every
+    process also writes its totals there (at most once per `FLUSH_SECONDS`,
+    and before answering a scrape), and `/metrics` adds up all the files,
+    so whichever worker is scraped reports the totals of the whole server.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.flush_lock = Lock()
+        self.path = None
+        self.pid = None
+        self.flushed_at = 0.0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = Counter()
+            self.durations = {}
+            self.query_counts = {}
+            self.db_seconds = Counter()
+            # Keyed by route, method and view action.
+            self.serialize_seconds = Counter()
+            self.encode_seconds = Counter()
+
+    def get_histograms(self, key):
+        if key not in self.durations:
+            self.durations[key] = Histogram(DURATION_BUCKETS)
+            self.query_counts[key] = Histogram(QUERY_BUCKETS)
+        return self.durations[key], self.query_counts[key]
+
+    def observe(self, route, method, status, duration, stats):
+        key = (route, method)
+        with self.lock:
+            self.requests[route, method, status] += 1
+            durations, query_counts = self.get_histograms(key)
+            durations.observe(duration)
+            query_counts.observe(stats.queries)
+            self.db_seconds[key] += stats.db_time
+            if stats.serialize_action is not None:
+                self.serialize_seconds[
+                    route, method, stats.serialize_action
+                ] += stats.serialize_time
+            self.encode_seconds[key] += stats.encode_time
+        if settings.METRICS_DIR and time.monotonic() - self.flushed_at >= FLUSH_SECONDS:
+            self.flush(settings.METRICS_DIR)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": [[*key, n] for key, n in self.requests.items()],
+                "histograms": [
+                    [*key, durations.counts, durations.sum]
+                    + [self.query_counts[key].counts, self.query_counts[key].sum]
+                    for key, durations in self.durations.items()
+                ],
+                "db_seconds": [[*key, n] for key, n in self.db_seconds.items()],
+                "serialize_seconds": [
+                    [*key, n] for key, n in self.serialize_seconds.items()
+                ],
+                "encode_seconds": [[*key, n] for key, n in self.encode_seconds.items()],
+            }
+
+    def merge(self, snapshot):
+        with self.lock:
+            for route, method, status, n in snapshot["requests"]:
+                self.requests[route, method, status] += n
+            for route, method, *values in snapshot["histograms"]:
+                durations, query_counts = self.get_histograms((route, method))
+                durations.merge(*values[:2])
+                query_counts.merge(*values[2:])
+            for name in ["db_seconds", "serialize_seconds", "encode_seconds"]:
+                totals = getattr(self, name)
+                for *key, total in snapshot[name]:
+                    totals[tuple(key)] += total
+
+    def flush(self, directory):
+        """Write this process' totals to its own file in `directory`."""
+        with self.flush_lock:
+            if self.pid != os.getpid() or os.path.dirname(self.path) != directory:
+                # A new process, possibly forked after this module was imported.
+                if self.pid is None:
+                    atexit.register(self.flush_at_exit)
+                self.pid = os.getpid()
+                self.path = os.path.join(directory, f"{self.pid}-{uuid4().hex}.json")
+            self.flushed_at = time.monotonic()
+            write_snapshot(self.path, self.snapshot())
+
+    def flush_at_exit(self):
+        # Keeps the requests counted since the last flush of a recycled worker.
+        if settings.METRICS_DIR:
+            self.flush(settings.METRICS_DIR)
+
+    def gather(self):
+        """Return the registry to scrape: this one, or the sum of all processes."""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return self
+        self.flush(directory)
+        compact(directory)
+        total = MetricsRegistry()
+        for path in [os.path.join(directory, ARCHIVE_NAME), *process_files(directory)]:
+            snapshot = read_snapshot(path)
+            if snapshot is not None:
+                total.merge(snapshot)
+        return total
+
+    def collect(self):
+        """Yield `(name, type, help, samples)` families."""
+        with self.lock:
+            yield (
+                "http_requests_total",
+                "counter",
+                "Requests by route, method and status.",
+                [
+                    ("http_requests_total", labels(route, method, status=status), n)
+                    for (route, method, status), n in sorted(self.requests.items())
+                ],
+            )
+            for name, kind, description, histograms in [
+                (
+                    "http_request_duration_seconds",
+                    "histogram",
+                    "Time to produce a response, streaming bodies excluded.",
+                    self.durations,
+                ),
+                (
+                    "http_request_db_queries",
+                    "histogram",
+                    "SQL statements run per request.",
+                    self.query_counts,
+                ),
+            ]:
+                yield name, kind, description, [
+                    sample
+                    for key, histogram in sorted(histograms.items())
+                    for sample in histogram.samples(name, labels(*key))
+                ]
+            for name, description, totals in [
+                (
+                    "http_request_db_seconds_total",
+                    "Time spent in SQL statements.",
+                    self.db_seconds,
+                ),
+                (
+                    "http_request_encode_seconds_total",
+                    "Time spent encoding response bodies after the view returned.",
+                    self.encode_seconds,
+                ),
+            ]:
+                yield name, "counter", description, [
+                    (name, labels(*key), total) for key, total in sorted(totals.items())
+                ]
+            yield (
+                "http_request_serialize_seconds_total",
+                "counter",
+                "Time spent in serializers building response data, by view action "
+                "(includes the SQL they trigger).",
+                [
+                    (
+                        "http_request_serialize_seconds_total",
+                        labels(route, method, action=action),
+                        total,
+                    )
+                    for (route, method, action), total in sorted(
+                        self.serialize_seconds.items()
+                    )
+                ],
+            )
+
+    def render(self):
+        lines = []
+        for name, kind, description, samples in self.collect():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample, sample_labels, value in samples:
+                lines.append(f"{sample}{format_labels(sample_labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def process_files(directory):
+    return glob(os.path.join(directory, "*-*.json"))
+
+
+def compact(directory):
+    """
+    Fold the files of exited processes into the archive file.
+
+    Counters must never go down, so the totals of recycled workers are kept;
+    folding them stops the directory from growing with every restart.
+    """
+    with open(os.path.join(directory, "compact.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        exited = [
+            path
+            for path in process_files(directory)
+            if not is_running(int(os.path.basename(path).split("-")[0]))
+        ]
+        if not exited:
+            return
+        archive = MetricsRegistry()
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        for path in [archive_path, *exited]:
+            snapshot = read_snapshot(path)
+            if snapshot is not None:
+                archive.merge(snapshot)
+        write_snapshot(archive_path, archive.snapshot())
+        for path in exited:
+            os.remove(path)
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL count and time, serializer time and body encoding
+    time per route.
+
+    Routes are URL names such as `product-list` or `order-detail`. Requests
+    slower than `SLOW_REQUEST_MS` are logged as JSON with their slowest SQL
+    statements (without parameters). Put it first in `MIDDLEWARE`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs last of all middleware, right before the response is rendered.
+        stats = current_stats.get()
+        if stats is not None:
+            stats.start_encode()
+            response.add_post_render_callback(stats.finish_encode)
+        return response
+
+    def record(self, request, response, stats, duration):
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        registry.observe(
+            route, request.method, str(response.status_code), duration, stats
+        )
+        if duration * 1000 < settings.SLOW_REQUEST_MS:
+            return
+        logger.warning(
+            "Slow request %s",
+            json.dumps(
+                {
+                    "route": route,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round(duration * 1000, 1),
+                    "db_queries": stats.queries,
+                    "db_ms": round(stats.db_time * 1000, 1),
+                    "serialize_ms": round(stats.serialize_time * 1000, 1),
+                    "encode_ms": round(stats.encode_time * 1000, 1),
+                    "slowest_queries": [
+                        {"ms": round(seconds * 1000, 1), "sql": sql}
+                        for seconds, _, sql in sorted(stats.slowest, reverse=True)
+                    ],
+                }
+            ),
+        )
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; needs `Bearer <METRICS_TOKEN>` when that is set."""
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.gather().render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,172 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import InvalidOperation
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class AdminOffsetPagination(LimitOffsetPagination):
+    limit_query_param = "page_size"
+    max_limit = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Seek pagination over the view's ordering plus an `id` tie-break.
+
+    Unlike DRF's cursor pagination, the cursor stores the values of every
+    ordering column, so pages are fetched with a single indexed
+    `WHERE (a, id) > (x, y)` style query and never fall back to OFFSET.
+    Staff users may pass `?offset=` to jump to an arbitrary row instead.
+    """
+
+    ordering = "id"
+    tie_breaker = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    offset_query_param = "offset"
+    offset_pagination_class = AdminOffsetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        if self.offset_paginator is not None:
+            return self.offset_paginator.paginate_queryset(page_queryset, request, view)
+        return self.paginate_rows(list(page_queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the ordered, filtered and sliced queryset for this page."""
+        self.request = request
+        self.offset_paginator = None
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        if self.offset_query_param in request.query_params and request.user.is_staff:
+            self.offset_paginator = self.offset_pagination_class()
+            self.offset_paginator.default_limit = self.page_size
+            return queryset
+
+        self.cursor = self.decode_cursor(request)
+        self.has_cursor = self.cursor is not None
+        self.reverse = self.has_cursor and self.cursor["r"]
+        if self.has_cursor:
+            try:
+                queryset = queryset.filter(self.seek_filter(self.cursor["p"]))
+            except (ValidationError, ValueError, TypeError, InvalidOperation):
+                # A position the ordering fields cannot hold, e.g. a price of "x".
+                raise NotFound(self.invalid_cursor_message)
+        if self.reverse:
+            queryset = queryset.reverse()
+        return queryset[: self.page_size + 1]
+
+    def paginate_rows(self, rows):
+        """Finish a page from the rows fetched with `get_page_queryset`."""
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.has_cursor, has_more
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        fields = [field.lstrip("-") for field in ordering]
+        if self.tie_breaker not in fields and "pk" not in fields:
+            descending = ordering[0].startswith("-")
+            ordering.append(("-" if descending else "") + self.tie_breaker)
+        return tuple(ordering)
+
+    def seek_filter(self, position):
+        seek = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            after = field.startswith("-") == self.reverse
+            seek |= equal & Q(**{f"{name}__{'gt' if after else 'lt'}": value})
+            equal &= Q(**{name: value})
+        return seek
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, bool, type(None))):
+                value = str(value)
+            position.append(value)
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            valid = (
+                cursor["o"] == list(self.ordering)
+                and isinstance(cursor["p"], list)
+                and len(cursor["p"]) == len(self.ordering)
+                and isinstance(cursor["r"], bool)
+            )
+        except (TypeError, ValueError, KeyError):
+            valid = False
+
+        if not valid:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, position, reverse):
+        cursor = {"o": list(self.ordering), "p": position, "r": reverse}
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, separators=(",", ":")).encode()
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.offset_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Row offset for staff users (disables the cursor).",
+                "schema": {"type": "integer"},
+            }
+        )
+        return parameters
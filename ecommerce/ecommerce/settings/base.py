@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     "user",
     "product",
     "order",
+    "benchmark",
     # External Apps
     "rest_framework",
     "rest_framework.authtoken",
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "ecommerce.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -102,17 +104,82 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "user.User"
 
+AUTHENTICATION_BACKENDS = ["user.backends.PooledModelBackend"]
+
+# The first hasher encodes new passwords; the rest only verify older hashes,
+# which are upgraded on the next successful login.
+_PASSWORD_HASHERS = {
+    "scrypt": "user.hashers.TunedScryptPasswordHasher",
+    "argon2": "user.hashers.TunedArgon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHER = env("PASSWORD_HASHER", default="scrypt")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+PASSWORD_SCRYPT_WORK_FACTOR = env.int("PASSWORD_SCRYPT_WORK_FACTOR", default=2**14)
+PASSWORD_SCRYPT_BLOCK_SIZE = env.int("PASSWORD_SCRYPT_BLOCK_SIZE", default=8)
+PASSWORD_SCRYPT_PARALLELISM = env.int("PASSWORD_SCRYPT_PARALLELISM", default=1)
+PASSWORD_ARGON2_TIME_COST = env.int("PASSWORD_ARGON2_TIME_COST", default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int("PASSWORD_ARGON2_MEMORY_COST", default=19456)
+PASSWORD_ARGON2_PARALLELISM = env.int("PASSWORD_ARGON2_PARALLELISM", default=1)
+
+PASSWORD_HASHING_WORKERS = env.int("PASSWORD_HASHING_WORKERS", default=os.cpu_count())
+PASSWORD_HASHING_MAX_PENDING = env.int("PASSWORD_HASHING_MAX_PENDING", default=32)
+PASSWORD_HASHING_TIMEOUT = env.float("PASSWORD_HASHING_TIMEOUT", default=5.0)
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# ecommerce/asgi.py turns this on: list/retrieve become coroutines.
+ASYNC_READ_VIEWS = env.bool("ASYNC_READ_VIEWS", default=False)
+
+CATALOGUE_CACHE_ALIAS = "default"
+CATALOGUE_CACHE_TIMEOUT = env.int("CATALOGUE_CACHE_TIMEOUT", default=300)
+
+TOKEN_CACHE_ALIAS = "default"
+TOKEN_CACHE_TIMEOUT = env.int("TOKEN_CACHE_TIMEOUT", default=300)
+TOKEN_CACHE_LOCAL_TIMEOUT = env.int("TOKEN_CACHE_LOCAL_TIMEOUT", default=10)
+TOKEN_CACHE_MAX_ENTRIES = env.int("TOKEN_CACHE_MAX_ENTRIES", default=10000)
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Longest side in pixels. Each preset is stored as WebP plus a JPEG (or PNG,
+# for transparent images) fallback.
+PRODUCT_IMAGE_PRESETS = {"thumbnail": 160, "small": 400, "medium": 800, "large": 1600}
+PRODUCT_IMAGE_WEBP_QUALITY = env.int("PRODUCT_IMAGE_WEBP_QUALITY", default=80)
+PRODUCT_IMAGE_JPEG_QUALITY = env.int("PRODUCT_IMAGE_JPEG_QUALITY", default=85)
+# Background threads per process; 0 renders variants inside the request.
+PRODUCT_IMAGE_WORKERS = env.int("PRODUCT_IMAGE_WORKERS", default=2)
+
+# Stock taken by a pending order is released this long after it was placed.
+ORDER_RESERVATION_MINUTES = env.int("ORDER_RESERVATION_MINUTES", default=15)
+
+# Requests slower than this are logged with their slowest SQL statements.
+SLOW_REQUEST_MS = env.int("SLOW_REQUEST_MS", default=500)
+SLOW_REQUEST_MAX_QUERIES = env.int("SLOW_REQUEST_MAX_QUERIES", default=10)
+# When set, /metrics needs an "Authorization: Bearer <token>" header.
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+# A directory every worker of the server can write to. When set, /metrics
+# reports the totals of all workers instead of the one that was scraped.
+METRICS_DIR = env.str("METRICS_DIR", default="")
+
+# Order POSTs with an Idempotency-Key header are replayed for this long.
+IDEMPOTENCY_CACHE_ALIAS = "default"
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=24 * 60 * 60)
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",  # ./manage.py spectacular --file schema.yml
     "DEFAULT_AUTHENTICATION_CLASSES": [
         # "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.CachingTokenAuthentication",
     ],
+    "DEFAULT_PAGINATION_CLASS": "ecommerce.pagination.KeysetPagination",
+    "PAGE_SIZE": env.int("API_PAGE_SIZE", default=20),
 }
 
 SPECTACULAR_SETTINGS = {
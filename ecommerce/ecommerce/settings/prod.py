@@ -2,4 +2,35 @@ from .base import *
 
 DEBUG = False
 
-ALLOWED_HOSTS = ['*']
\ No newline at end of file
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env("DB_NAME"),
+        "USER": env("DB_USER"),
+        "PASSWORD": env("DB_PASSWORD"),
+        "HOST": env("DB_HOST"),
+        "PORT": env("DB_PORT"),
+        # Keep connections open across requests and check them before reuse
+        # instead of reconnecting on every request.
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=600),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "connect_timeout": env.int("DB_CONNECT_TIMEOUT", default=5),
+        },
+    }
+}
+
+# Under ASGI, sync database work runs in a thread per request, and each of
+# those threads would keep its own persistent connection open until the
+# database runs out of them. Close connections after every request instead
+# (put PgBouncer in front to keep connecting cheap).
+if env("SERVER_MODE", default="wsgi") == "asgi":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Behind PgBouncer in transaction pooling mode a connection may be handed to
+# another client between transactions, so named server-side cursors (used by
+# QuerySet.iterator()) cannot survive.
+if env.bool("DB_PGBOUNCER", default=False):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from ecommerce.metrics import metrics_view
 
 from django.conf import settings
 from django.conf.urls.static import static
@@ -13,6 +14,7 @@ urlpatterns = [
     path("api/orders/", include("order.urls")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema")),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,451 @@
+import json
+from functools import update_wrapper
+from hashlib import sha1
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models.fields.files import FieldFile
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import exceptions, serializers
+from rest_framework.filters import OrderingFilter
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+from .metrics import measure_serialization
+
+
+class SerializationTimingMixin:
+    """
+    Times the serializers of `list` and `retrieve` for the request metrics.
+
+    The actions are DRF's own, with `serializer.data` evaluated through
+    `serialize`; other views can call it for their own responses.
+    """
+
+    def serialize(self, serializer):
+        with measure_serialization(self.action):
+            return serializer.data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(self.serialize(serializer))
+        return Response(self.serialize(self.get_serializer(queryset, many=True)))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.serialize(self.get_serializer(self.get_object())))
+
+
+class AsyncReadViewSetMixin(SerializationTimingMixin):
+    """
+    Serves `list` and `retrieve` as coroutines when `ASYNC_READ_VIEWS` is on.
+
+    Authentication, permissions and filtering run in one worker thread, the
+    rows are fetched with the async ORM, and serialization happens on the
+    event loop. Every other action falls back to the regular sync view.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS:
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            if "get" in actions and "head" not in actions:
+                actions["head"] = actions["get"]
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Keeps cls, actions, initkwargs and csrf_exempt for routers and schemas.
+        return update_wrapper(view, sync_view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def get_filtered_queryset(self):
+        # Filters may query the database (e.g. category ranges), so this runs
+        # in a worker thread.
+        return self.filter_queryset(self.get_queryset())
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.get_filtered_queryset)()
+
+        paginator = self.paginator
+        if paginator is not None and not hasattr(paginator, "get_page_queryset"):
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+
+        page_queryset = None
+        if paginator is not None:
+            page_queryset = paginator.get_page_queryset(queryset, request, self)
+        if page_queryset is None:
+            rows = [obj async for obj in queryset]
+            return Response(self.serialize(self.get_serializer(rows, many=True)))
+
+        if paginator.offset_paginator is not None:
+            page = await sync_to_async(paginator.offset_paginator.paginate_queryset)(
+                page_queryset, request, self
+            )
+        else:
+            page = paginator.paginate_rows([obj async for obj in page_queryset])
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(self.serialize(serializer))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.serialize(self.get_serializer(instance)))
+
+    async def aget_object(self):
+        queryset = await sync_to_async(self.get_filtered_queryset)()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+def make_etag(*parts):
+    raw = json.dumps(parts, default=str, separators=(",", ":"))
+    return quote_etag(sha1(raw.encode()).hexdigest())
+
+
+def set_validators(response, etag, last_modified=None):
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """Return the 304 (or 412) the request's preconditions call for, or None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETags for `list` and `retrieve`, plus Last-Modified for `retrieve`.
+
+    Validators hash the `updated_at` stamps of the rows a response is built
+    from. Requests with precondition headers first fetch only those stamps,
+    so a 304 costs one narrow query and no serialization; other requests
+    derive the validators from the rows they load anyway. Lists carry no
+    Last-Modified because deleting a row moves no remaining row's stamp.
+
+    `stamp_fields` adds output fields that change without touching
+    `updated_at` (such as MPTT tree fields, moved by bulk updates) to the
+    ETags; such views send no Last-Modified at all.
+    """
+
+    updated_field = "updated_at"
+    stamp_fields = ()
+    precondition_headers = (
+        "HTTP_IF_MATCH",
+        "HTTP_IF_NONE_MATCH",
+        "HTTP_IF_MODIFIED_SINCE",
+        "HTTP_IF_UNMODIFIED_SINCE",
+    )
+
+    def list(self, request, *args, **kwargs):
+        if self.has_preconditions(request):
+            response = self.check_list_preconditions()
+            if response is not None:
+                return response
+        response = super().list(request, *args, **kwargs)
+        return self.add_list_validators(response)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.has_preconditions(request):
+            response = self.check_detail_preconditions()
+            if response is not None:
+                return response
+        response = super().retrieve(request, *args, **kwargs)
+        return self.add_detail_validators(response)
+
+    async def alist(self, request, *args, **kwargs):
+        if self.has_preconditions(request):
+            response = await sync_to_async(self.check_list_preconditions)()
+            if response is not None:
+                return response
+        response = await super().alist(request, *args, **kwargs)
+        return self.add_list_validators(response)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        if self.has_preconditions(request):
+            response = await sync_to_async(self.check_detail_preconditions)()
+            if response is not None:
+                return response
+        response = await super().aretrieve(request, *args, **kwargs)
+        return self.add_detail_validators(response)
+
+    def has_preconditions(self, request):
+        return any(header in request.META for header in self.precondition_headers)
+
+    def get_serializer(self, *args, **kwargs):
+        # The rows or instance being serialized, for `add_*_validators`.
+        self.serialized = args[0] if args else None
+        return super().get_serializer(*args, **kwargs)
+
+    def get_representation(self):
+        request = self.request
+        return [
+            request.get_host(),
+            request.path,
+            sorted(request.query_params.lists()),
+            request.accepted_renderer.format,
+        ]
+
+    def get_stamp(self, row):
+        if isinstance(row, tuple):
+            return row
+        names = [self.updated_field, *self.stamp_fields]
+        if isinstance(row, dict):
+            return row["id"], *(row[name] for name in names)
+        return row.pk, *(getattr(row, name) for name in names)
+
+    def get_list_etag(self, rows):
+        paginator = self.paginator
+        if getattr(paginator, "offset_paginator", None) is not None:
+            # Offset pages include a total count no stamp accounts for.
+            return None
+        links = None
+        if getattr(paginator, "page_size", None):
+            links = [paginator.has_previous, paginator.has_next]
+        stamps = [self.get_stamp(row) for row in rows]
+        return make_etag(self.get_representation(), stamps, links)
+
+    def check_list_preconditions(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        page_queryset = None
+        if paginator is not None:
+            if not hasattr(paginator, "get_page_queryset"):
+                return None
+            page_queryset = paginator.get_page_queryset(queryset, self.request, self)
+            if paginator.offset_paginator is not None:
+                return None
+
+        names = ["pk", self.updated_field, *self.stamp_fields]
+        if page_queryset is None:
+            rows = list(queryset.values_list(*names))
+        else:
+            rows = paginator.paginate_rows(list(page_queryset.values_list(*names)))
+        etag = self.get_list_etag(rows)
+        if etag is None:
+            return None
+        return get_not_modified_response(self.request, etag)
+
+    def check_detail_preconditions(self):
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            stamp = (
+                queryset.filter(**filter_kwargs)
+                .values_list(self.updated_field, *self.stamp_fields)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if stamp is None:
+            # Let the regular view produce the 404.
+            return None
+        return get_not_modified_response(
+            self.request, *self.get_detail_validators(*stamp)
+        )
+
+    def get_detail_validators(self, updated_at, *extra):
+        etag = make_etag(self.get_representation(), updated_at, *extra)
+        if self.stamp_fields:
+            return etag, None
+        return etag, int(updated_at.timestamp())
+
+    def add_list_validators(self, response):
+        if (
+            response.status_code == 200
+            and getattr(self, "serialized", None) is not None
+        ):
+            set_validators(response, self.get_list_etag(self.serialized))
+        return response
+
+    def add_detail_validators(self, response):
+        if (
+            response.status_code == 200
+            and getattr(self, "serialized", None) is not None
+        ):
+            names = [self.updated_field, *self.stamp_fields]
+            stamp = [getattr(self.serialized, name) for name in names]
+            set_validators(response, *self.get_detail_validators(*stamp))
+        return response
+
+
+class RowSerializer:
+    """
+    Serializes `values()` rows with the field objects of a model serializer.
+
+    Produces the same output as the serializer for the supported field types
+    without building model instances or walking `ModelSerializer` machinery
+    per row.
+    """
+
+    def __init__(self, serializer, columns, rows):
+        self.rows = rows
+        self.converters = [
+            (name, columns[name], self.get_converter(field, serializer.Meta.model))
+            for name, field in serializer.fields.items()
+        ]
+
+    @staticmethod
+    def get_converter(field, model):
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return lambda value: field.to_representation(PKOnlyObject(pk=value))
+        if isinstance(field, serializers.FileField):
+            model_field = model._meta.get_field(field.source)
+            return lambda value: field.to_representation(
+                FieldFile(None, model_field, value)
+            )
+        if isinstance(field, serializers.StringRelatedField):
+            return str
+        return field.to_representation
+
+    @property
+    def data(self):
+        return [
+            {
+                name: None if row[column] is None else convert(row[column])
+                for name, column, convert in self.converters
+            }
+            for row in self.rows
+        ]
+
+
+class SparseFieldsetMixin:
+    """
+    `?fields=id,name,price` narrows the output of read requests and the SQL.
+
+    Requested fields are mapped to model columns (`sparse_field_sources`
+    overrides the mapping) and loaded with `only()`. With
+    `values_list_fast_path`, lists are fetched with `values()` and serialized
+    by `RowSerializer` instead of through model instances.
+    """
+
+    fields_query_param = "fields"
+    sparse_field_sources = {}
+    values_list_fast_path = False
+
+    def get_sparse_fields(self):
+        """Return the requested field names, or None for every field."""
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+
+        self._sparse_fields = None
+        value = self.request.query_params.get(self.fields_query_param)
+        if value and self.request.method in ("GET", "HEAD"):
+            available = self.get_serializer_class()().fields
+            requested = [name.strip() for name in value.split(",") if name.strip()]
+            unknown = sorted(set(requested) - set(available))
+            if unknown:
+                raise exceptions.ValidationError(
+                    {self.fields_query_param: f"Unknown fields: {', '.join(unknown)}."}
+                )
+            self._sparse_fields = [name for name in available if name in requested]
+        return self._sparse_fields
+
+    def get_field_columns(self, names):
+        """
+        Map serializer fields to model columns.
+
+        Reverse relations map to None (they are prefetched, not selected).
+        Returns None if a field has no model column to load.
+        """
+        serializer = self.get_serializer_class()()
+        model = serializer.Meta.model
+        columns = {}
+        for name in names:
+            source = self.sparse_field_sources.get(name, serializer.fields[name].source)
+            try:
+                field = model._meta.get_field(source.split("__")[0])
+            except FieldDoesNotExist:
+                return None
+            columns[name] = source if field.concrete else None
+        return columns
+
+    def get_ordering_columns(self, queryset):
+        ordering = OrderingFilter().get_ordering(self.request, queryset, self) or []
+        return {field.lstrip("-") for field in ordering} | {"id"}
+
+    def use_values_fast_path(self):
+        return self.values_list_fast_path and self.action == "list"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        self.row_columns = None
+        names = self.get_sparse_fields()
+        fast_path = self.use_values_fast_path()
+        if names is None and not fast_path:
+            return queryset
+
+        columns = self.get_field_columns(names or self.get_serializer_class()().fields)
+        if columns is None:
+            return queryset
+        # Keyset pagination reads the ordering columns from every row.
+        selected = {column for column in columns.values() if column is not None}
+        selected |= self.get_ordering_columns(queryset)
+        if getattr(self, "updated_field", None):
+            # ConditionalGetMixin builds validators from the loaded rows.
+            selected.add(self.updated_field)
+        if fast_path and None not in columns.values():
+            self.row_columns = columns
+            return queryset.values(*selected)
+        return queryset.only(*selected)
+
+    def get_serializer(self, *args, **kwargs):
+        if getattr(self, "row_columns", None) and kwargs.get("many"):
+            serializer = self.get_serializer_class()(
+                context=self.get_serializer_context()
+            )
+            self.narrow_fields(serializer)
+            return RowSerializer(serializer, self.row_columns, args[0])
+        serializer = super().get_serializer(*args, **kwargs)
+        self.narrow_fields(getattr(serializer, "child", serializer))
+        return serializer
+
+    def narrow_fields(self, serializer):
+        names = self.get_sparse_fields()
+        if names is not None:
+            for name in set(serializer.fields) - set(names):
+                serializer.fields.pop(name)
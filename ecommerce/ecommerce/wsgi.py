@@ -10,7 +10,11 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from ecommerce.settings import base
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+if base.DEBUG:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings.dev')
+else:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings.prod')
 
 application = get_wsgi_application()
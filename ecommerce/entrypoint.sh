@@ -0,0 +1,12 @@
+#!/bin/sh
+# Production start-up: wait for Postgres, migrate, then hand the process over
+# to gunicorn (see gunicorn.conf.py). SERVER_MODE=asgi serves ecommerce.asgi.
+set -e
+
+python manage.py wait_for_db --timeout "${DB_WAIT_TIMEOUT:-120}"
+
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    python manage.py migrate --noinput
+fi
+
+exec gunicorn -c gunicorn.conf.py "ecommerce.${SERVER_MODE:-wsgi}:application"
@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+from glob import glob
+
+""" gunicorn -c gunicorn.conf.py ecommerce.wsgi:application (SERVER_MODE=asgi: ASGI) """
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# One worker per core plus one, so a worker blocked on I/O does not idle a
+# core. WEB_CONCURRENCY overrides it (the convention most platforms set).
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() + 1))
+
+if SERVER_MODE == "asgi":
+    # One event loop per worker; the async read views need no extra threads.
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    # gthread parks idle keep-alive connections in a selector, so slow
+    # clients do not each hold a thread.
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot accumulate; the jitter
+# keeps them from restarting together.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Request metrics shared through METRICS_DIR restart with the server.
+    directory = os.environ.get("METRICS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob(os.path.join(directory, "*.json")):
+            os.remove(path)
@@ -1,5 +1,46 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from django.db import transaction
+from django.utils import timezone
+from .models import Order, OrderItem, OutboxEmail, StockReservation
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "status", "total_price", "created_at"]
+    list_filter = ["status"]
+    list_select_related = ["user"]
+    actions = ["mark_shipped"]
+
+    @admin.action(description="Mark selected orders as shipped")
+    def mark_shipped(self, request, queryset):
+        shipped = Order.StatusChoices.RECIEVED
+        with transaction.atomic():
+            # Cancelled orders gave their stock back; shipped ones are done.
+            order_ids = list(
+                queryset.exclude(
+                    status__in=[shipped, Order.StatusChoices.CANCELLED]
+                ).values_list("pk", flat=True)
+            )
+            Order.objects.filter(pk__in=order_ids).update(
+                status=shipped, updated_at=timezone.now()
+            )
+            # Shipped: the reserved stock is sold, as in the post_save receiver.
+            StockReservation.objects.filter(order_id__in=order_ids).delete()
+            OutboxEmail.objects.bulk_create(
+                [OutboxEmail(order_id=order_id) for order_id in order_ids]
+            )
+        skipped = queryset.count() - len(order_ids)
+        self.message_user(
+            request,
+            f"{len(order_ids)} orders marked as shipped, {skipped} already shipped "
+            "or cancelled were skipped.",
+        )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ["id", "order", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status"]
+
 
-admin.site.register(Order)
 admin.site.register(OrderItem)
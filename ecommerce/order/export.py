@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Order, OrderItem
+
+""" Orders with their items as NDJSON or CSV, streamed with constant memory """
+
+ORDER_FIELDS = [
+    "id",
+    "user__email",
+    "status",
+    "created_at",
+    "updated_at",
+    "total_price",
+]
+ITEM_FIELDS = ["product_id", "product__name", "quantity", "unit_price", "line_total"]
+CSV_HEADER = [
+    "order_id",
+    "user_email",
+    "status",
+    "created_at",
+    "updated_at",
+    "total_price",
+    "product_id",
+    "product_name",
+    "quantity",
+    "unit_price",
+    "line_total",
+]
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Rows fetched per round trip, and bytes per chunk handed to the server.
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+
+class OrderExportFilterSerializer(serializers.Serializer):
+    """`created_from`/`created_to` are inclusive dates in the current time zone."""
+
+    output = serializers.ChoiceField(choices=sorted(CONTENT_TYPES), default="ndjson")
+    created_from = serializers.DateField(required=False)
+    created_to = serializers.DateField(required=False)
+    status = serializers.ChoiceField(
+        choices=Order.StatusChoices.choices, required=False
+    )
+
+    def validate(self, attrs):
+        start, end = attrs.get("created_from"), attrs.get("created_to")
+        if start and end and start > end:
+            raise serializers.ValidationError("created_from is after created_to.")
+        return attrs
+
+
+def start_of_day(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def filter_orders(queryset, created_from=None, created_to=None, status=None):
+    if created_from:
+        queryset = queryset.filter(created_at__gte=start_of_day(created_from))
+    if created_to:
+        queryset = queryset.filter(
+            created_at__lt=start_of_day(created_to + timedelta(days=1))
+        )
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def seek_filter(ordering, row):
+    seek = Q()
+    equal = Q()
+    for name in ordering:
+        seek |= equal & Q(**{f"{name}__gt": row[name]})
+        equal &= Q(**{name: row[name]})
+    return seek
+
+
+def stream_rows(queryset, ordering, chunk_size=CHUNK_SIZE):
+    """Yield `queryset` rows in ascending `ordering`, `chunk_size` at a time."""
+    queryset = queryset.order_by(*ordering)
+    if not connections[queryset.db].settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+
+    # Transaction pooling rules out server-side cursors, whose client-side
+    # fallback would load every row at once; seek one chunk at a time.
+    page = queryset[:chunk_size]
+    while True:
+        rows = list(page)
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        page = queryset.filter(seek_filter(ordering, rows[-1]))[:chunk_size]
+
+
+def iter_orders(chunk_size=CHUNK_SIZE, **filters):
+    """
+    Yield `(order, items)` for the filtered orders, oldest first.
+
+    Orders are streamed; the items of each chunk of orders are then read by
+    order id. Filtering items by order id rather than by the export filters
+    means an order that changes while the export runs still gets its items,
+    and only one chunk is ever held in memory.
+    """
+    orders = iter(
+        stream_rows(
+            filter_orders(Order.objects.values(*ORDER_FIELDS), **filters),
+            ["created_at", "id"],
+            chunk_size,
+        )
+    )
+    while chunk := list(islice(orders, chunk_size)):
+        items = defaultdict(list)
+        for item in (
+            OrderItem.objects.filter(order_id__in=[order["id"] for order in chunk])
+            .order_by("order_id", "id")
+            .values("order_id", *ITEM_FIELDS)
+        ):
+            items[item["order_id"]].append(item)
+        for order in chunk:
+            yield order, items[order["id"]]
+
+
+def buffered(parts, size=BUFFER_SIZE):
+    buffer, length = [], 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def render_ndjson(rows):
+    for order, items in rows:
+        record = {
+            "id": order["id"],
+            "user": order["user__email"],
+            "status": order["status"],
+            "created_at": order["created_at"],
+            "updated_at": order["updated_at"],
+            "total_price": order["total_price"],
+            "items": [
+                {
+                    "product": item["product_id"],
+                    "product_name": item["product__name"],
+                    "quantity": item["quantity"],
+                    "unit_price": item["unit_price"],
+                    "line_total": item["line_total"],
+                }
+                for item in items
+            ],
+        }
+        yield json.dumps(record, cls=DjangoJSONEncoder) + "\n"
+
+
+def render_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for order, items in rows:
+        columns = [order[name] for name in ORDER_FIELDS]
+        for column in (3, 4):
+            columns[column] = columns[column].isoformat()
+        # An order without items still gets a row.
+        for item in items or [None]:
+            if item is None:
+                writer.writerow(columns + [""] * len(ITEM_FIELDS))
+            else:
+                writer.writerow(columns + [item[name] for name in ITEM_FIELDS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+RENDERERS = {"ndjson": render_ndjson, "csv": render_csv}
+
+
+def export_orders(output="ndjson", chunk_size=CHUNK_SIZE, **filters):
+    """Return an iterator of text chunks of about `BUFFER_SIZE` characters."""
+    return buffered(RENDERERS[output](iter_orders(chunk_size, **filters)))
+
+
+async def aiter_chunks(chunks):
+    """
+    Yield `chunks` from an async iterator, for responses served over ASGI.
+
+    Django reads a sync iterator to the end before an ASGI server sends any
+    of it. Each chunk is pulled through the thread-sensitive executor, so a
+    server-side cursor stays on the thread and connection that opened it.
+    """
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await pull(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
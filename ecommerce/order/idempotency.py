@@ -0,0 +1,107 @@
+import json
+from datetime import timedelta
+from hashlib import sha256
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .models import IdempotencyKey
+
+""" Idempotency-Key: the first request claims the key, retries replay its response """
+
+HEADER = "Idempotency-Key"
+CACHE_KEY = "order:idempotency:{}:{}"
+# Stored entries are (fingerprint, status_code, data) tuples.
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+def get_cache():
+    return caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+
+
+def get_cache_key(user, key):
+    return CACHE_KEY.format(user.pk, sha256(key.encode()).hexdigest())
+
+
+def get_idempotency_key(request):
+    key = request.headers.get(HEADER)
+    if key is not None and not 0 < len(key) <= 255:
+        raise serializers.ValidationError(
+            {HEADER: ["Must be between 1 and 255 characters long."]}
+        )
+    return key
+
+
+def get_fingerprint(data):
+    encoded = json.dumps(data, sort_keys=True, cls=JSONEncoder)
+    return sha256(encoded.encode()).hexdigest()
+
+
+def get_cached_entry(user, key):
+    return get_cache().get(get_cache_key(user, key))
+
+
+def claim_key(user, key, fingerprint):
+    """
+    Claim `key` for this request; return None, or the entry stored for it.
+
+    Call inside the transaction that handles the request. A concurrent
+    duplicate blocks on the unique constraint until that transaction ends,
+    then gets the stored response, or claims the key itself after a
+    rollback, so the two never run side by side.
+    """
+    while True:
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=timezone.now()
+                    + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+            return None
+        except IntegrityError:
+            pass
+        record = IdempotencyKey.objects.filter(
+            user=user, key=key, expires_at__gt=timezone.now()
+        ).first()
+        if record is not None:
+            return record.fingerprint, record.status_code, record.response
+        # Expired but not purged yet.
+        IdempotencyKey.objects.filter(
+            user=user, key=key, expires_at__lte=timezone.now()
+        ).delete()
+
+
+def store_response(user, key, fingerprint, response):
+    """Record `response` for the claimed key; cached once the transaction commits."""
+    # Stored as the renderer encodes it, so replays match the first response.
+    data = json.loads(json.dumps(response.data, cls=JSONEncoder))
+    IdempotencyKey.objects.filter(user=user, key=key).update(
+        status_code=response.status_code, response=data
+    )
+    entry = (fingerprint, response.status_code, data)
+    transaction.on_commit(
+        lambda: get_cache().set(
+            get_cache_key(user, key), entry, settings.IDEMPOTENCY_KEY_TTL
+        )
+    )
+
+
+def replay_response(entry, fingerprint):
+    stored_fingerprint, status_code, data = entry
+    if stored_fingerprint != fingerprint:
+        raise IdempotencyKeyReused()
+    response = Response(data, status=status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
@@ -0,0 +1,166 @@
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.db.models import Sum
+from rest_framework.exceptions import ValidationError
+from product.models import Brand, Product
+from order.models import Order, OrderItem, StockReservation
+from order.serializers import OrderSerializer
+
+EMAIL = "stock-benchmark@example.com"
+
+
+class Command(BaseCommand):
+    """Django command to measure order placement against a few hot products."""
+
+    help = (
+        "Place many orders in parallel against a handful of products with "
+        "limited stock, then check that nothing was oversold. Needs a database "
+        "that allows concurrent writers (PostgreSQL); the seeded rows are "
+        "committed and deleted again afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=5000)
+        parser.add_argument("--workers", type=int, default=32)
+        parser.add_argument("--products", type=int, default=3)
+        parser.add_argument("--stock", type=int, default=1000)
+        parser.add_argument("--max-quantity", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def seed(self, options):
+        user, _ = get_user_model().objects.get_or_create(
+            email=EMAIL, defaults={"name": "Stock Benchmark"}
+        )
+        brand = Brand.objects.create(name="Stock Benchmark")
+        products = [
+            Product.objects.create(
+                name=f"Hot product {index}",
+                brand=brand,
+                price=10,
+                stock_quantity=options["stock"],
+            )
+            for index in range(options["products"])
+        ]
+        return user, brand, [product.pk for product in products]
+
+    def make_jobs(self, product_ids, options):
+        generator = random.Random(options["seed"])
+        jobs = []
+        for _ in range(options["orders"]):
+            chosen = generator.sample(
+                product_ids, generator.randint(1, min(2, len(product_ids)))
+            )
+            jobs.append(
+                [
+                    {
+                        "product": product_id,
+                        "quantity": generator.randint(1, options["max_quantity"]),
+                    }
+                    for product_id in chosen
+                ]
+            )
+        return jobs
+
+    def place_orders(self, user, jobs):
+        request = SimpleNamespace(user=user)
+        outcomes, latencies = Counter(), []
+        try:
+            for items in jobs:
+                started = time.perf_counter()
+                serializer = OrderSerializer(
+                    data={"items": items}, context={"request": request}
+                )
+                try:
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save()
+                    outcomes["placed"] += 1
+                except ValidationError:
+                    outcomes["rejected"] += 1
+                except DatabaseError:
+                    outcomes["errors"] += 1
+                latencies.append(time.perf_counter() - started)
+        finally:
+            connections.close_all()
+        return outcomes, latencies
+
+    def verify(self, user, product_ids, options):
+        sold = Counter(
+            dict(
+                OrderItem.objects.filter(order__user=user)
+                .values_list("product_id")
+                .order_by()
+                .annotate(total=Sum("quantity"))
+            )
+        )
+        reserved = Counter(
+            dict(
+                StockReservation.objects.filter(order__user=user)
+                .values_list("product_id")
+                .order_by()
+                .annotate(total=Sum("quantity"))
+            )
+        )
+        oversold = 0
+        for product_id, stock in Product.objects.filter(pk__in=product_ids).values_list(
+            "pk", "stock_quantity"
+        ):
+            if stock + sold[product_id] != options["stock"]:
+                raise CommandError(
+                    f"Product {product_id}: {stock} left after selling "
+                    f"{sold[product_id]} of {options['stock']}."
+                )
+            if reserved[product_id] != sold[product_id]:
+                raise CommandError(f"Product {product_id}: reservations mismatch.")
+            oversold += max(sold[product_id] - options["stock"], 0)
+        return sold, oversold
+
+    def handle(self, *args, **options):
+        user, brand, product_ids = self.seed(options)
+        try:
+            jobs = self.make_jobs(product_ids, options)
+            workers = max(options["workers"], 1)
+            outcomes, latencies = Counter(), []
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for worker_outcomes, worker_latencies in executor.map(
+                    lambda index: self.place_orders(user, jobs[index::workers]),
+                    range(workers),
+                ):
+                    outcomes.update(worker_outcomes)
+                    latencies.extend(worker_latencies)
+            elapsed = time.perf_counter() - started
+
+            sold, oversold = self.verify(user, product_ids, options)
+            latencies.sort()
+            self.stdout.write(
+                f"{len(jobs)} orders from {workers} workers against "
+                f"{len(product_ids)} products with {options['stock']} in stock each"
+            )
+            self.stdout.write(
+                f"Placed {outcomes['placed']}, rejected {outcomes['rejected']} "
+                f"for lack of stock, {outcomes['errors']} database errors"
+            )
+            self.stdout.write(
+                f"Sold {sum(sold.values())} of "
+                f"{options['stock'] * len(product_ids)} items"
+            )
+            self.stdout.write(
+                f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+                f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms"
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(jobs) / elapsed:,.0f} orders/s, oversold: {oversold}"
+                )
+            )
+        finally:
+            StockReservation.objects.filter(order__user=user).delete()
+            Order.objects.filter(user=user).delete()
+            brand.delete()
+            user.delete()
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from order.stock import release_expired
+
+
+class Command(BaseCommand):
+    """Django command to release the stock of expired order reservations."""
+
+    help = (
+        "Cancel pending orders whose stock reservations expired and put the "
+        "stock back, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for expired reservations instead of exiting.",
+        )
+        parser.add_argument("--idle-sleep", type=float, default=30)
+
+    def handle(self, *args, **options):
+        cancelled = 0
+        while True:
+            released = release_expired(options["batch_size"])
+            cancelled += released
+            if released == options["batch_size"]:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["idle_sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Cancelled {cancelled} expired orders."))
@@ -0,0 +1,98 @@
+import time
+from datetime import timedelta
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from order.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    """Django command to send queued outbox e-mails over one SMTP connection."""
+
+    help = "Drain pending OutboxEmail rows in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Mark an e-mail as failed after this many attempts.",
+        )
+        parser.add_argument(
+            "--backoff",
+            type=float,
+            default=30,
+            help="Seconds before the first retry; doubles after every attempt.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new e-mails instead of exiting when drained.",
+        )
+        parser.add_argument("--idle-sleep", type=float, default=5)
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        sent = failed = 0
+        try:
+            while True:
+                batch_sent, batch_failed = self.send_batch(connection, options)
+                sent += batch_sent
+                failed += batch_failed
+                if batch_sent + batch_failed == options["batch_size"]:
+                    continue
+                if not options["loop"]:
+                    break
+                if not (batch_sent or batch_failed):
+                    # Do not hold an idle SMTP connection open between polls.
+                    connection.close()
+                    time.sleep(options["idle_sleep"])
+        finally:
+            connection.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Sent {sent} e-mails, {failed} attempts failed.")
+        )
+
+    def send_batch(self, connection, options):
+        sent = failed = 0
+        with transaction.atomic():
+            now = timezone.now()
+            batch = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("order__user")
+                .filter(
+                    status=OutboxEmail.StatusChoices.PENDING,
+                    next_attempt_at__lte=now,
+                )
+                .order_by("next_attempt_at", "id")[: options["batch_size"]]
+            )
+            for email in batch:
+                email.attempts += 1
+                try:
+                    # A no-op once open; backends left closed would otherwise
+                    # connect and disconnect around every send_messages().
+                    connection.open()
+                    connection.send_messages([email.build_message()])
+                except Exception as exc:
+                    # The connection may be broken; the next e-mail reopens it.
+                    connection.close()
+                    failed += 1
+                    email.last_error = repr(exc)
+                    if email.attempts >= options["max_attempts"]:
+                        email.status = OutboxEmail.StatusChoices.FAILED
+                    else:
+                        delay = options["backoff"] * 2 ** (email.attempts - 1)
+                        email.next_attempt_at = now + timedelta(seconds=delay)
+                else:
+                    sent += 1
+                    email.status = OutboxEmail.StatusChoices.SENT
+                    email.sent_at = timezone.now()
+
+            OutboxEmail.objects.bulk_update(
+                batch,
+                ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+            )
+        return sent, failed
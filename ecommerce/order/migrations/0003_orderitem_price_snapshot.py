@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:02
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def backfill_price_snapshot(apps, schema_editor):
+    OrderItem = apps.get_model("order", "OrderItem")
+    Product = apps.get_model("product", "Product")
+
+    price = Product.objects.filter(pk=OuterRef("product_id")).values("price")
+    OrderItem.objects.update(unit_price=Subquery(price))
+    OrderItem.objects.update(line_total=F("unit_price") * F("quantity"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order", "0002_order_status"),
+        ("product", "0011_product_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="line_total",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_price_snapshot, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.core.mail import EmailMessage
+from django.urls import reverse
+from django.utils import timezone
 from product.models import Product
 
 
@@ -8,6 +11,7 @@ class Order(models.Model):
         PENDING = "PNG", "Pending"
         PREPARING = "PRP", "Preparing"
         RECIEVED = "SHP", "SHIPPED"
+        CANCELLED = "CNL", "Cancelled"
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -19,20 +23,136 @@ class Order(models.Model):
         default=StatusChoices.PENDING,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="order_user_created_idx"
+            ),
+            models.Index(
+                fields=["status", "created_at"], name="order_status_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.user.name} is {self.status}"
 
-    def calculate_total_price(self):
-        self.total_price = sum(
-            item.product.price * item.quantity for item in self.items.all()
-        )
-        self.save()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Outbox rows written by post_save receivers commit with the order.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    def calculate_total_price(self, items=None):
+        if items is None:
+            total = self.items.aggregate(total=models.Sum("line_total"))["total"]
+        else:
+            total = sum(item.line_total for item in items)
+        self.total_price = total or 0
+        return self.total_price
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    line_total = models.DecimalField(max_digits=10, decimal_places=2)
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
+
+    def snapshot_price(self):
+        if self.unit_price is None:
+            self.unit_price = self.product.price
+        self.line_total = self.unit_price * self.quantity
+
+    def save(self, *args, **kwargs):
+        self.snapshot_price()
+        super().save(*args, **kwargs)
+
+
+class StockReservation(models.Model):
+    """Stock held for a pending order until it is confirmed or expires."""
+
+    order = models.ForeignKey(
+        Order, related_name="reservations", on_delete=models.CASCADE
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return (
+            f"{self.quantity} x product #{self.product_id} for order #{self.order_id}"
+        )
+
+
+class IdempotencyKey(models.Model):
+    """The response to an order POST, replayed for retries with the same key."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    # Filled in before the transaction that claimed the key commits.
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="order_idempotency_user_key_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key!r} of user #{self.user_id}"
+
+
+class OutboxEmail(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDING = "PNG", "Pending"
+        SENT = "SNT", "Sent"
+        FAILED = "FLD", "Failed"
+
+    order = models.ForeignKey(
+        Order, related_name="outbox_emails", on_delete=models.CASCADE
+    )
+    status = models.CharField(
+        max_length=3,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"Shipment e-mail for order #{self.order_id} is {self.status}"
+
+    def build_message(self):
+        order_link = (
+            f"http://127.0.0.1:8000{reverse('order-detail', args=[self.order_id])}"
+        )
+        subject = f"Order #{self.order_id} has been shipped"
+        message = (
+            f"Your order #{self.order_id} has been shipped. "
+            f"You can view the details here: {order_link}"
+        )
+
+        return EmailMessage(
+            subject,
+            message,
+            "ecommerce@email.com",
+            [self.order.user.email],
+        )
@@ -1,12 +1,18 @@
+from django.db import transaction
 from rest_framework import serializers
+from product.models import Product
 from .models import Order, OrderItem
+from .stock import InsufficientStock, release_order_stock, reserve_stock
 from rest_framework.exceptions import PermissionDenied
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    product = serializers.IntegerField(source="product_id")
+
     class Meta:
         model = OrderItem
-        fields = ["product", "quantity"]
+        fields = ["product", "quantity", "unit_price", "line_total"]
+        read_only_fields = ["unit_price", "line_total"]
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -43,19 +49,63 @@ class OrderSerializer(serializers.ModelSerializer):
                 )
         return attrs
 
+    def validate_items(self, items):
+        product_ids = {item["product_id"] for item in items}
+        products = Product.objects.only("id", "price", "stock_quantity").in_bulk(
+            product_ids
+        )
+
+        missing = sorted(product_ids - products.keys())
+        if missing:
+            raise serializers.ValidationError(
+                f'Invalid pk "{missing[0]}" - object does not exist.'
+            )
+
+        for item in items:
+            item["product"] = products[item.pop("product_id")]
+        return items
+
+    def build_items(self, order, items_data):
+        items = [OrderItem(order=order, **item_data) for item_data in items_data]
+        for item in items:
+            item.snapshot_price()
+        return items
+
+    def take_stock(self, order, items):
+        try:
+            reserve_stock(order, items)
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({"items": [str(exc)]})
+
     def create(self, validated_data):
         items_data = validated_data.pop("items")
-        order = Order.objects.create(user=self.context["request"].user)
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
-        order.calculate_total_price()
+        with transaction.atomic():
+            order = Order(user=self.context["request"].user, **validated_data)
+            items = self.build_items(order, items_data)
+            order.calculate_total_price(items)
+            order.save()
+            OrderItem.objects.bulk_create(items)
+            self.take_stock(order, items)
         return order
 
     def update(self, instance, validated_data):
         items_data = validated_data.pop("items", None)
-        if items_data:
-            instance.items.all().delete()
-            for item_data in items_data:
-                OrderItem.objects.create(order=instance, **item_data)
-        instance.calculate_total_price()
-        return super().update(instance, validated_data)
+        with transaction.atomic():
+            # Waits for, or wins against, the expired reservation sweeper.
+            status = (
+                Order.objects.select_for_update()
+                .values_list("status", flat=True)
+                .get(pk=instance.pk)
+            )
+            if status == Order.StatusChoices.CANCELLED:
+                raise serializers.ValidationError("Cancelled orders cannot be changed.")
+            if items_data:
+                release_order_stock(instance, status)
+                items = self.build_items(instance, items_data)
+                instance.items.all().delete()
+                OrderItem.objects.bulk_create(items)
+                instance.calculate_total_price(items)
+            instance = super().update(instance, validated_data)
+            if items_data:
+                self.take_stock(instance, items)
+            return instance
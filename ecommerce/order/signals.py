@@ -1,19 +1,38 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
-from django.urls import reverse
-from django.core.mail import send_mail
-from .models import Order
+from .models import Order, OutboxEmail
+from .stock import release_stock
+
+
+@receiver(post_save, sender=Order)
+def settle_reservations_on_status_change(
+    sender, instance, created, raw=False, **kwargs
+):
+    # Runs before notify_user_on_status_change moves `_loaded_status` on.
+    pending = Order.StatusChoices.PENDING
+    if raw or created or getattr(instance, "_loaded_status", None) != pending:
+        return
+    if instance.status == Order.StatusChoices.CANCELLED:
+        release_stock(instance.reservations.all())
+    elif instance.status != pending:
+        # Confirmed: the reserved stock is sold and no longer expires.
+        instance.reservations.all().delete()
+
 
 @receiver(post_save, sender=Order)
-def notify_user_on_status_change(sender, instance, **kwargs):
-    if instance.status == 'SHP':
-        order_link = f"http://127.0.0.1:8000{reverse('order-detail', args=[instance.id])}"
-        subject = f"Order #{instance.id} has been shipped"
-        message = f"Your order #{instance.id} has been shipped. You can view the details here: {order_link}"
+def notify_user_on_status_change(sender, instance, created, raw=False, **kwargs):
+    previous = None if created else getattr(instance, "_loaded_status", None)
+    instance._loaded_status = instance.status
+    if raw:
+        return
+
+    shipped = Order.StatusChoices.RECIEVED
+    if instance.status == shipped and previous != shipped:
+        OutboxEmail.objects.create(order=instance)
+
 
-        send_mail(
-            subject,
-            message,
-            'ecommerce@email.com',
-            [instance.user.email],
-        )
\ No newline at end of file
+@receiver(pre_delete, sender=Order)
+def release_stock_of_deleted_order(sender, instance, **kwargs):
+    # Only pending orders still hold stock; the rest sold it.
+    if instance.status == Order.StatusChoices.PENDING:
+        release_stock(instance.reservations.all())
@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+from product.models import Product
+from .models import Order, StockReservation
+
+""" Stock reservations: conditional decrements, released when they expire """
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id, quantity):
+        super().__init__(
+            f'Product "{product_id}" does not have {quantity} items in stock.'
+        )
+        self.product_id = product_id
+        self.quantity = quantity
+
+
+def reserve_stock(order, items):
+    """
+    Take the stock for `items` off their products; run inside a transaction.
+
+    Each tracked product gets one `UPDATE ... SET stock_quantity =
+    stock_quantity - n WHERE stock_quantity >= n`. The database checks and
+    decrements in one step, so concurrent orders cannot oversell, and a
+    failed check raises `InsufficientStock` and rolls every decrement back.
+    Call this last before commit: the rows stay locked until then. Pending
+    orders record reservations that `release_expired` gives back.
+    """
+    quantities = Counter()
+    for item in items:
+        if item.product.stock_quantity is not None:
+            quantities[item.product_id] += item.quantity
+    if not quantities:
+        return
+
+    if order.status == Order.StatusChoices.PENDING:
+        expires_at = timezone.now() + timedelta(
+            minutes=settings.ORDER_RESERVATION_MINUTES
+        )
+        StockReservation.objects.bulk_create(
+            StockReservation(
+                order=order,
+                product_id=product_id,
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+            for product_id, quantity in quantities.items()
+        )
+
+    # A fixed order keeps multi-product orders from deadlocking each other.
+    for product_id, quantity in sorted(quantities.items()):
+        updated = Product.objects.filter(
+            pk=product_id, stock_quantity__gte=quantity
+        ).update(stock_quantity=F("stock_quantity") - quantity)
+        if not updated:
+            raise InsufficientStock(product_id, quantity)
+    Product.objects.filter(pk__in=quantities).sync_in_stock()
+
+
+def release_stock(reservations):
+    """Put the reserved stock back and delete `reservations`."""
+    # Locking the reservations first makes a concurrent release a no-op.
+    rows = list(
+        reservations.select_for_update().values_list("pk", "product_id", "quantity")
+    )
+    if not rows:
+        return
+    StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+    restock((product_id, quantity) for _, product_id, quantity in rows)
+
+
+def release_order_stock(order, status):
+    """
+    Put back the stock `order` holds, given its locked `status`.
+
+    Pending orders hold their reservations. Confirmed orders have none left:
+    their items took the stock for good, so those quantities go back.
+    """
+    if status == Order.StatusChoices.PENDING:
+        release_stock(order.reservations.all())
+    elif status != Order.StatusChoices.CANCELLED:
+        restock(order.items.values_list("product_id", "quantity"))
+
+
+def restock(rows):
+    """Add `(product_id, quantity)` rows back to the products that track stock."""
+    quantities = Counter()
+    for product_id, quantity in rows:
+        quantities[product_id] += quantity
+    for product_id, quantity in sorted(quantities.items()):
+        Product.objects.filter(pk=product_id, stock_quantity__isnull=False).update(
+            stock_quantity=F("stock_quantity") + quantity
+        )
+    Product.objects.filter(pk__in=quantities).sync_in_stock()
+
+
+def release_expired(batch_size=100):
+    """Cancel up to `batch_size` pending orders whose reservations expired."""
+    with transaction.atomic():
+        expired = StockReservation.objects.filter(expires_at__lte=timezone.now())
+        # Orders being confirmed or edited right now are skipped, not waited on.
+        order_ids = list(
+            Order.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=Order.StatusChoices.PENDING,
+                pk__in=expired.values("order_id"),
+            )
+            .order_by("id")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if order_ids:
+            release_stock(StockReservation.objects.filter(order_id__in=order_ids))
+            Order.objects.filter(pk__in=order_ids).update(
+                status=Order.StatusChoices.CANCELLED, updated_at=Now()
+            )
+    return len(order_ids)
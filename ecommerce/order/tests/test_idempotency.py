@@ -0,0 +1,123 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from ..idempotency import get_cache
+from ..models import IdempotencyKey, Order
+from .test_order_api import create_product
+
+ORDERS_URL = reverse("order-list")
+
+
+class IdempotencyKeyTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email="buyer@example.com", name="Buyer", password="pass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.product = create_product(stock_quantity=10)
+        self.payload = {"items": [{"product": self.product.id, "quantity": 2}]}
+
+    def post(self, key="key-1", payload=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                ORDERS_URL,
+                payload or self.payload,
+                format="json",
+                headers={"Idempotency-Key": key},
+            )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            retry = self.post()
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 8)
+
+    def test_replay_from_database_after_cache_loss(self):
+        first = self.post()
+        get_cache().clear()
+
+        retry = self.post()
+
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_per_user_and_per_key(self):
+        self.post()
+        self.post(key="key-2")
+        other = get_user_model().objects.create_user(
+            email="other@example.com", name="Other", password="pass123"
+        )
+        self.client.force_authenticate(other)
+        self.post()
+
+        self.assertEqual(Order.objects.count(), 3)
+
+    def test_reused_key_with_different_body(self):
+        self.post()
+
+        res = self.post(
+            payload={"items": [{"product": self.product.id, "quantity": 1}]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_does_not_claim_the_key(self):
+        res = self.post(
+            payload={"items": [{"product": self.product.id, "quantity": 50}]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        res = self.post(
+            payload={"items": [{"product": self.product.id, "quantity": 50}]}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+
+    def test_expired_key_runs_again(self):
+        self.post()
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        get_cache().clear()
+
+        res = self.post()
+
+        self.assertFalse(res.has_header("Idempotent-Replayed"))
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_invalid_key(self):
+        res = self.post(key="x" * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_purge_command(self):
+        self.post()
+        self.post(key="key-2")
+        IdempotencyKey.objects.filter(key="key-1").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+
+        self.assertIn("Deleted 1 expired keys", out.getvalue())
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["key-2"]
+        )
@@ -3,6 +3,8 @@ from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
+from io import StringIO
 from product.models import Product, Brand
 from ..models import Order, OrderItem
 
@@ -73,7 +75,7 @@ class PrivateOrdersAPITest(APITestCase):
 
         res = self.client.get(self.orders_url)
 
-        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(res.data["results"]), 2)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_list_orders_limited_to_user(self):
@@ -84,9 +86,9 @@ class PrivateOrdersAPITest(APITestCase):
         create_order_and_items(user=self.user)
 
         res = self.client.get(self.orders_url)
-        order = res.data[0]
+        order = res.data["results"][0]
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
         self.assertEqual(order["user"], self.user.name)
 
     def test_create_order_success(self):
@@ -109,6 +111,40 @@ class PrivateOrdersAPITest(APITestCase):
         )
         self.assertEqual(res.data["total_price"], total_price)
 
+    def test_order_keeps_purchase_price(self):
+        product = create_product(price=40)
+        payload = {"items": [{"product": product.id, "quantity": 3}]}
+        res = self.client.post(self.orders_url, payload, format="json")
+
+        product.price = 99
+        product.save()
+
+        order = Order.objects.get(id=res.data["id"])
+        item = order.items.get()
+        self.assertEqual(item.unit_price, 40)
+        self.assertEqual(item.line_total, 120)
+        self.assertEqual(order.calculate_total_price(), 120)
+
+        res = self.client.get(detail_url(order.id))
+        self.assertEqual(res.data["total_price"], 120)
+        self.assertEqual(res.data["items"][0]["unit_price"], "40.00")
+        self.assertEqual(res.data["items"][0]["line_total"], "120.00")
+
+    def test_create_order_invalid_product_error(self):
+        product = create_product()
+        payload = {
+            "items": [
+                {"product": product.id, "quantity": 1},
+                {"product": product.id + 100, "quantity": 1},
+            ],
+        }
+
+        res = self.client.post(self.orders_url, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("items", res.data)
+        self.assertFalse(Order.objects.exists())
+
 
 class PrivateOrderDetailAPITest(APITestCase):
     def setUp(self):
@@ -217,6 +253,9 @@ class PrivateOrderDetailAPITest(APITestCase):
 
         order.status = "SHP"
         order.save()
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command("send_outbox_emails", stdout=StringIO())
 
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox[0]
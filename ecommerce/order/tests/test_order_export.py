@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+import warnings
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+from ..export import CSV_HEADER, iter_orders
+from ..models import Order
+from .test_order_api import create_order, create_order_item, create_product
+
+EXPORT_URL = reverse("order-export")
+
+
+def read(response):
+    return b"".join(response.streaming_content).decode()
+
+
+class OrderExportTest(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            email="staff@example.com", name="Staff", password="pass123"
+        )
+        self.staff.is_staff = True
+        self.staff.save()
+        self.customer = get_user_model().objects.create_user(
+            email="customer@example.com", name="Customer", password="pass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+        phone = create_product(name="Phone", price=200)
+        case = create_product(name="Case", price=10)
+        now = timezone.now()
+        self.old = create_order(self.customer, total_price=200)
+        create_order_item(self.old, phone)
+        Order.objects.filter(pk=self.old.pk).update(created_at=now - timedelta(days=40))
+        self.shipped = create_order(
+            self.customer, total_price=220, status=Order.StatusChoices.RECIEVED
+        )
+        create_order_item(self.shipped, phone)
+        create_order_item(self.shipped, case, quantity=2)
+        self.empty = create_order(self.staff)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(
+            self.client.get(EXPORT_URL).status_code, status.HTTP_403_FORBIDDEN
+        )
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.client.get(EXPORT_URL).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_ndjson_export(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertIn("attachment;", res["Content-Disposition"])
+        orders = [json.loads(line) for line in read(res).splitlines()]
+        self.assertEqual(
+            [order["id"] for order in orders],
+            [self.old.id, self.shipped.id, self.empty.id],
+        )
+        shipped = orders[1]
+        self.assertEqual(shipped["user"], "customer@example.com")
+        self.assertEqual(shipped["total_price"], "220.00")
+        self.assertEqual(
+            [(item["product_name"], item["quantity"]) for item in shipped["items"]],
+            [("Phone", 1), ("Case", 2)],
+        )
+        self.assertEqual(orders[2]["items"], [])
+
+    async def test_asgi_export_streams_chunk_by_chunk(self):
+        token = await sync_to_async(Token.objects.create)(user=self.staff)
+        headers = {"Authorization": f"Token {token.key}"}
+
+        with warnings.catch_warnings():
+            # Raised when Django has to read a sync iterator into a list.
+            warnings.simplefilter("error")
+            res = await AsyncClient().get(EXPORT_URL, headers=headers)
+            # Iterated the way the ASGI handler sends it.
+            body = b"".join([chunk async for chunk in res])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in body.decode().splitlines()],
+            [self.old.id, self.shipped.id, self.empty.id],
+        )
+
+    def test_csv_export(self):
+        res = self.client.get(EXPORT_URL, {"output": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(read(res))))
+        self.assertEqual(rows[0], CSV_HEADER)
+        # One row per item; the order without items still gets one.
+        self.assertEqual(
+            [(row[0], row[7]) for row in rows[1:]],
+            [
+                (str(self.old.id), "Phone"),
+                (str(self.shipped.id), "Phone"),
+                (str(self.shipped.id), "Case"),
+                (str(self.empty.id), ""),
+            ],
+        )
+
+    def test_filters(self):
+        today = timezone.localdate()
+        res = self.client.get(
+            EXPORT_URL, {"created_from": today - timedelta(days=1), "created_to": today}
+        )
+        ids = [json.loads(line)["id"] for line in read(res).splitlines()]
+        self.assertEqual(ids, [self.shipped.id, self.empty.id])
+
+        res = self.client.get(EXPORT_URL, {"status": Order.StatusChoices.RECIEVED})
+        orders = [json.loads(line) for line in read(res).splitlines()]
+        self.assertEqual([order["id"] for order in orders], [self.shipped.id])
+        self.assertEqual(len(orders[0]["items"]), 2)
+
+    def test_invalid_filters(self):
+        for params in [
+            {"output": "xml"},
+            {"status": "nope"},
+            {"created_from": "2024-02-01", "created_to": "2024-01-01"},
+        ]:
+            res = self.client.get(EXPORT_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keyset_fallback_without_server_side_cursors(self):
+        for _ in range(3):
+            order = create_order(self.customer)
+            create_order_item(order, create_product(), quantity=2)
+        expected = [
+            (order["id"], len(items)) for order, items in iter_orders(chunk_size=1000)
+        ]
+
+        with mock.patch.dict(
+            connection.settings_dict, {"DISABLE_SERVER_SIDE_CURSORS": True}
+        ):
+            result = [
+                (order["id"], len(items)) for order, items in iter_orders(chunk_size=2)
+            ]
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result), 6)
+
+    def test_command(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "export_orders", output="csv", status="SHP", stdout=out, stderr=err
+        )
+
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 3)
+        self.assertIn("Exported 1 orders", err.getvalue())
@@ -0,0 +1,138 @@
+from io import StringIO
+from smtplib import SMTPException
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.admin.sites import site
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+from ..admin import OrderAdmin
+from ..models import Order, OutboxEmail
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise SMTPException("Connection refused")
+
+
+class CountingEmailBackend(BaseEmailBackend):
+    """Connects around each send, like the SMTP backend, unless opened first."""
+
+    connections = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection:
+            return False
+        self.connection = object()
+        CountingEmailBackend.connections += 1
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, email_messages):
+        new_connection = self.open()
+        if new_connection:
+            self.close()
+        return len(email_messages)
+
+
+def drain(**options):
+    call_command("send_outbox_emails", stdout=StringIO(), **options)
+
+
+class ShipmentOutboxTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@user.com", name="Test User", password="userpass123"
+        )
+        self.order = Order.objects.create(user=self.user)
+
+    def ship(self, order):
+        order.status = Order.StatusChoices.RECIEVED
+        order.save()
+
+    def test_only_status_transitions_are_queued(self):
+        self.order.save()
+        self.assertFalse(OutboxEmail.objects.exists())
+
+        self.ship(self.order)
+        self.order.save()
+        order = Order.objects.get(pk=self.order.pk)
+        order.save()
+
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_created_as_shipped_is_queued(self):
+        Order.objects.create(user=self.user, status=Order.StatusChoices.RECIEVED)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_worker_sends_batch(self):
+        for _ in range(3):
+            self.ship(Order.objects.create(user=self.user))
+
+        with self.assertNumQueries(4):
+            drain(batch_size=10)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertFalse(
+            OutboxEmail.objects.exclude(status=OutboxEmail.StatusChoices.SENT).exists()
+        )
+
+        drain()
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(EMAIL_BACKEND="order.tests.test_outbox.CountingEmailBackend")
+    def test_worker_connects_once_per_batch(self):
+        for _ in range(5):
+            self.ship(Order.objects.create(user=self.user))
+        CountingEmailBackend.connections = 0
+
+        drain(batch_size=10)
+
+        self.assertEqual(CountingEmailBackend.connections, 1)
+        self.assertFalse(
+            OutboxEmail.objects.exclude(status=OutboxEmail.StatusChoices.SENT).exists()
+        )
+
+    @override_settings(EMAIL_BACKEND="order.tests.test_outbox.FailingEmailBackend")
+    def test_failures_back_off_then_give_up(self):
+        self.ship(self.order)
+
+        drain(backoff=60)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.StatusChoices.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("Connection refused", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        drain(backoff=60)
+        self.assertEqual(OutboxEmail.objects.get().attempts, 1)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        drain(backoff=60, max_attempts=2)
+        self.assertEqual(
+            OutboxEmail.objects.get().status, OutboxEmail.StatusChoices.FAILED
+        )
+
+    def test_admin_bulk_ship_action(self):
+        orders = [Order.objects.create(user=self.user) for _ in range(3)]
+        self.ship(orders[0])
+        request = RequestFactory().post("/")
+        request.user = self.user
+        admin = OrderAdmin(Order, site)
+        admin.message_user = lambda *args, **kwargs: None
+
+        admin.mark_shipped(request, Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        self.assertEqual(
+            Order.objects.filter(status=Order.StatusChoices.RECIEVED).count(), 3
+        )
+        self.assertEqual(OutboxEmail.objects.count(), 3)
@@ -0,0 +1,59 @@
+from rest_framework.test import APITestCase, APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from product.models import Brand, Product
+from ..models import Order, OrderItem
+
+
+class OrderQueryCountTest(APITestCase):
+    """Query counts must not grow with the number of orders or items."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@user.com", name="Test User", password="userpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        brand = Brand.objects.create(name="Brand Name")
+        products = [
+            Product.objects.create(name=f"Product {index}", brand=brand, price=10)
+            for index in range(3)
+        ]
+        self.orders = []
+        for _ in range(4):
+            order = Order.objects.create(user=self.user)
+            for product in products:
+                OrderItem.objects.create(order=order, product=product, quantity=2)
+            self.orders.append(order)
+
+    def test_order_list(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(reverse("order-list"))
+        self.assertEqual(len(res.data["results"]), 4)
+
+    def test_order_detail(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(reverse("order-detail", args=[self.orders[0].id]))
+        self.assertEqual(len(res.data["items"]), 3)
+
+    def test_order_create(self):
+        products = Product.objects.all()
+        payload = {
+            "items": [{"product": product.id, "quantity": 1} for product in products]
+        }
+
+        with self.assertNumQueries(6):
+            res = self.client.post(reverse("order-list"), payload, format="json")
+        self.assertEqual(len(res.data["items"]), 3)
+
+    def test_order_update(self):
+        products = Product.objects.all()
+        payload = {
+            "items": [{"product": product.id, "quantity": 3} for product in products]
+        }
+        url = reverse("order-detail", args=[self.orders[0].id])
+
+        # Two more for locking the order and releasing its reservations.
+        with self.assertNumQueries(11):
+            res = self.client.put(url, payload, format="json")
+        self.assertEqual(res.data["total_price"], 90)
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from ..models import Order, StockReservation
+from .test_order_api import create_product
+
+ORDERS_URL = reverse("order-list")
+
+
+def detail_url(order_id):
+    return reverse("order-detail", args=[order_id])
+
+
+class StockReservationTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="buyer@example.com", name="Buyer", password="pass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.phone = create_product(name="Phone", stock_quantity=5)
+        self.case = create_product(name="Case", stock_quantity=10)
+
+    def place(self, *items):
+        payload = {
+            "items": [
+                {"product": product.id, "quantity": quantity}
+                for product, quantity in items
+            ]
+        }
+        return self.client.post(ORDERS_URL, payload, format="json")
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock_quantity
+
+    def test_order_reserves_stock(self):
+        res = self.place((self.phone, 2), (self.case, 1), (self.phone, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((self.stock(self.phone), self.stock(self.case)), (2, 9))
+        order = Order.objects.get(pk=res.data["id"])
+        self.assertEqual(
+            sorted(order.reservations.values_list("product_id", "quantity")),
+            [(self.phone.id, 3), (self.case.id, 1)],
+        )
+
+    def test_insufficient_stock_rolls_back(self):
+        res = self.place((self.case, 2), (self.phone, 6))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("does not have 6 items in stock", str(res.data["items"]))
+        self.assertEqual((self.stock(self.phone), self.stock(self.case)), (5, 10))
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_untracked_products_are_not_limited(self):
+        untracked = create_product(name="Sticker")
+
+        res = self.place((untracked, 1000))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(self.stock(untracked))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_selling_out_and_restocking_flip_in_stock(self):
+        res = self.place((self.phone, 5))
+        self.phone.refresh_from_db()
+        self.assertFalse(self.phone.in_stock)
+
+        self.client.delete(detail_url(res.data["id"]))
+        self.phone.refresh_from_db()
+        self.assertTrue(self.phone.in_stock)
+        self.assertEqual(self.phone.stock_quantity, 5)
+
+    def test_replacing_items_moves_reservations(self):
+        res = self.place((self.phone, 4))
+
+        res = self.client.patch(
+            detail_url(res.data["id"]),
+            {"items": [{"product": self.case.id, "quantity": 3}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual((self.stock(self.phone), self.stock(self.case)), (5, 7))
+        self.assertEqual(StockReservation.objects.get().product_id, self.case.id)
+
+    def test_confirming_keeps_the_stock(self):
+        order = Order.objects.get(pk=self.place((self.phone, 2)).data["id"])
+
+        order.status = Order.StatusChoices.PREPARING
+        order.save()
+
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self.stock(self.phone), 3)
+
+    def test_editing_a_confirmed_order_returns_its_old_items(self):
+        order = Order.objects.get(pk=self.place((self.phone, 2)).data["id"])
+        order.status = Order.StatusChoices.PREPARING
+        order.save()
+        payload = {"items": [{"product": self.phone.id, "quantity": 2}]}
+
+        res = self.client.put(detail_url(order.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.stock(self.phone), 3)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_bulk_shipping_settles_reservations(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", name="Admin", password="pass123"
+        )
+        order = Order.objects.get(pk=self.place((self.phone, 2)).data["id"])
+        self.client.force_login(admin)
+
+        self.client.post(
+            reverse("admin:order_order_changelist"),
+            {"action": "mark_shipped", "_selected_action": [order.id]},
+        )
+        order.refresh_from_db()
+        order.delete()
+
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self.stock(self.phone), 3)
+
+    def test_bulk_shipping_skips_cancelled_orders(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", name="Admin", password="pass123"
+        )
+        cancelled = Order.objects.get(pk=self.place((self.phone, 2)).data["id"])
+        cancelled.status = Order.StatusChoices.CANCELLED
+        cancelled.save()
+        pending = Order.objects.get(pk=self.place((self.case, 1)).data["id"])
+        self.client.force_login(admin)
+
+        res = self.client.post(
+            reverse("admin:order_order_changelist"),
+            {"action": "mark_shipped", "_selected_action": [cancelled.id, pending.id]},
+            follow=True,
+        )
+
+        cancelled.refresh_from_db()
+        self.assertEqual(cancelled.status, Order.StatusChoices.CANCELLED)
+        self.assertFalse(cancelled.outbox_emails.exists())
+        self.assertEqual(self.stock(self.phone), 5)
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, Order.StatusChoices.RECIEVED)
+        self.assertContains(res, "1 orders marked as shipped, 1 already shipped")
+
+    def test_sweeper_releases_expired_reservations(self):
+        expired = Order.objects.get(pk=self.place((self.phone, 2)).data["id"])
+        current = Order.objects.get(pk=self.place((self.phone, 1)).data["id"])
+        expired.reservations.update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        out = StringIO()
+        call_command("release_expired_reservations", batch_size=1, stdout=out)
+
+        self.assertIn("Cancelled 1 expired orders", out.getvalue())
+        expired.refresh_from_db()
+        current.refresh_from_db()
+        self.assertEqual(expired.status, Order.StatusChoices.CANCELLED)
+        self.assertEqual(current.status, Order.StatusChoices.PENDING)
+        self.assertEqual(self.stock(self.phone), 4)
+        self.assertEqual(StockReservation.objects.get().order_id, current.id)
+
+        res = self.client.patch(
+            detail_url(expired.id),
+            {"items": [{"product": self.phone.id, "quantity": 1}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,13 +1,78 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAdminUser
+from ecommerce.viewsets import SerializationTimingMixin
+from .export import (
+    CONTENT_TYPES,
+    OrderExportFilterSerializer,
+    aiter_chunks,
+    export_orders,
+)
+from .idempotency import (
+    claim_key,
+    get_cached_entry,
+    get_fingerprint,
+    get_idempotency_key,
+    replay_response,
+    store_response,
+)
 from .models import Order
 from .serializers import OrderSerializer
 from .permissions import IsAuthenticatedAndOrderOwner
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(SerializationTimingMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticatedAndOrderOwner]
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["created_at"]
+    ordering = ["-created_at"]
 
     def get_queryset(self):
+        return (
+            Order.objects.filter(user=self.request.user)
+            .select_related("user")
+            .prefetch_related("items")
+        )
 
-        return Order.objects.filter(user=self.request.user)
+    def create(self, request, *args, **kwargs):
+        key = get_idempotency_key(request)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+
+        fingerprint = get_fingerprint(request.data)
+        entry = get_cached_entry(request.user, key)
+        if entry is None:
+            with transaction.atomic():
+                entry = claim_key(request.user, key, fingerprint)
+                if entry is None:
+                    response = super().create(request, *args, **kwargs)
+                    store_response(request.user, key, fingerprint, response)
+                    return response
+        return replay_response(entry, fingerprint)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAdminUser],
+        filter_backends=[],
+    )
+    def export(self, request):
+        """Stream every order with its items as NDJSON or CSV (staff only)."""
+        params = OrderExportFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        output = filters.pop("output")
+
+        chunks = export_orders(output, **filters)
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[output])
+        filename = f"orders-{timezone.localdate():%Y%m%d}.{output}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,330 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import chain, groupby
+from django.db import transaction
+from django.db.models.functions import Now
+from .cache import bump_versions, reset_versions
+from .models import Brand, Category, Product
+from .search import refresh_search_vectors
+
+""" Streaming CSV/JSONL product import (upsert on sku) and export """
+
+FIELDS = [
+    "sku",
+    "name",
+    "description",
+    "price",
+    "in_stock",
+    "brand",
+    "category",
+    "image",
+]
+REQUIRED_FIELDS = ["sku", "name", "brand"]
+CATEGORY_SEPARATOR = " > "
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+MAX_PRICE = Decimal("1e8")
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_csv(file):
+    """Return the columns and an iterator of `(line, row)` pairs."""
+    reader = csv.DictReader(file)
+    columns = reader.fieldnames or []
+    return columns, ((reader.line_num, row) for row in reader)
+
+
+def _jsonl_rows(file):
+    for line, text in enumerate(file, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+def read_jsonl(file):
+    """Return the columns of the first object and an iterator of `(line, row)` pairs."""
+    rows = _jsonl_rows(file)
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    return list(first[1] or {}), chain([first], rows)
+
+
+def write_csv(file, rows):
+    writer = csv.DictWriter(file, FIELDS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        yield count
+
+
+def write_jsonl(file, rows):
+    for count, row in enumerate(rows, 1):
+        file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        yield count
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+def parse_text(row, name, max_length=None, required=False):
+    value = row.get(name)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f"{name} is required.")
+    if max_length is not None and len(value) > max_length:
+        raise RowError(f"{name} is longer than {max_length} characters.")
+    return value
+
+
+def parse_price(value):
+    if value in (None, ""):
+        return Decimal("0.00")
+    try:
+        price = Decimal(str(value)).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise RowError(f"Invalid price: {value!r}.")
+    if not 0 <= price < MAX_PRICE:
+        raise RowError(f"Price out of range: {value!r}.")
+    return price
+
+
+def parse_bool(value):
+    if value in (None, ""):
+        return True
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).strip().lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise RowError(f"Invalid in_stock: {value!r}.")
+
+
+def parse_category(value):
+    if not value:
+        return None
+    path = tuple(part.strip() for part in str(value).split(CATEGORY_SEPARATOR.strip()))
+    if not all(path) or any(len(name) > 100 for name in path):
+        raise RowError(f"Invalid category: {value!r}.")
+    return path
+
+
+class BrandResolver:
+    """Brand name -> id, creating missing brands in bulk."""
+
+    def __init__(self):
+        self.ids = {}
+        self.created = 0
+
+    def resolve(self, names):
+        missing = set(names) - self.ids.keys()
+        if missing:
+            # Names are not unique; the oldest brand wins.
+            for pk, name in (
+                Brand.objects.filter(name__in=missing)
+                .order_by("-id")
+                .values_list("pk", "name")
+            ):
+                self.ids[name] = pk
+            new = sorted(missing - self.ids.keys())
+            for brand in Brand.objects.bulk_create(Brand(name=name) for name in new):
+                self.ids[brand.name] = brand.pk
+            self.created += len(new)
+        return self.ids
+
+
+class CategoryResolver:
+    """
+    Category path -> id, e.g. `("Electronics", "Phones")`.
+
+    The tree is loaded once. Missing categories are created in bulk, a level
+    at a time, with placeholder tree fields; call `rebuild` in the same
+    transaction to fix those up.
+    """
+
+    def __init__(self):
+        categories = {
+            pk: (name, parent_id)
+            for pk, name, parent_id in Category.objects.order_by("-id").values_list(
+                "pk", "name", "parent_id"
+            )
+        }
+        self.paths = {}
+        for pk in categories:
+            path = []
+            node = pk
+            while node is not None:
+                name, node = categories[node]
+                path.append(name)
+            self.paths[pk] = tuple(reversed(path))
+        # Paths are not unique either; the oldest category wins.
+        self.ids = {path: pk for pk, path in self.paths.items()}
+        self.created = 0
+        self.unbuilt = False
+
+    def resolve(self, paths):
+        missing = {
+            path[:depth] for path in paths for depth in range(1, len(path) + 1)
+        } - self.ids.keys()
+        for _, level in groupby(sorted(missing, key=len), key=len):
+            level = list(level)
+            created = Category.objects.bulk_create(
+                Category(
+                    name=path[-1],
+                    parent_id=self.ids.get(path[:-1]),
+                    tree_id=0,
+                    lft=0,
+                    rght=0,
+                    level=0,
+                )
+                for path in level
+            )
+            for path, category in zip(level, created):
+                self.ids[path] = category.pk
+            self.created += len(level)
+            self.unbuilt = True
+        return self.ids
+
+    def rebuild(self):
+        """Fix up the tree if `resolve` created categories; return whether it did."""
+        if not self.unbuilt:
+            return False
+        Category.objects.rebuild()
+        # Moved tree fields are part of every category's output.
+        Category.objects.update(updated_at=Now())
+        self.unbuilt = False
+        return True
+
+
+class ProductImporter:
+    """
+    Upserts products by `sku`, one transaction per batch.
+
+    Brand and category names are resolved through in-memory maps, products
+    are written with a single `INSERT ... ON CONFLICT (sku) DO UPDATE`, and
+    their search vectors and cache versions are refreshed. Only the fields
+    present in the input are updated on existing products. New categories
+    are fitted into the tree before their batch commits, so a failed import
+    never leaves the tree half built.
+    """
+
+    def __init__(self, columns):
+        missing = [name for name in REQUIRED_FIELDS if name not in columns]
+        if missing:
+            raise RowError(f"Missing columns: {', '.join(missing)}.")
+        self.columns = [name for name in FIELDS if name in columns]
+        self.update_fields = [name for name in self.columns if name != "sku"]
+        self.update_fields.append("updated_at")
+        self.brands = BrandResolver()
+        self.categories = CategoryResolver()
+
+    def parse_row(self, row):
+        if row is None:
+            raise RowError("Not a JSON object.")
+        values = {
+            "sku": parse_text(row, "sku", 64, required=True),
+            "name": parse_text(row, "name", 100, required=True),
+            "brand": parse_text(row, "brand", 100, required=True),
+        }
+        if "description" in self.columns:
+            values["description"] = parse_text(row, "description")
+        if "price" in self.columns:
+            values["price"] = parse_price(row.get("price"))
+        if "in_stock" in self.columns:
+            values["in_stock"] = parse_bool(row.get("in_stock"))
+        if "category" in self.columns:
+            values["category"] = parse_category(row.get("category"))
+        if "image" in self.columns:
+            values["image"] = parse_text(row, "image", 100) or None
+        return values
+
+    def import_batch(self, rows):
+        """Upsert `(line, row)` pairs; return the count and `(line, error)` pairs."""
+        parsed, errors = {}, []
+        for line, row in rows:
+            try:
+                values = self.parse_row(row)
+            except RowError as exc:
+                errors.append((line, str(exc)))
+                continue
+            # One statement cannot update the same row twice; the last row wins.
+            parsed.pop(values["sku"], None)
+            parsed[values["sku"]] = values
+        if not parsed:
+            return 0, errors
+
+        with transaction.atomic():
+            brands = self.brands.resolve(values["brand"] for values in parsed.values())
+            categories = self.categories.resolve(
+                values["category"]
+                for values in parsed.values()
+                if values.get("category")
+            )
+            products = []
+            for values in parsed.values():
+                values["brand_id"] = brands[values.pop("brand")]
+                if "category" in values:
+                    path = values.pop("category")
+                    values["category_id"] = categories[path] if path else None
+                products.append(Product(**values))
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=["sku"],
+                update_fields=self.update_fields,
+            )
+            imported = Product.objects.filter(sku__in=parsed)
+            # The upsert skips Product.save(), which keeps in_stock in line
+            # with tracked stock.
+            imported.sync_in_stock()
+            refresh_search_vectors(imported)
+            product_ids = list(imported.values_list("pk", flat=True))
+            rebuilt = self.categories.rebuild()
+
+        reset_versions(*(f"product:{pk}" for pk in product_ids))
+        bump_versions("products", "search", *(["categories"] if rebuilt else []))
+        return len(parsed), errors
+
+
+def export_rows():
+    """Yield every product as a dict keyed by `FIELDS`, streaming from the database."""
+    paths = {
+        pk: CATEGORY_SEPARATOR.join(path) for path, pk in CategoryResolver().ids.items()
+    }
+    rows = (
+        Product.objects.order_by("id")
+        .values(
+            "sku",
+            "name",
+            "description",
+            "price",
+            "in_stock",
+            "brand__name",
+            "category_id",
+            "image",
+        )
+        .iterator(chunk_size=2000)
+    )
+    for row in rows:
+        yield {
+            "sku": row["sku"] or "",
+            "name": row["name"],
+            "description": row["description"],
+            "price": str(row["price"]),
+            "in_stock": row["in_stock"],
+            "brand": row["brand__name"],
+            "category": paths.get(row["category_id"], ""),
+            "image": row["image"] or "",
+        }
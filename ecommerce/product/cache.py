@@ -0,0 +1,195 @@
+import json
+import time
+from hashlib import sha1
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from ecommerce.viewsets import get_not_modified_response, set_validators
+
+""" Version counters: "products", "categories", "product:<id>" and "search" """
+
+VERSION_KEY = "catalogue:version:{}"
+# Entries are (data, etag, last_modified) tuples.
+RESPONSE_KEY = "catalogue:response:v2:{}"
+
+
+def get_cache():
+    return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+
+def _initial_version():
+    # A counter that was evicted restarts from the clock, never from a value
+    # an older cached response might still be stored under.
+    return time.time_ns()
+
+
+def get_versions(*scopes):
+    cache = get_cache()
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in versions}
+    for key, version in missing.items():
+        if not cache.add(key, version, timeout=None):
+            missing[key] = cache.get(key, version)
+    versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """
+    Invalidate `scopes` once the current transaction commits (now, outside one).
+
+    Bumping earlier would let a concurrent request cache the old rows under
+    the new version, where they would be served until they expire.
+    """
+    transaction.on_commit(lambda: _bump_versions(scopes))
+
+
+def _bump_versions(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def reset_versions(*scopes):
+    """Invalidate many scopes in one round trip, on commit like `bump_versions`."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    # The counters restart from the clock.
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+class VersionedCacheMixin:
+    """
+    Read-through cache for `list` and `retrieve`.
+
+    Responses are stored under the version counters of the scopes they depend
+    on, so bumping a counter makes every response built from it unreachable.
+    """
+
+    cache_list_scopes = ["products"]
+    cache_detail_scope = "product:{pk}"
+
+    def list(self, request, *args, **kwargs):
+        fetch = super().list
+        return self.get_cached_response(
+            request, self.cache_list_scopes, lambda: fetch(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        fetch = super().retrieve
+        scope = self.cache_detail_scope.format(
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field]
+        )
+        return self.get_cached_response(
+            request, [scope], lambda: fetch(request, *args, **kwargs)
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        fetch = super().alist
+        return await self.aget_cached_response(
+            request, self.cache_list_scopes, lambda: fetch(request, *args, **kwargs)
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        fetch = super().aretrieve
+        scope = self.cache_detail_scope.format(
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field]
+        )
+        return await self.aget_cached_response(
+            request, [scope], lambda: fetch(request, *args, **kwargs)
+        )
+
+    def get_cache_params(self):
+        names = {api_settings.ORDERING_PARAM}
+        if getattr(self, "fields_query_param", None):
+            names.add(self.fields_query_param)
+        if self.filterset_class is not None:
+            names.update(self.filterset_class.base_filters)
+        paginator = self.paginator
+        if paginator is not None:
+            names.update(
+                getattr(paginator, name)
+                for name in ("cursor_query_param", "page_size_query_param")
+                if getattr(paginator, name, None)
+            )
+        return names
+
+    def get_cache_key(self, request, versions):
+        names = self.get_cache_params()
+        params = sorted(
+            (name, value)
+            for name in request.query_params
+            if name in names
+            for value in request.query_params.getlist(name)
+            if value != ""
+        )
+        renderer = getattr(request, "accepted_renderer", None)
+        raw = json.dumps(
+            [
+                request.get_host(),
+                request.path,
+                getattr(renderer, "format", None),
+                versions,
+                params,
+            ]
+        )
+        return RESPONSE_KEY.format(sha1(raw.encode()).hexdigest())
+
+    def lookup(self, request, scopes):
+        """Return the cache key for this request and the entry stored under it."""
+        key = self.get_cache_key(request, get_versions(*scopes))
+        return key, get_cache().get(key)
+
+    def make_entry(self, response):
+        return (
+            response.data,
+            response.get("ETag"),
+            parse_http_date_safe(response.get("Last-Modified", "")),
+        )
+
+    def get_entry_response(self, request, entry):
+        data, etag, last_modified = entry
+        # A matching validator is answered without rendering the cached data.
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = set_validators(Response(data), etag, last_modified)
+        return response
+
+    def get_cached_response(self, request, scopes, fetch):
+        if request.user.is_staff:
+            return fetch()
+
+        key, entry = self.lookup(request, scopes)
+        if entry is not None:
+            return self.get_entry_response(request, entry)
+
+        response = fetch()
+        if response.status_code == 200:
+            get_cache().set(
+                key, self.make_entry(response), settings.CATALOGUE_CACHE_TIMEOUT
+            )
+        return response
+
+    async def aget_cached_response(self, request, scopes, fetch):
+        if request.user.is_staff:
+            return await fetch()
+
+        # One worker-thread hop for the version counters and the entry.
+        key, entry = await sync_to_async(self.lookup)(request, scopes)
+        if entry is not None:
+            return self.get_entry_response(request, entry)
+
+        response = await fetch()
+        if response.status_code == 200:
+            await get_cache().aset(
+                key, self.make_entry(response), settings.CATALOGUE_CACHE_TIMEOUT
+            )
+        return response
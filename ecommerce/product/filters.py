@@ -1,9 +1,32 @@
+from collections import defaultdict
+from threading import Lock
 from django_filters import rest_framework as filters
-from django.db.models import Avg
+from django.db.models import Q
+from .cache import get_versions
 from .models import Product, Category, Comment
 
 """ /api/products/?id=&name=&brand=&category=&price=&in_stock=&price_min=&price_max=&average_rating_min= """
 
+_category_ranges = None
+_category_ranges_version = None
+_category_ranges_lock = Lock()
+
+
+def get_category_ranges():
+    """Map lowercase category names to their MPTT (tree_id, lft, rght) ranges."""
+    global _category_ranges, _category_ranges_version
+    version = get_versions("categories")[0]
+    with _category_ranges_lock:
+        if _category_ranges is None or _category_ranges_version != version:
+            ranges = defaultdict(list)
+            for name, tree_id, lft, rght in Category.objects.values_list(
+                "name", "tree_id", "lft", "rght"
+            ):
+                ranges[name.lower()].append((tree_id, lft, rght))
+            _category_ranges = dict(ranges)
+            _category_ranges_version = version
+        return _category_ranges
+
 
 class ProductFilter(filters.FilterSet):
     id = filters.NumberFilter()
@@ -12,7 +35,9 @@ class ProductFilter(filters.FilterSet):
     category = filters.CharFilter(method="filter_category")
     price_min = filters.NumberFilter(field_name="price", lookup_expr="gte")
     price_max = filters.NumberFilter(field_name="price", lookup_expr="lte")
-    average_rating_min = filters.NumberFilter(method="filter_average_rating")
+    average_rating_min = filters.NumberFilter(
+        field_name="average_rating", lookup_expr="gte"
+    )
     in_stock = filters.BooleanFilter(field_name="in_stock")
 
     class Meta:
@@ -20,17 +45,19 @@ class ProductFilter(filters.FilterSet):
         fields = ["id", "name", "brand", "category", "in_stock"]
 
     def filter_category(self, queryset, name, value):
-        try:
-            category = Category.objects.get(name__iexact=value)
-            descendants = category.get_descendants(include_self=True)
-            return queryset.filter(category__in=descendants)
-        except Category.DoesNotExist:
+        """?category=phones,laptops matches products anywhere below either category"""
+        ranges = get_category_ranges()
+        condition = Q()
+        for category_name in value.split(","):
+            for tree_id, lft, rght in ranges.get(category_name.strip().lower(), []):
+                condition |= Q(
+                    category__tree_id=tree_id,
+                    category__lft__gte=lft,
+                    category__lft__lte=rght,
+                )
+        if not condition:
             return queryset.none()
-
-    def filter_average_rating(self, queryset, name, value):
-        return queryset.annotate(avg_rating=Avg("comments__rating")).filter(
-            avg_rating__gte=value
-        )
+        return queryset.filter(condition)
 
 
 class CommentFilter(filters.FilterSet):
@@ -0,0 +1,127 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from threading import Lock
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.db.models.functions import Now
+from PIL import Image, ImageOps
+from .cache import bump_versions
+from .models import Product
+
+""" Resized WebP + JPEG/PNG product image variants under content-hashed names """
+
+VARIANT_PATH = "images/variants/{digest}.{extension}"
+
+# What a broken or hostile upload can raise while being decoded.
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+logger = logging.getLogger(__name__)
+
+
+def save_variant(image, format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **options)
+    content = buffer.getvalue()
+    name = VARIANT_PATH.format(
+        digest=sha256(content).hexdigest()[:32],
+        extension="jpg" if format == "JPEG" else format.lower(),
+    )
+    # Identical bytes always map to the same name, so existing files are final.
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return name
+
+
+def render_variants(image_name):
+    """Write every size preset of `image_name` and return the variants mapping."""
+    with default_storage.open(image_name, "rb") as file:
+        image = Image.open(io.BytesIO(file.read()))
+        image = ImageOps.exif_transpose(image)
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    if has_alpha:
+        fallback = {"format": "PNG", "optimize": True}
+    else:
+        fallback = {
+            "format": "JPEG",
+            "quality": settings.PRODUCT_IMAGE_JPEG_QUALITY,
+            "optimize": True,
+            "progressive": True,
+        }
+
+    presets = {}
+    for preset, size in settings.PRODUCT_IMAGE_PRESETS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        presets[preset] = {
+            "width": resized.width,
+            "height": resized.height,
+            "webp": save_variant(
+                resized,
+                "WEBP",
+                quality=settings.PRODUCT_IMAGE_WEBP_QUALITY,
+                method=6,
+            ),
+            "fallback": save_variant(resized, **fallback),
+        }
+    return {"source": image_name, "presets": presets}
+
+
+def apply_variants(product_id, image_name, variants):
+    """Store `variants` unless the product's image changed in the meantime."""
+    updated = Product.objects.filter(pk=product_id, image=image_name).update(
+        image_variants=variants, updated_at=Now()
+    )
+    if updated:
+        bump_versions("products", f"product:{product_id}")
+    return bool(updated)
+
+
+def generate_variants(product_id, image_name):
+    try:
+        apply_variants(product_id, image_name, render_variants(image_name))
+    except IMAGE_ERRORS:
+        logger.exception("Could not render variants of %s", image_name)
+
+
+def _generate_in_worker(product_id, image_name):
+    try:
+        generate_variants(product_id, image_name)
+    finally:
+        # Worker threads outlive requests, so nothing else recycles their
+        # database connections.
+        close_old_connections()
+
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PRODUCT_IMAGE_WORKERS,
+                thread_name_prefix="image-variants",
+            )
+        return _executor
+
+
+def schedule_variants(product_id, image_name):
+    """
+    Render variants off the request thread.
+
+    Pillow releases the GIL while resizing and encoding. Jobs lost to a
+    restart are picked up by `generate_image_variants`. With
+    `PRODUCT_IMAGE_WORKERS = 0` the variants are rendered inline.
+    """
+    if not settings.PRODUCT_IMAGE_WORKERS:
+        generate_variants(product_id, image_name)
+        return None
+    return get_executor().submit(_generate_in_worker, product_id, image_name)
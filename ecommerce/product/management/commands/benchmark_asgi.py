@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ecommerce import loadtest
+
+SERVERS = {
+    "wsgi": [
+        "gunicorn",
+        "ecommerce.wsgi:application",
+        "--bind=127.0.0.1:{port}",
+        "--workers={workers}",
+        "--threads={threads}",
+    ],
+    "asgi": [
+        "uvicorn",
+        "ecommerce.asgi:application",
+        "--port={port}",
+        "--workers={workers}",
+        "--no-access-log",
+    ],
+}
+
+
+class Command(BaseCommand):
+    """Django command to compare the WSGI and ASGI servers under concurrent load."""
+
+    help = (
+        "Start gunicorn (WSGI, sync views) and uvicorn (ASGI, async read views) "
+        "in turn against the configured database, drive the catalogue read "
+        "endpoints with concurrent keep-alive clients and report requests/second "
+        "and p50/p99 latency for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=100)
+        parser.add_argument("--duration", type=float, default=15.0)
+        parser.add_argument("--slow-send", type=float, default=0.0)
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Endpoint to request (repeatable, default: product and comment lists)",
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def wait_for_port(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError("The server exited during start-up.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Nothing is listening on port {port}.")
+
+    def run_server(self, name, options, urls):
+        command = [part.format(**options) for part in SERVERS[name]]
+        env = {**os.environ, "ASYNC_READ_VIEWS": str(name == "asgi").lower()}
+        process = subprocess.Popen(
+            [sys.executable, "-m", *command],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_for_port(options["port"], process)
+            # Warm caches and connections before measuring.
+            asyncio.run(loadtest.run(urls, concurrency=4, duration=2))
+            return asyncio.run(
+                loadtest.run(
+                    urls,
+                    concurrency=options["concurrency"],
+                    duration=options["duration"],
+                    slow_send=options["slow_send"],
+                )
+            )
+        finally:
+            process.terminate()
+            process.wait()
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["/api/products/", "/api/comments/"]
+        urls = [f"http://127.0.0.1:{options['port']}{path}" for path in paths]
+
+        results = {name: self.run_server(name, options, urls) for name in SERVERS}
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{name}: {result['requests_per_second']} req/s, "
+                    f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+                    f"statuses {result['statuses']}"
+                )
+            )
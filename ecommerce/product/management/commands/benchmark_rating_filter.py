@@ -0,0 +1,129 @@
+import random
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.db.models import Avg
+from product.models import Brand, Comment, Product
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Django command to compare rating filters on aggregated and stored values."""
+
+    help = (
+        "Seed products and comments inside a transaction, time the "
+        "`average_rating_min` + `ordering=-average_rating` page query computed "
+        "with annotate(Avg) against the stored average_rating column, then roll "
+        "everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=1_000_000)
+        parser.add_argument("--products", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--min-rating", type=float, default=4.0)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def seed(self, options):
+        products = options["products"]
+        users = -(-options["comments"] // products)
+        brand = Brand.objects.create(name="Benchmark Brand")
+        product_ids = [
+            product.id
+            for product in Product.objects.bulk_create(
+                Product(name=f"Benchmark product {i}", brand=brand)
+                for i in range(products)
+            )
+        ]
+        user_ids = [
+            user.id
+            for user in get_user_model().objects.bulk_create(
+                get_user_model()(
+                    email=f"benchmark{i}@example.com",
+                    name=f"Benchmark {i}",
+                    password="!",
+                )
+                for i in range(users)
+            )
+        ]
+
+        # Insert through a plain queryset and refresh the aggregates once at
+        # the end, instead of after every batch.
+        comments = models.QuerySet(Comment)
+        batch_size = options["batch_size"]
+        for start in range(0, options["comments"], batch_size):
+            stop = min(start + batch_size, options["comments"])
+            comments.bulk_create(
+                Comment(
+                    product_id=product_ids[i % products],
+                    user_id=user_ids[i // products],
+                    comment_text="",
+                    rating=random.randint(1, 5),
+                )
+                for i in range(start, stop)
+            )
+        Product.objects.filter(brand=brand).refresh_ratings()
+
+    def get_queries(self, options):
+        page = options["page_size"]
+        value = options["min_rating"]
+        return {
+            "annotate(Avg)": Product.objects.annotate(
+                avg_rating=Avg("comments__rating")
+            )
+            .filter(avg_rating__gte=value)
+            .order_by("-avg_rating", "-id")[:page],
+            "stored average_rating": Product.objects.filter(
+                average_rating__gte=value
+            ).order_by("-average_rating", "-id")[:page],
+        }
+
+    def time_query(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                self.seed(options)
+                self.stdout.write(
+                    f"Seeded {options['comments']} comments on "
+                    f"{options['products']} products in "
+                    f"{time.perf_counter() - started:.1f} s"
+                )
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE product_product, product_comment")
+
+                results = {}
+                for name, queryset in self.get_queries(options).items():
+                    results[name] = self.time_query(queryset, options["repeat"])
+                    self.stdout.write(
+                        self.style.MIGRATE_HEADING(
+                            f"\n{name}: {results[name]:.2f} ms (median)"
+                        )
+                    )
+                    self.stdout.write(queryset.explain())
+                raise Rollback
+        except Rollback:
+            pass
+
+        aggregated, stored = results["annotate(Avg)"], results["stored average_rating"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nStored column is {aggregated / max(stored, 0.001):.1f}x faster "
+                "(seed data rolled back)."
+            )
+        )
@@ -0,0 +1,129 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ecommerce.viewsets import RowSerializer
+from product.models import Brand, Category, Product
+from product.serializers import ProductSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Django command to compare product list serialization strategies."""
+
+    help = (
+        "Seed products inside a transaction and report rows/second for the "
+        "full ModelSerializer, only() with sparse fields and the values() fast "
+        "path, then roll everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=20_000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--fields",
+            default="id,name,price,average_rating",
+            help="Comma-separated fields for the sparse runs.",
+        )
+
+    def seed(self, options):
+        brand = Brand.objects.create(name="Benchmark Brand")
+        category = Category.objects.create(name="Benchmark Category")
+        Product.objects.bulk_create(
+            Product(
+                name=f"Benchmark product {i}",
+                description="Benchmark description " * 20,
+                price=i % 1000,
+                brand=brand,
+                category=category,
+            )
+            for i in range(options["products"])
+        )
+        return Product.objects.filter(brand=brand).order_by("id")
+
+    def get_strategies(self, queryset, fields):
+        request = Request(APIRequestFactory().get("/api/products/"))
+        context = {"request": request}
+        sources = {"number_of_ratings": "rating_count"}
+
+        def sparse_serializer():
+            serializer = ProductSerializer(context=context)
+            for name in set(serializer.fields) - set(fields):
+                serializer.fields.pop(name)
+            return serializer
+
+        def full():
+            return ProductSerializer(queryset, many=True, context=context).data
+
+        def only():
+            serializer = ProductSerializer(
+                queryset.only(*(sources.get(name, name) for name in fields)),
+                many=True,
+                context=context,
+            )
+            child = serializer.child
+            for name in set(child.fields) - set(fields):
+                child.fields.pop(name)
+            return serializer.data
+
+        def values():
+            columns = {name: sources.get(name, name) for name in fields}
+            rows = queryset.values(*columns.values())
+            return RowSerializer(sparse_serializer(), columns, rows).data
+
+        def values_all():
+            serializer = ProductSerializer(context=context)
+            columns = {
+                name: sources.get(name, field.source)
+                for name, field in serializer.fields.items()
+            }
+            rows = queryset.values(*columns.values())
+            return RowSerializer(serializer, columns, rows).data
+
+        return {
+            "ModelSerializer (all fields)": full,
+            "values() fast path (all fields)": values_all,
+            "only() + sparse fields": only,
+            "values() fast path + sparse fields": values,
+        }
+
+    def time_strategy(self, strategy, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(strategy())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return rows / best
+
+    def handle(self, *args, **options):
+        fields = [name.strip() for name in options["fields"].split(",")]
+        unknown = set(fields) - set(ProductSerializer().fields)
+        if unknown:
+            self.stderr.write(f"Unknown fields: {', '.join(sorted(unknown))}")
+            return
+
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+        results = {}
+        try:
+            with transaction.atomic():
+                queryset = self.seed(options)
+                for name, strategy in self.get_strategies(queryset, fields).items():
+                    results[name] = self.time_strategy(strategy, options["repeat"])
+                    self.stdout.write(f"{name}: {results[name]:,.0f} rows/s")
+                raise Rollback
+        except Rollback:
+            pass
+
+        baseline = results["ModelSerializer (all fields)"]
+        fastest = max(results, key=results.get)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{fastest} is {results[fastest] / baseline:.1f}x the "
+                "ModelSerializer throughput (seed data rolled back)."
+            )
+        )
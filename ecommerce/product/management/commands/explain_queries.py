@@ -0,0 +1,66 @@
+import time
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection
+from product.models import Product, Comment
+from order.models import Order
+
+
+class Command(BaseCommand):
+    """Django command to print query plans and timings for the hot API queries."""
+
+    help = (
+        "Print EXPLAIN output and timings for the filtered and ordered catalogue "
+        "and order queries. Run it before and after `migrate` to compare plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Use EXPLAIN ANALYZE (PostgreSQL only).",
+        )
+
+    def get_queries(self):
+        product = Product.objects.order_by("-rating_count").first()
+        user = get_user_model().objects.order_by("-id").first()
+        return {
+            "product price range in stock": Product.objects.filter(
+                in_stock=True, price__gte=10, price__lte=100
+            ).order_by("price", "id")[:20],
+            "product name icontains": Product.objects.filter(
+                name__icontains="pro"
+            ).order_by("id")[:20],
+            "product brand icontains": Product.objects.filter(
+                brand__name__icontains="bra"
+            ).order_by("id")[:20],
+            "product keyset page by name": Product.objects.filter(
+                name__gt="m"
+            ).order_by("name", "id")[:20],
+            "comments of a product": Comment.objects.filter(product=product).order_by(
+                "created_at"
+            ),
+            "latest comments": Comment.objects.order_by("-created_at", "-id")[:20],
+            "order history of a user": Order.objects.filter(user=user).order_by(
+                "-created_at", "-id"
+            )[:20],
+            "shipped orders in a period": Order.objects.filter(
+                status=Order.StatusChoices.RECIEVED
+            ).order_by("created_at")[:20],
+        }
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+        for name, queryset in self.get_queries().items():
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - started) / options["repeat"] * 1000
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}: {elapsed:.2f} ms"))
+            self.stdout.write(queryset.explain(**explain_options))
@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from product.bulk import WRITERS, export_rows
+
+
+class Command(BaseCommand):
+    """Django command to export products as CSV or JSONL."""
+
+    help = (
+        "Stream every product to a CSV or JSONL file (or stdout) in the "
+        "format import_products reads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-")
+        parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+
+    def handle(self, *args, **options):
+        writer = WRITERS[options["format"]]
+        started = time.perf_counter()
+        count = 0
+        if options["path"] == "-":
+            for count in writer(self.stdout, export_rows()):
+                pass
+        else:
+            with open(options["path"], "w", newline="", encoding="utf-8") as file:
+                for count in writer(file, export_rows()):
+                    pass
+
+        # Progress goes to stderr so it never ends up in an exported stream.
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Exported {count} products in {elapsed:.1f} s, "
+                f"{count / max(elapsed, 1e-6):,.0f} rows/s."
+            )
+        )
@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import django
+from django.core.management.base import BaseCommand
+from product.images import IMAGE_ERRORS, apply_variants, render_variants
+from product.models import Product
+
+
+class Command(BaseCommand):
+    """Django command to generate product image variants."""
+
+    help = (
+        "Render the size presets of every product image without up-to-date "
+        "variants, in parallel across CPU cores. --force re-renders all of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--force", action="store_true")
+
+    def get_jobs(self, force):
+        rows = (
+            Product.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("pk", "image", "image_variants")
+            .iterator(chunk_size=2000)
+        )
+        return [
+            (product_id, image_name)
+            for product_id, image_name, variants in rows
+            if force or variants.get("source") != image_name
+        ]
+
+    def handle(self, *args, **options):
+        jobs = self.get_jobs(options["force"])
+        started = time.perf_counter()
+        done = failed = 0
+
+        # Children only decode, resize and write files; the database is
+        # updated from this process. Forked children inherit the configured
+        # settings and storage.
+        with ProcessPoolExecutor(
+            max_workers=max(options["workers"], 1),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=django.setup,
+        ) as executor:
+            futures = {
+                executor.submit(render_variants, image_name): (product_id, image_name)
+                for product_id, image_name in jobs
+            }
+            for future in as_completed(futures):
+                product_id, image_name = futures[future]
+                try:
+                    variants = future.result()
+                except IMAGE_ERRORS as exc:
+                    failed += 1
+                    self.stderr.write(f"{image_name}: {exc}")
+                    continue
+                apply_variants(product_id, image_name, variants)
+                done += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered variants for {done} images ({failed} failed) in "
+                f"{time.perf_counter() - started:.1f} s."
+            )
+        )
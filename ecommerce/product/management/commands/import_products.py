@@ -0,0 +1,74 @@
+import sys
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from product.bulk import READERS, ProductImporter, RowError
+
+
+class Command(BaseCommand):
+    """Django command to import products from a CSV or JSONL feed."""
+
+    help = (
+        "Stream products from a CSV or JSONL file (or - for stdin) and upsert "
+        "them by sku in batches. Columns: sku, name, brand (required), "
+        "description, price, in_stock, category (e.g. 'Electronics > Phones'), "
+        "image. Missing brands and categories are created. Run "
+        "generate_image_variants afterwards if the feed sets images."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=sorted(READERS))
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--progress",
+            type=int,
+            default=50_000,
+            help="Report throughput every N rows.",
+        )
+
+    def get_format(self, options):
+        if options["format"]:
+            return options["format"]
+        extension = options["path"].rpartition(".")[2].lower()
+        if extension not in READERS:
+            raise CommandError("Pass --format for files without a .csv/.jsonl name.")
+        return extension
+
+    def handle(self, *args, **options):
+        reader = READERS[self.get_format(options)]
+        if options["path"] == "-":
+            self.import_file(sys.stdin, reader, options)
+        else:
+            with open(options["path"], newline="", encoding="utf-8-sig") as file:
+                self.import_file(file, reader, options)
+
+    def import_file(self, file, reader, options):
+        columns, rows = reader(file)
+        try:
+            importer = ProductImporter(columns)
+        except RowError as exc:
+            raise CommandError(str(exc))
+
+        started = time.perf_counter()
+        imported = rejected = reported = 0
+        while batch := list(islice(rows, options["batch_size"])):
+            count, errors = importer.import_batch(batch)
+            imported += count
+            rejected += len(errors)
+            for line, error in errors:
+                self.stderr.write(f"line {line}: {error}")
+            if imported - reported >= options["progress"]:
+                reported = imported
+                rate = imported / (time.perf_counter() - started)
+                self.stdout.write(f"{imported} rows ({rate:,.0f} rows/s)")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} products ({rejected} rejected, "
+                f"{importer.brands.created} brands and "
+                f"{importer.categories.created} categories created) in "
+                f"{elapsed:.1f} s, {imported / max(elapsed, 1e-6):,.0f} rows/s."
+            )
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from product.models import Product
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the stored product rating aggregates."""
+
+    help = "Recalculate rating_sum, rating_count and average_rating from comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "product_ids",
+            nargs="*",
+            type=int,
+            help="Only rebuild these products (default: all products).",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.all()
+        if options["product_ids"]:
+            queryset = queryset.filter(pk__in=options["product_ids"])
+
+        updated = queryset.refresh_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt rating aggregates for {updated} products.")
+        )
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+# The last state without the unique (product, user) review constraint.
+STATE = ("product", "0011_product_rating_aggregates")
+
+
+class Command(BaseCommand):
+    """Django command to remove duplicate reviews before the unique constraint."""
+
+    help = (
+        "Keep the oldest review of each (product, user) pair, delete the others "
+        "and recount the ratings of their products. Migration product 0012 "
+        "refuses to run while duplicates exist. Deleted reviews are printed and "
+        "cannot be restored; take a backup first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the reviews that would be deleted without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        # Models as of STATE, so this runs against the unmigrated schema.
+        apps = MigrationLoader(connection).project_state(STATE).apps
+        Product = apps.get_model("product", "Product")
+        Comment = apps.get_model("product", "Comment")
+
+        duplicates = (
+            Comment.objects.values("product", "user")
+            .annotate(keep=Min("id"), total=Count("id"))
+            .filter(total__gt=1)
+            .order_by("product", "user")
+        )
+        deleted = []
+        with transaction.atomic():
+            for duplicate in duplicates:
+                reviews = Comment.objects.filter(
+                    product=duplicate["product"], user=duplicate["user"]
+                ).exclude(id=duplicate["keep"])
+                for review_id, rating in reviews.values_list("id", "rating"):
+                    self.stdout.write(
+                        f"review {review_id} (product {duplicate['product']}, "
+                        f"user {duplicate['user']}, rating {rating}), "
+                        f"keeping review {duplicate['keep']}"
+                    )
+                    deleted.append((review_id, duplicate["product"]))
+            if options["dry_run"] or not deleted:
+                self.stdout.write(f"{len(deleted)} duplicate reviews found.")
+                return
+
+            Comment.objects.filter(pk__in=[pk for pk, _ in deleted]).delete()
+            comments = (
+                Comment.objects.filter(product=OuterRef("pk"))
+                .order_by()
+                .values("product")
+            )
+            Product.objects.filter(
+                pk__in={product_id for _, product_id in deleted}
+            ).update(
+                rating_sum=Coalesce(
+                    Subquery(comments.annotate(total=Sum("rating")).values("total")),
+                    0,
+                ),
+                rating_count=Coalesce(
+                    Subquery(comments.annotate(total=Count("pk")).values("total")), 0
+                ),
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {len(deleted)} duplicate reviews.")
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from product.models import Product
+from product.search import refresh_search_vectors, uses_search_vector
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the product full-text search vectors."""
+
+    help = "Recalculate Product.search_vector (PostgreSQL only)."
+
+    def handle(self, *args, **options):
+        if not uses_search_vector():
+            self.stdout.write(
+                "This database uses the in-process search index; nothing to do."
+            )
+            return
+
+        refresh_search_vectors(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS("Search vectors rebuilt."))
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    Comment = apps.get_model("product", "Comment")
+
+    comments = (
+        Comment.objects.filter(product=OuterRef("pk")).order_by().values("product")
+    )
+    Product.objects.update(
+        rating_sum=Coalesce(
+            Subquery(comments.annotate(total=Sum("rating")).values("total")), 0
+        ),
+        rating_count=Coalesce(
+            Subquery(comments.annotate(total=Count("pk")).values("total")), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0010_product_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
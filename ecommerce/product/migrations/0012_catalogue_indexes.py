@@ -0,0 +1,101 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+# icontains compiles to UPPER("column"::text) LIKE UPPER(%s) on PostgreSQL.
+TRIGRAM_INDEXES = [
+    ("product_name_trgm_idx", "product_product", "name"),
+    ("brand_name_trgm_idx", "product_brand", "name"),
+]
+MAX_LISTED_DUPLICATES = 20
+
+
+def check_duplicate_reviews(apps, schema_editor):
+    # Never delete reviews here; `remove_duplicate_reviews` does, on request.
+    Comment = apps.get_model("product", "Comment")
+
+    duplicates = list(
+        Comment.objects.values_list("product", "user")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .order_by("product", "user")
+    )
+    if duplicates:
+        pairs = ", ".join(
+            f"(product {product}, user {user}: {total} reviews)"
+            for product, user, total in duplicates[:MAX_LISTED_DUPLICATES]
+        )
+        if len(duplicates) > MAX_LISTED_DUPLICATES:
+            pairs += f" and {len(duplicates) - MAX_LISTED_DUPLICATES} more"
+        raise CommandError(
+            f"{len(duplicates)} (product, user) pairs have more than one review, "
+            f"which the unique_product_review constraint forbids: {pairs}. Run "
+            "`python manage.py remove_duplicate_reviews --dry-run` to see what "
+            "would be deleted, then without --dry-run, then migrate again."
+        )
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0011_product_rating_aggregates"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["product", "created_at"], name="comment_product_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["created_at", "id"], name="comment_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["in_stock", "price"], name="product_stock_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["price", "id"], name="product_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["name", "id"], name="product_name_id_idx"),
+        ),
+        migrations.RunPython(check_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="comment",
+            constraint=models.UniqueConstraint(
+                fields=("product", "user"), name="unique_product_review"
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
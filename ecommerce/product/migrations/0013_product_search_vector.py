@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+BACKFILL_SEARCH_VECTOR_SQL = """
+UPDATE product_product AS p SET search_vector =
+    setweight(to_tsvector('english', coalesce(p.name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(b.name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(a.name, ' ' ORDER BY a.lft)
+        FROM product_category AS c
+        JOIN product_category AS a
+            ON a.tree_id = c.tree_id AND a.lft <= c.lft AND a.rght >= c.rght
+        WHERE c.id = p.category_id
+    ), '')), 'C') ||
+    setweight(to_tsvector('english', coalesce(p.description, '')), 'D')
+FROM product_brand AS b
+WHERE b.id = p.brand_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(BACKFILL_SEARCH_VECTOR_SQL)
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS product_search_vector_idx "
+        "ON product_product USING gin (search_vector)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS product_search_vector_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0012_catalogue_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:46
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Avg, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_average_rating(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    Comment = apps.get_model("product", "Comment")
+
+    comments = (
+        Comment.objects.filter(product=OuterRef("pk")).order_by().values("product")
+    )
+    Product.objects.update(
+        average_rating=Coalesce(
+            Round(
+                Subquery(comments.annotate(average=Avg("rating")).values("average")),
+                2,
+            ),
+            Value(Decimal("0")),
+            output_field=models.DecimalField(max_digits=3, decimal_places=2),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0013_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="average_rating",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=3
+            ),
+        ),
+        migrations.RunPython(backfill_average_rating, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["average_rating", "id"], name="product_rating_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0017_product_sku"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="stock_quantity",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,12 +1,29 @@
+from decimal import Decimal
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Now, NullIf, Round
 from django.conf import settings
 from mptt.models import MPTTModel, TreeForeignKey
+from .cache import bump_versions
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
 class Category(MPTTModel):
     name = models.CharField(max_length=100)
     parent = TreeForeignKey("self", on_delete=models.PROTECT, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class MPTTMeta:
         order_insertion_by = ["name"]
@@ -17,35 +34,151 @@ class Category(MPTTModel):
 
 class Brand(models.Model):
     name = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
 
+def average_rating_expression(rating_sum, rating_count):
+    # Divide as floats and round as numeric, which works on every backend.
+    average = Cast(rating_sum, models.FloatField()) / NullIf(rating_count, 0)
+    return Coalesce(
+        Round(Cast(average, models.DecimalField(max_digits=3, decimal_places=2)), 2),
+        Value(Decimal("0")),
+    )
+
+
+class ProductQuerySet(models.QuerySet):
+    def adjust_ratings(self, rating_delta, count_delta):
+        rating_sum = F("rating_sum") + rating_delta
+        rating_count = F("rating_count") + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            average_rating=average_rating_expression(rating_sum, rating_count),
+            updated_at=Now(),
+        )
+
+    def refresh_ratings(self):
+        comments = (
+            Comment.objects.filter(product=OuterRef("pk")).order_by().values("product")
+        )
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(comments.annotate(total=Sum("rating")).values("total")), 0
+            ),
+            rating_count=Coalesce(
+                Subquery(comments.annotate(total=Count("pk")).values("total")), 0
+            ),
+            average_rating=Coalesce(
+                Round(
+                    Subquery(
+                        comments.annotate(average=Avg("rating")).values("average")
+                    ),
+                    2,
+                ),
+                Value(Decimal("0")),
+                output_field=models.DecimalField(max_digits=3, decimal_places=2),
+            ),
+            updated_at=Now(),
+        )
+
+    def touch(self):
+        """Move `updated_at` forward, e.g. after a change to embedded comments."""
+        return self.update(updated_at=Now())
+
+    def sync_in_stock(self):
+        """Flip `in_stock` on tracked products that sold out or were restocked."""
+        product_ids = list(
+            self.filter(
+                Q(in_stock=True, stock_quantity=0)
+                | Q(in_stock=False, stock_quantity__gt=0)
+            ).values_list("pk", flat=True)
+        )
+        if product_ids:
+            self.model.objects.filter(pk__in=product_ids).update(
+                in_stock=Case(
+                    When(stock_quantity__gt=0, then=Value(True)), default=Value(False)
+                ),
+                updated_at=Now(),
+            )
+            bump_versions("products", *(f"product:{pk}" for pk in product_ids))
+        return product_ids
+
+
 class Product(models.Model):
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to="images/", null=True)
+    image_variants = models.JSONField(default=dict, editable=False)
     in_stock = models.BooleanField(default=True)
+    # None leaves stock untracked; otherwise `in_stock` follows it.
+    stock_quantity = models.PositiveIntegerField(null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE)
     category = TreeForeignKey(
         "Category", on_delete=models.SET_NULL, null=True, blank=True
     )
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    average_rating = models.DecimalField(
+        max_digits=3, decimal_places=2, default=0, editable=False
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["in_stock", "price"], name="product_stock_price_idx"),
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+            models.Index(fields=["name", "id"], name="product_name_id_idx"),
+            models.Index(fields=["average_rating", "id"], name="product_rating_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
-    @property
-    def average_rating(self):
-        avg_rating = (
-            self.comments.aggregate(avg_rating=models.Avg("rating"))["avg_rating"] or 0
-        )
-        return round(avg_rating, 2)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.stock_quantity is not None:
+            self.in_stock = self.stock_quantity > 0
+        super().save(*args, **kwargs)
 
     @property
     def number_of_ratings(self):
-        return self.comments.count()
+        return self.rating_count
+
+
+class CommentQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        product_ids = {obj.product_id for obj in objs}
+        Product.objects.filter(pk__in=product_ids).refresh_ratings()
+        bump_versions("products", *(f"product:{pk}" for pk in product_ids))
+        return objs
+
+    def update(self, **kwargs):
+        product_ids = set(self.values_list("product_id", flat=True))
+        kwargs.setdefault("updated_at", Now())
+        rows = super().update(**kwargs)
+        product = kwargs.get("product", kwargs.get("product_id"))
+        if product is not None:
+            product_ids.add(getattr(product, "pk", product))
+        if {"rating", "product", "product_id"} & kwargs.keys():
+            Product.objects.filter(pk__in=product_ids).refresh_ratings()
+        else:
+            Product.objects.filter(pk__in=product_ids).touch()
+        bump_versions("products", *(f"product:{pk}" for pk in product_ids))
+        return rows
 
 
 class Comment(models.Model):
@@ -60,6 +193,28 @@ class Comment(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(5)]
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "user"], name="unique_product_review"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["product", "created_at"], name="comment_product_created_idx"
+            ),
+            models.Index(fields=["created_at", "id"], name="comment_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user} on {self.product}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
@@ -3,7 +3,7 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 class IsAdminOrReadOnly(BasePermission):
     def has_permission(self, request, view):
-        if view.action in ["list", "retrieve"]:
+        if request.method in SAFE_METHODS:
             return True
         return request.user.is_staff
 
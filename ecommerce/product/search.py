@@ -0,0 +1,221 @@
+"""PostgreSQL: weighted tsvector + GIN index. Elsewhere: in-process inverted index."""
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from .cache import get_versions
+from .models import Category, Product
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = {"start_sel": "<b>", "stop_sel": "</b>", "max_words": 30}
+
+# Weights follow PostgreSQL's default ts_rank weights for A, B, C and D.
+FIELD_WEIGHTS = {"name": 1.0, "brand": 0.4, "category": 0.2, "description": 0.1}
+# Product fields the index and the tsvector are built from.
+SEARCH_FIELDS = ["name", "description", "brand_id", "category_id"]
+
+UPDATE_SEARCH_VECTOR_SQL = """
+UPDATE product_product AS p SET search_vector =
+    setweight(to_tsvector(%s::regconfig, coalesce(p.name, '')), 'A') ||
+    setweight(to_tsvector(%s::regconfig, coalesce(b.name, '')), 'B') ||
+    setweight(to_tsvector(%s::regconfig, coalesce((
+        SELECT string_agg(a.name, ' ' ORDER BY a.lft)
+        FROM product_category AS c
+        JOIN product_category AS a
+            ON a.tree_id = c.tree_id AND a.lft <= c.lft AND a.rght >= c.rght
+        WHERE c.id = p.category_id
+    ), '')), 'C') ||
+    setweight(to_tsvector(%s::regconfig, coalesce(p.description, '')), 'D')
+FROM product_brand AS b
+WHERE b.id = p.brand_id AND p.id IN ({products})
+"""
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def uses_search_vector():
+    return connection.vendor == "postgresql"
+
+
+def refresh_search_vectors(queryset):
+    """Rebuild `Product.search_vector` for every product in `queryset`."""
+    if not uses_search_vector():
+        return
+    products_sql, params = queryset.values("pk").query.sql_with_params()
+    sql = UPDATE_SEARCH_VECTOR_SQL.format(products=products_sql)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [SEARCH_CONFIG] * 4 + list(params))
+
+
+def search_products(queryset, text, limit):
+    """Return up to `limit` `(product, rank, headline)` tuples, best match first."""
+    tokens = tokenize(text)
+    if not tokens:
+        return []
+    if uses_search_vector():
+        return _search_with_vector(queryset, tokens, limit)
+    return _search_with_index(queryset, tokens, limit)
+
+
+def _search_with_vector(queryset, tokens, limit):
+    query = SearchQuery(
+        " & ".join(f"{token}:*" for token in tokens),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+    products = (
+        queryset.filter(search_vector=query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), query),
+            headline=SearchHeadline(
+                Concat("name", Value(". "), "description"),
+                query,
+                config=SEARCH_CONFIG,
+                **HEADLINE_OPTIONS,
+            ),
+        )
+        .order_by("-rank", "id")[:limit]
+    )
+    return [(product, product.rank, product.headline) for product in products]
+
+
+def _search_with_index(queryset, tokens, limit):
+    ranked = get_inverted_index().search(tokens)
+    products = queryset.in_bulk([product_id for product_id, _ in ranked])
+    results = []
+    for product_id, rank in ranked:
+        product = products.get(product_id)
+        if product is None:
+            continue
+        text = f"{product.name}. {product.description}"
+        results.append((product, rank, highlight(text, tokens)))
+        if len(results) == limit:
+            break
+    return results
+
+
+def highlight(text, tokens, max_words=HEADLINE_OPTIONS["max_words"]):
+    words = text.split()
+    matches = {
+        index
+        for index, word in enumerate(words)
+        if any(term.startswith(token) for term in tokenize(word) for token in tokens)
+    }
+    start = max(min(matches) - max_words // 3, 0) if matches else 0
+    snippet = []
+    for index, word in enumerate(words[start : start + max_words], start):
+        if index in matches:
+            word = (
+                f"{HEADLINE_OPTIONS['start_sel']}{word}{HEADLINE_OPTIONS['stop_sel']}"
+            )
+        snippet.append(word)
+    return " ".join(snippet)
+
+
+class InvertedIndex:
+    """Term -> {product id: weight} postings with a sorted vocabulary for prefixes."""
+
+    def __init__(self, documents):
+        self.postings = defaultdict(dict)
+        for product_id, fields in documents:
+            for field, text in fields.items():
+                for term in tokenize(text):
+                    postings = self.postings[term]
+                    postings[product_id] = (
+                        postings.get(product_id, 0) + FIELD_WEIGHTS[field]
+                    )
+        self.vocabulary = sorted(self.postings)
+
+    def expand(self, token):
+        index = bisect_left(self.vocabulary, token)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(token):
+            yield self.vocabulary[index]
+            index += 1
+
+    def search(self, tokens):
+        scores = None
+        for token in tokens:
+            token_scores = defaultdict(float)
+            for term in self.expand(token):
+                for product_id, weight in self.postings[term].items():
+                    token_scores[product_id] += weight
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    product_id: score + token_scores[product_id]
+                    for product_id, score in scores.items()
+                    if product_id in token_scores
+                }
+        return sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))
+
+    @classmethod
+    def build(cls):
+        categories = {
+            category["id"]: category
+            for category in Category.objects.values("id", "name", "parent_id")
+        }
+
+        def category_path(category_id):
+            names = []
+            while category_id is not None:
+                category = categories[category_id]
+                names.append(category["name"])
+                category_id = category["parent_id"]
+            return " ".join(reversed(names))
+
+        rows = Product.objects.values(
+            "id", "name", "description", "brand__name", "category_id"
+        ).iterator(chunk_size=2000)
+        return cls(
+            (
+                row["id"],
+                {
+                    "name": row["name"],
+                    "brand": row["brand__name"],
+                    "category": category_path(row["category_id"]),
+                    "description": row["description"],
+                },
+            )
+            for row in rows
+        )
+
+
+_index = None
+_index_version = None
+# The version a thread is building an index for, if any.
+_building = None
+_index_lock = Lock()
+
+
+def get_inverted_index():
+    """
+    Return the index for the current "search" version.
+
+    The index is built outside the lock. While one thread rebuilds it, the
+    others keep searching the previous index rather than waiting.
+    """
+    global _index, _index_version, _building
+    version = get_versions("search")[0]
+    with _index_lock:
+        if _index is not None and version in (_index_version, _building):
+            return _index
+        _building = version
+    try:
+        index = InvertedIndex.build()
+    finally:
+        with _index_lock:
+            if _building == version:
+                _building = None
+    with _index_lock:
+        _index, _index_version = index, version
+    return index
@@ -1,3 +1,5 @@
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from .models import Category, Brand, Product, Comment
 from rest_framework.exceptions import ValidationError, PermissionDenied
@@ -14,7 +16,6 @@ class CommentSerializer(serializers.ModelSerializer):
     def validate(self, data):
         request = self.context["request"]
         user = request.user
-        product = data.get("product")
 
         if not user.is_staff:
             if "user" in self.initial_data:
@@ -22,12 +23,16 @@ class CommentSerializer(serializers.ModelSerializer):
                     "You are not allowed to modify the 'user' field."
                 )
 
-        if not self.instance:
-            if Comment.objects.filter(product=product, user=user).exists():
-                raise ValidationError("You have already reviewed this product.")
-
         return data
 
+    def save(self, **kwargs):
+        # The unique_product_review constraint rejects duplicate reviews.
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise ValidationError("You have already reviewed this product.")
+
     def create(self, validated_data):
         validated_data["user"] = self.context["request"].user
         return super().create(validated_data)
@@ -47,7 +52,29 @@ class BrandSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """`{preset: {width, height, webp, fallback}}` with absolute URLs."""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+
+        def url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return {
+            preset: {
+                "width": variant["width"],
+                "height": variant["height"],
+                "webp": url(variant["webp"]),
+                "fallback": url(variant["fallback"]),
+            }
+            for preset, variant in value.get("presets", {}).items()
+        }
+
+
 class ProductSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
     average_rating = serializers.FloatField(read_only=True)
     number_of_ratings = serializers.IntegerField(read_only=True)
 
@@ -58,6 +85,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "image",
+            "image_variants",
             "in_stock",
             "category",
             "brand",
@@ -0,0 +1,157 @@
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import DEFERRED
+from django.db.models.functions import Now
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .cache import bump_versions
+from .models import Category, Brand, Product, Comment
+from .images import schedule_variants
+from .search import SEARCH_FIELDS, refresh_search_vectors
+
+
+def _loaded_rating(instance):
+    loaded = getattr(instance, "_loaded_values", {})
+    product_id = loaded.get("product_id", DEFERRED)
+    rating = loaded.get("rating", DEFERRED)
+    if DEFERRED in (product_id, rating):
+        return None
+    return product_id, rating
+
+
+def _search_fields_changed(instance, created):
+    loaded = getattr(instance, "_loaded_values", None)
+    if created or loaded is None:
+        return True
+    return any(
+        name not in loaded or loaded[name] != getattr(instance, name)
+        for name in SEARCH_FIELDS
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_product_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = None if created else _loaded_rating(instance)
+    if created:
+        Product.objects.filter(pk=instance.product_id).adjust_ratings(
+            instance.rating, 1
+        )
+    elif previous is None:
+        Product.objects.filter(pk=instance.product_id).refresh_ratings()
+    elif previous[0] != instance.product_id:
+        Product.objects.filter(pk=previous[0]).adjust_ratings(-previous[1], -1)
+        Product.objects.filter(pk=instance.product_id).adjust_ratings(
+            instance.rating, 1
+        )
+    elif previous[1] != instance.rating:
+        Product.objects.filter(pk=instance.product_id).adjust_ratings(
+            instance.rating - previous[1], 0
+        )
+    else:
+        # Product detail responses embed the comment.
+        Product.objects.filter(pk=instance.product_id).touch()
+
+    bump_versions("products", f"product:{instance.product_id}")
+    if previous is not None and previous[0] != instance.product_id:
+        bump_versions(f"product:{previous[0]}")
+
+    instance._loaded_values = {
+        "product_id": instance.product_id,
+        "rating": instance.rating,
+    }
+
+
+@receiver(post_delete, sender=Comment)
+def update_product_rating_on_delete(sender, instance, **kwargs):
+    Product.objects.filter(pk=instance.product_id).adjust_ratings(-instance.rating, -1)
+    bump_versions("products", f"product:{instance.product_id}")
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    bump_versions("products", f"product:{instance.pk}")
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_brand_cache(sender, instance, **kwargs):
+    bump_versions("products", "search")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    bump_versions("products", "categories", "search")
+
+
+@receiver(pre_delete, sender=Category)
+def invalidate_uncategorized_products_cache(sender, instance, **kwargs):
+    # Deleting a category nulls Product.category with a bulk UPDATE.
+    instance._uncategorized_product_ids = list(
+        Product.objects.filter(category=instance).values_list("pk", flat=True)
+    )
+    bump_versions(*(f"product:{pk}" for pk in instance._uncategorized_product_ids))
+
+
+@receiver(post_save, sender=Product)
+def update_product_search_vector(sender, instance, created, raw=False, **kwargs):
+    # Ratings, prices and stock change far more often than the searchable text.
+    if not _search_fields_changed(instance, created):
+        return
+    bump_versions("search")
+    if not raw:
+        refresh_search_vectors(Product.objects.filter(pk=instance.pk))
+    instance._loaded_values = {name: getattr(instance, name) for name in SEARCH_FIELDS}
+
+
+@receiver(post_save, sender=Product)
+def update_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    image_name = instance.image.name if instance.image else None
+    if image_name and instance.image_variants.get("source") != image_name:
+        product_id = instance.pk
+        transaction.on_commit(lambda: schedule_variants(product_id, image_name))
+    elif not image_name and instance.image_variants:
+        instance.image_variants = {}
+        Product.objects.filter(pk=instance.pk).update(image_variants={})
+
+
+@receiver(post_save, sender=Brand)
+def update_brand_search_vectors(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_search_vectors(Product.objects.filter(brand=instance))
+
+
+@receiver(post_save, sender=Category)
+def update_category_search_vectors(sender, instance, raw=False, **kwargs):
+    if not raw:
+        subtree = instance.get_descendants(include_self=True)
+        refresh_search_vectors(Product.objects.filter(category__in=subtree))
+
+
+@receiver(post_delete, sender=Category)
+def update_uncategorized_search_vectors(sender, instance, **kwargs):
+    product_ids = getattr(instance, "_uncategorized_product_ids", [])
+    if product_ids:
+        Product.objects.filter(pk__in=product_ids).touch()
+        refresh_search_vectors(Product.objects.filter(pk__in=product_ids))
+
+
+@receiver(post_save, sender=get_user_model())
+def touch_renamed_user_comments(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    # Comments are serialized with the author's name.
+    if raw or created or (update_fields is not None and "name" not in update_fields):
+        return
+    comments = models.QuerySet(Comment).filter(user=instance)
+    product_ids = set(comments.values_list("product_id", flat=True))
+    if product_ids:
+        comments.update(updated_at=Now())
+        Product.objects.filter(pk__in=product_ids).touch()
+        bump_versions(*(f"product:{pk}" for pk in product_ids))
@@ -0,0 +1,128 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.test import TestCase, AsyncRequestFactory, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..cache import get_cache
+from ..models import Category, Brand, Product, Comment
+from ..views import CategoryViewSet, ProductViewSet, CommentViewSet
+
+with override_settings(ASYNC_READ_VIEWS=True):
+    product_list = ProductViewSet.as_view({"get": "list", "post": "create"})
+    product_detail = ProductViewSet.as_view({"get": "retrieve"})
+    comment_list = CommentViewSet.as_view({"get": "list", "post": "create"})
+    comment_detail = CommentViewSet.as_view({"get": "retrieve"})
+    category_list = CategoryViewSet.as_view({"get": "list"})
+
+
+class AsyncReadViewsTest(TestCase):
+    """The async read paths must return exactly what the sync views return."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.factory = AsyncRequestFactory()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="async@user.com", name="Async User", password="pass"
+        )
+        self.token = Token.objects.create(user=self.user)
+        parent = Category.objects.create(name="Parent")
+        child = Category.objects.create(name="Child", parent=parent)
+        brand = Brand.objects.create(name="Brand Name")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {index}",
+                price=index % 3 * 10,
+                brand=brand,
+                category=child if index % 2 else parent,
+            )
+            for index in range(7)
+        ]
+        self.comment = Comment.objects.create(
+            product=self.products[0], user=self.user, comment_text="Nice", rating=4
+        )
+
+    async def get(self, view, path, params=None, **kwargs):
+        # Compare against a fresh computation, not a cached sync response.
+        await get_cache().aclear()
+        request = self.factory.get(path, params or {})
+        return await view(request, **kwargs)
+
+    @sync_to_async
+    def sync_get(self, path, params=None):
+        get_cache().clear()
+        return self.client.get(path, params)
+
+    def test_views_are_coroutines_only_when_enabled(self):
+        self.assertTrue(iscoroutinefunction(product_list))
+        self.assertFalse(iscoroutinefunction(ProductViewSet.as_view({"get": "list"})))
+
+    async def test_product_list_matches_sync(self):
+        url = reverse("product-list")
+        params = {"category": "parent", "ordering": "-price", "page_size": 3}
+        res = await self.get(product_list, url, params)
+        expected = await self.sync_get(url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, expected.data)
+
+        next_page = await self.get(product_list, res.data["next"])
+        self.assertEqual(next_page.data, (await self.sync_get(res.data["next"])).data)
+
+    async def test_product_detail_matches_sync(self):
+        url = reverse("product-detail", args=[self.products[0].id])
+        res = await self.get(product_detail, url, pk=str(self.products[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, (await self.sync_get(url)).data)
+        self.assertEqual(res.data["comments"][0]["user"], self.user.name)
+
+    async def test_missing_product(self):
+        url = reverse("product-detail", args=[0])
+        res = await self.get(product_detail, url, pk="0")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_comment_and_category_lists_match_sync(self):
+        for view, url in [
+            (comment_list, reverse("comment-list")),
+            (category_list, reverse("category-list")),
+        ]:
+            res = await self.get(view, url)
+            self.assertEqual(res.data, (await self.sync_get(url)).data)
+
+        url = reverse("comment-detail", args=[self.comment.id])
+        res = await self.get(comment_detail, url, pk=str(self.comment.id))
+        self.assertEqual(res.data, (await self.sync_get(url)).data)
+
+    async def test_writes_fall_back_to_sync_view(self):
+        request = self.factory.post(
+            reverse("comment-list"),
+            {"product": self.products[1].id, "comment_text": "Good", "rating": 5},
+            content_type="application/json",
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+        res = await comment_list(request)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            await Comment.objects.filter(product=self.products[1]).aexists()
+        )
+
+    async def test_conditional_get_matches_sync(self):
+        url = reverse("comment-list")
+        expected = await self.sync_get(url)
+        res = await self.get(comment_list, url)
+        self.assertEqual(res["ETag"], expected["ETag"])
+
+        request = self.factory.get(url, headers={"If-None-Match": res["ETag"]})
+        not_modified = await comment_list(request)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        url = reverse("product-detail", args=[self.products[0].id])
+        expected = await self.sync_get(url)
+        res = await self.get(product_detail, url, pk=str(self.products[0].id))
+        self.assertEqual(res["ETag"], expected["ETag"])
+        self.assertEqual(res["Last-Modified"], expected["Last-Modified"])
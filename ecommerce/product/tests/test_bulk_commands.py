@@ -0,0 +1,145 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from ..cache import get_cache, get_versions
+from ..models import Category, Brand, Product
+
+CSV_FEED = """sku,name,brand,category,price,in_stock,description
+A-1,Phone,Acme,Electronics > Phones,199.99,true,A phone
+A-2,Laptop,Acme,Electronics > Laptops,999,yes,
+B-1,Chair,Homely,Furniture,49.5,0,A chair
+B-2,,Homely,Furniture,10,1,
+B-3,Desk,Homely,Furniture,ten,1,
+"""
+
+
+class ProductImportExportTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        out, err = io.StringIO(), io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_products", path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_creates_products_brands_and_categories(self):
+        out, err = self.run_import(self.write("feed.csv", CSV_FEED), batch_size=2)
+
+        self.assertIn("Imported 3 products (2 rejected", out)
+        self.assertIn("rows/s", out)
+        self.assertIn("line 5: name is required.", err)
+        self.assertIn("line 6: Invalid price: 'ten'.", err)
+
+        phone = Product.objects.get(sku="A-1")
+        self.assertEqual(phone.brand.name, "Acme")
+        self.assertEqual(str(phone.price), "199.99")
+        self.assertEqual(
+            [c.name for c in phone.category.get_ancestors(include_self=True)],
+            ["Electronics", "Phones"],
+        )
+        self.assertFalse(Product.objects.get(sku="B-1").in_stock)
+        self.assertEqual(Brand.objects.count(), 2)
+
+        # The tree fields were rebuilt with the batches that added categories.
+        electronics = Category.objects.get(name="Electronics")
+        self.assertEqual(electronics.get_descendant_count(), 2)
+        self.assertEqual(
+            set(Category.objects.values_list("tree_id", flat=True)), {1, 2}
+        )
+
+    def test_reimport_updates_only_given_columns(self):
+        self.run_import(self.write("feed.csv", CSV_FEED))
+        phone = Product.objects.get(sku="A-1")
+        Product.objects.filter(pk=phone.pk).adjust_ratings(5, 1)
+        version = get_versions(f"product:{phone.pk}")[0]
+
+        feed = '{"sku": "A-1", "name": "Phone 2", "brand": "Acme", "price": 149}\n'
+        feed += '{"sku": "C-1", "name": "Lamp", "brand": "Glow"}\n'
+        feed += "not json\n"
+        out, err = self.run_import(self.write("feed.jsonl", feed))
+
+        self.assertIn("Imported 2 products (1 rejected", out)
+        self.assertIn("line 3: Not a JSON object.", err)
+        phone.refresh_from_db()
+        self.assertEqual((phone.name, str(phone.price)), ("Phone 2", "149.00"))
+        self.assertEqual(phone.description, "A phone")
+        self.assertEqual(phone.category.name, "Phones")
+        self.assertEqual(phone.rating_count, 1)
+        self.assertNotEqual(get_versions(f"product:{phone.pk}")[0], version)
+        self.assertEqual(Product.objects.count(), 4)
+
+    def test_failed_batch_leaves_a_valid_tree(self):
+        feed = "sku,name,brand,category\nA-1,Phone,Acme,Electronics > Phones\n"
+        feed += "B-1,Chair,Homely,Furniture\n"
+        refresh = mock.Mock(side_effect=[None, RuntimeError("connection lost")])
+
+        with mock.patch("product.bulk.refresh_search_vectors", refresh):
+            with self.assertRaises(RuntimeError):
+                self.run_import(self.write("feed.csv", feed), batch_size=1)
+
+        self.assertEqual(Product.objects.get().sku, "A-1")
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertFalse(Category.objects.filter(tree_id=0).exists())
+        electronics = Category.objects.get(name="Electronics")
+        self.assertEqual(electronics.get_descendant_count(), 1)
+
+    def test_import_keeps_in_stock_in_line_with_tracked_stock(self):
+        brand = Brand.objects.create(name="Acme")
+        Product.objects.create(sku="A-1", name="Phone", brand=brand, stock_quantity=0)
+
+        self.run_import(
+            self.write("feed.csv", "sku,name,brand,in_stock\nA-1,Phone,Acme,1\n")
+        )
+
+        self.assertFalse(Product.objects.get(sku="A-1").in_stock)
+
+    def test_duplicate_skus_in_batch_keep_last_row(self):
+        feed = "sku,name,brand\nX,First,Acme\nX,Second,Acme\n"
+        self.run_import(self.write("feed.csv", feed))
+
+        self.assertEqual(Product.objects.get(sku="X").name, "Second")
+
+    def test_missing_required_column(self):
+        with self.assertRaisesMessage(CommandError, "Missing columns: brand."):
+            self.run_import(self.write("feed.csv", "sku,name\nX,Name\n"))
+
+    def test_export_round_trip(self):
+        self.run_import(self.write("feed.csv", CSV_FEED))
+
+        for format in ["csv", "jsonl"]:
+            path = os.path.join(self.directory, f"export.{format}")
+            err = io.StringIO()
+            call_command("export_products", path, format=format, stderr=err)
+            self.assertIn("Exported 3 products", err.getvalue())
+
+            Product.objects.all().delete()
+            self.run_import(path)
+            phone = Product.objects.get(sku="A-1")
+            self.assertEqual(phone.category.parent.name, "Electronics")
+            self.assertFalse(Product.objects.get(sku="B-1").in_stock)
+            self.assertEqual(Category.objects.count(), 4)
+
+    def test_export_to_stdout(self):
+        self.run_import(self.write("feed.csv", CSV_FEED))
+        out = io.StringIO()
+        call_command(
+            "export_products", format="jsonl", stdout=out, stderr=io.StringIO()
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(rows[0]["category"], "Electronics > Phones")
+        self.assertEqual(rows[0]["price"], "199.99")
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from ..filters import ProductFilter, get_category_ranges
+from ..models import Category, Brand, Product
+
+
+def filter_ids(category):
+    products = ProductFilter({"category": category}, queryset=Product.objects.all()).qs
+    return set(products.values_list("id", flat=True))
+
+
+class CategoryFilterTest(TestCase):
+    def setUp(self):
+        brand = Brand.objects.create(name="Brand Name")
+        self.electronics = Category.objects.create(name="Electronics")
+        self.phones = Category.objects.create(name="Phones", parent=self.electronics)
+        self.home = Category.objects.create(name="Home")
+        self.lamps = Category.objects.create(name="Lamps", parent=self.home)
+        self.toy_phones = Category.objects.create(name="phones")
+        self.phone = Product.objects.create(
+            name="Phone", brand=brand, category=self.phones
+        )
+        self.tv = Product.objects.create(
+            name="TV", brand=brand, category=self.electronics
+        )
+        self.lamp = Product.objects.create(
+            name="Lamp", brand=brand, category=self.lamps
+        )
+        self.toy = Product.objects.create(
+            name="Toy Phone", brand=brand, category=self.toy_phones
+        )
+
+    def test_subtree_match(self):
+        self.assertEqual(filter_ids("electronics"), {self.phone.id, self.tv.id})
+
+    def test_several_categories(self):
+        self.assertEqual(
+            filter_ids("Electronics, lamps"), {self.phone.id, self.tv.id, self.lamp.id}
+        )
+
+    def test_duplicate_names_match_every_category(self):
+        self.assertEqual(filter_ids("PHONES"), {self.phone.id, self.toy.id})
+
+    def test_unknown_category(self):
+        self.assertEqual(filter_ids("garden"), set())
+
+    def test_ranges_are_reused_until_categories_change(self):
+        get_category_ranges()
+        with self.assertNumQueries(0):
+            get_category_ranges()
+
+        self.lamps.move_to(self.electronics)
+        self.assertEqual(
+            filter_ids("electronics"), {self.phone.id, self.tv.id, self.lamp.id}
+        )
+        self.assertEqual(filter_ids("home"), set())
@@ -0,0 +1,98 @@
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.urls import reverse
+from ..cache import get_cache
+from ..models import Category, Brand, Product
+
+TREE_URL = reverse("category-tree")
+
+
+class CategoryTreeTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.electronics = Category.objects.create(name="Electronics")
+        self.phones = Category.objects.create(name="Phones", parent=self.electronics)
+        self.android = Category.objects.create(name="Android", parent=self.phones)
+        self.laptops = Category.objects.create(name="Laptops", parent=self.electronics)
+        self.home = Category.objects.create(name="Home")
+        self.brand = Brand.objects.create(name="Brand Name")
+        for category in [self.android, self.android, self.phones, self.laptops]:
+            Product.objects.create(name="Product", brand=self.brand, category=category)
+
+    def test_nested_tree_in_tree_order(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(TREE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": self.electronics.id,
+                    "name": "Electronics",
+                    "children": [
+                        {"id": self.laptops.id, "name": "Laptops", "children": []},
+                        {
+                            "id": self.phones.id,
+                            "name": "Phones",
+                            "children": [
+                                {
+                                    "id": self.android.id,
+                                    "name": "Android",
+                                    "children": [],
+                                }
+                            ],
+                        },
+                    ],
+                },
+                {"id": self.home.id, "name": "Home", "children": []},
+            ],
+        )
+
+    def test_depth_limit(self):
+        res = self.client.get(TREE_URL, {"depth": 1})
+        self.assertEqual([node["children"] for node in res.data], [[], []])
+
+        res = self.client.get(TREE_URL, {"depth": 2})
+        phones = res.data[0]["children"][1]
+        self.assertEqual(phones["name"], "Phones")
+        self.assertEqual(phones["children"], [])
+
+    def test_invalid_depth(self):
+        for depth in ["0", "-1", "a"]:
+            res = self.client.get(TREE_URL, {"depth": depth})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_product_counts_cover_subtree(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(TREE_URL, {"counts": "true", "depth": 2})
+
+        electronics, home = res.data
+        self.assertEqual(electronics["product_count"], 4)
+        self.assertEqual(home["product_count"], 0)
+        self.assertEqual(
+            {node["name"]: node["product_count"] for node in electronics["children"]},
+            {"Laptops": 1, "Phones": 3},
+        )
+
+    def test_cached_until_categories_change(self):
+        self.client.get(TREE_URL)
+        with self.assertNumQueries(0):
+            self.client.get(TREE_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Garden")
+        res = self.client.get(TREE_URL)
+        self.assertEqual(
+            [node["name"] for node in res.data], ["Electronics", "Garden", "Home"]
+        )
+
+    def test_counts_refresh_when_products_change(self):
+        self.client.get(TREE_URL, {"counts": "1"})
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="Lamp", brand=self.brand, category=self.home)
+
+        res = self.client.get(TREE_URL, {"counts": "1"})
+        self.assertEqual(res.data[1]["product_count"], 1)
+        self.assertEqual(res.data[0]["product_count"], 4)
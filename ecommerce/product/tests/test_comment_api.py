@@ -148,6 +148,17 @@ class AuthorizedUserTest(APITestCase):
         res = self.client.post(COMMENTS_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_duplicate_product_comment_update_error(self):
+        new_product = create_product()
+        other_comment = create_comment(user=self.user, product=new_product)
+
+        url = detail_url(other_comment.id)
+        res = self.client.patch(url, {"product": self.product.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        other_comment.refresh_from_db()
+        self.assertEqual(other_comment.product, new_product)
+
     def test_update_other_users_comment_error(self):
         another_comment = create_comment(user=self.another_user, product=self.product)
 
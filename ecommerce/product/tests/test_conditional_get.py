@@ -0,0 +1,154 @@
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils.http import http_date
+from ..cache import get_cache
+from ..models import Category, Brand, Product, Comment
+
+PRODUCTS_URL = reverse("product-list")
+COMMENTS_URL = reverse("comment-list")
+BRANDS_URL = reverse("brand-list")
+
+
+def detail_url(product_id):
+    return reverse("product-detail", args=[product_id])
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", name="Test User", password="pass"
+        )
+        self.staff = get_user_model().objects.create_superuser(
+            email="user@admin.com", name="Admin User", password="passadminuser"
+        )
+        self.category = Category.objects.create(name="Category")
+        self.brand = Brand.objects.create(name="Brand Name")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {index}", brand=self.brand, category=self.category
+            )
+            for index in range(5)
+        ]
+        self.comment = Comment.objects.create(
+            product=self.products[0], user=self.user, rating=4, comment_text="Nice"
+        )
+
+    def revalidate(self, url, response, params=None):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_cached_product_list_revalidates_without_queries(self):
+        res = self.client.get(PRODUCTS_URL, {"page_size": 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["ETag"].startswith('"'))
+
+        with self.assertNumQueries(0):
+            not_modified = self.revalidate(PRODUCTS_URL, res, {"page_size": 2})
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], res["ETag"])
+        self.assertEqual(not_modified.content, b"")
+
+    def test_uncached_revalidation_loads_only_stamps(self):
+        self.client.force_authenticate(self.staff)
+        res = self.client.get(PRODUCTS_URL, {"page_size": 2})
+
+        with self.assertNumQueries(1) as queries:
+            not_modified = self.revalidate(PRODUCTS_URL, res, {"page_size": 2})
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotIn('"name"', queries.captured_queries[0]["sql"])
+
+    def test_list_etag_changes_with_page_rows(self):
+        params = {"page_size": 2}
+        res = self.client.get(PRODUCTS_URL, params)
+
+        product = self.products[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            product.price = 50
+            product.save()
+        changed = self.revalidate(PRODUCTS_URL, res, params)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed["ETag"], res["ETag"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].delete()
+        deleted = self.revalidate(PRODUCTS_URL, changed, params)
+        self.assertEqual(deleted.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_varies_with_parameters(self):
+        res = self.client.get(PRODUCTS_URL, {"page_size": 2})
+        other = self.revalidate(PRODUCTS_URL, res, {"page_size": 3})
+
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(other["ETag"], res["ETag"])
+
+    def test_detail_last_modified(self):
+        product = self.products[0]
+        res = self.client.get(detail_url(product.id))
+        product.refresh_from_db()
+        self.assertEqual(
+            res["Last-Modified"], http_date(product.updated_at.timestamp())
+        )
+
+        not_modified = self.client.get(
+            detail_url(product.id), HTTP_IF_MODIFIED_SINCE=res["Last-Modified"]
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_comment_edit_changes_product_detail_etag(self):
+        url = detail_url(self.products[0].id)
+        res = self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.comment.comment_text = "Changed my mind"
+            self.comment.save()
+        changed = self.revalidate(url, res)
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data["comments"][0]["comment_text"], "Changed my mind")
+
+    def test_user_rename_changes_comment_etags(self):
+        res = self.client.get(COMMENTS_URL)
+        with self.assertNumQueries(1):
+            not_modified = self.revalidate(COMMENTS_URL, res)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.name = "Renamed User"
+        self.user.save()
+        changed = self.revalidate(COMMENTS_URL, res)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data["results"][0]["user"], "Renamed User")
+
+    def test_unpaginated_brand_list(self):
+        res = self.client.get(BRANDS_URL)
+        self.assertEqual(
+            self.revalidate(BRANDS_URL, res).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        Brand.objects.create(name="Another Brand")
+        self.assertEqual(
+            self.revalidate(BRANDS_URL, res).status_code, status.HTTP_200_OK
+        )
+
+    def test_category_etag_follows_tree_fields(self):
+        url = reverse("category-detail", args=[self.category.id])
+        res = self.client.get(url)
+        self.assertNotIn("Last-Modified", res)
+        self.assertEqual(
+            self.revalidate(url, res).status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        # Adding a child widens the parent's lft/rght with a bulk update.
+        Category.objects.create(name="Child", parent=self.category)
+        changed = self.revalidate(url, res)
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data["rght"], res.data["rght"] + 2)
+
+    def test_missing_object_with_precondition(self):
+        res = self.client.get(detail_url(0), HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,129 @@
+import io
+import shutil
+import tempfile
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..cache import get_cache
+from ..images import apply_variants
+from ..models import Brand, Product
+
+PRESETS = {"thumbnail": 50, "medium": 200}
+
+
+def make_upload(name="photo.png", size=(400, 300), mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ImageVariantsTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media_root,
+            PRODUCT_IMAGE_PRESETS=PRESETS,
+            PRODUCT_IMAGE_WORKERS=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        get_cache().clear()
+        self.brand = Brand.objects.create(name="Brand Name")
+
+    def create_product(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(name="Product", brand=self.brand, **kwargs)
+        product.refresh_from_db()
+        return product
+
+    def test_upload_renders_presets(self):
+        product = self.create_product(image=make_upload())
+
+        variants = product.image_variants
+        self.assertEqual(variants["source"], product.image.name)
+        self.assertEqual(set(variants["presets"]), set(PRESETS))
+        thumbnail = variants["presets"]["thumbnail"]
+        self.assertEqual((thumbnail["width"], thumbnail["height"]), (50, 38))
+        with default_storage.open(thumbnail["webp"]) as file:
+            self.assertEqual(Image.open(file).format, "WEBP")
+        with default_storage.open(thumbnail["fallback"]) as file:
+            self.assertEqual(Image.open(file).format, "JPEG")
+
+    def test_identical_images_share_files(self):
+        first = self.create_product(image=make_upload("a.png"))
+        second = self.create_product(image=make_upload("b.png"))
+
+        self.assertNotEqual(first.image.name, second.image.name)
+        self.assertEqual(
+            first.image_variants["presets"], second.image_variants["presets"]
+        )
+
+    def test_small_transparent_image(self):
+        product = self.create_product(image=make_upload(size=(100, 80), mode="RGBA"))
+
+        presets = product.image_variants["presets"]
+        self.assertEqual(
+            (presets["medium"]["width"], presets["medium"]["height"]), (100, 80)
+        )
+        self.assertTrue(presets["medium"]["fallback"].endswith(".png"))
+
+    def test_stale_job_is_discarded(self):
+        product = self.create_product(image=make_upload())
+        old_name = product.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.image = make_upload("new.png", size=(300, 300))
+            product.save()
+        self.assertFalse(apply_variants(product.id, old_name, {"source": old_name}))
+
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants["source"], product.image.name)
+        self.assertEqual(product.image_variants["presets"]["thumbnail"]["height"], 50)
+
+    def test_clearing_image_clears_variants(self):
+        product = self.create_product(image=make_upload())
+        product.image = None
+        product.save()
+
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants, {})
+
+    def test_api_exposes_variant_urls(self):
+        product = self.create_product(image=make_upload())
+        client = APIClient()
+
+        for url in [
+            reverse("product-list"),
+            reverse("product-detail", args=[product.id]),
+        ]:
+            res = client.get(url)
+            data = res.data["results"][0] if "results" in res.data else res.data
+            webp = data["image_variants"]["thumbnail"]["webp"]
+            self.assertTrue(webp.startswith("http://testserver/media/images/variants/"))
+            self.assertTrue(webp.endswith(".webp"))
+
+    def test_backfill_command(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            products = [
+                Product.objects.create(
+                    name=f"Product {index}", brand=self.brand, image=make_upload()
+                )
+                for index in range(3)
+            ]
+        Product.objects.create(name="No image", brand=self.brand)
+        default_storage.save("images/broken.png", io.BytesIO(b"not an image"))
+        Product.objects.filter(pk=products[2].pk).update(image="images/broken.png")
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command("generate_image_variants", workers=2, stdout=out, stderr=err)
+
+        self.assertIn("2 images (1 failed)", out.getvalue())
+        self.assertIn("broken.png", err.getvalue())
+        for product in products[:2]:
+            product.refresh_from_db()
+            self.assertEqual(set(product.image_variants["presets"]), set(PRESETS))
@@ -0,0 +1,128 @@
+import json
+import os
+import re
+from tempfile import TemporaryDirectory
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from ecommerce.metrics import (
+    ARCHIVE_NAME,
+    MetricsRegistry,
+    RequestStats,
+    registry,
+    write_snapshot,
+)
+from ..cache import get_cache
+from ..models import Brand, Product
+
+PRODUCTS_URL = reverse("product-list")
+METRICS_URL = reverse("metrics")
+
+
+class MetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        registry.reset()
+        self.client = APIClient()
+        brand = Brand.objects.create(name="Acme")
+        self.product = Product.objects.create(name="Phone", price=100, brand=brand)
+
+    def scrape(self):
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(
+            res["Content-Type"], "text/plain; version=0.0.4; charset=utf-8"
+        )
+        return res.content.decode()
+
+    def test_requests_are_recorded_per_route(self):
+        self.client.get(PRODUCTS_URL)
+        self.client.get(PRODUCTS_URL)
+        self.client.get(reverse("product-detail", args=[self.product.id]))
+        self.client.get("/api/nothing-here/")
+
+        metrics = self.scrape()
+
+        self.assertIn(
+            'http_requests_total{route="product-list",method="GET",status="200"} 2',
+            metrics,
+        )
+        self.assertIn(
+            'http_requests_total{route="product-detail",method="GET",status="200"} 1',
+            metrics,
+        )
+        self.assertIn('route="unmatched",method="GET",status="404"', metrics)
+        self.assertIn(
+            'http_request_duration_seconds_count{route="product-list",method="GET"} 2',
+            metrics,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="product-list",method="GET",'
+            'le="+Inf"} 2',
+            metrics,
+        )
+        # The first list queried the database, the second came from the cache.
+        self.assertIn(
+            'http_request_db_queries_bucket{route="product-list",method="GET",'
+            'le="0"} 1',
+            metrics,
+        )
+        self.assertIn(
+            'http_request_encode_seconds_total{route="product-list",method="GET"}',
+            metrics,
+        )
+        # Only the uncached list ran its serializer.
+        serialized = re.search(
+            r'^http_request_serialize_seconds_total\{route="product-list",'
+            r'method="GET",action="list"\} (\S+)$',
+            metrics,
+            re.MULTILINE,
+        )
+        self.assertGreater(float(serialized.group(1)), 0)
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_MAX_QUERIES=1)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.assertLogs("ecommerce.slow_requests", "WARNING") as logs:
+            self.client.get(reverse("product-detail", args=[self.product.id]))
+
+        record = json.loads(logs.records[0].args[0])
+        self.assertEqual(record["route"], "product-detail")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["db_queries"], 2)
+        self.assertIn("serialize_ms", record)
+        # The slower of the product and comment queries, whichever it was.
+        (slowest,) = record["slowest_queries"]
+        self.assertRegex(slowest["sql"], r'FROM "product_(product|comment)"')
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+        res = self.client.get(METRICS_URL, headers={"Authorization": "Bearer secret"})
+        self.assertEqual(res.status_code, 200)
+
+    def test_metrics_dir_adds_up_all_workers(self):
+        with TemporaryDirectory() as directory, override_settings(
+            METRICS_DIR=directory
+        ):
+            # A live worker and one that exited since the last scrape.
+            worker = MetricsRegistry()
+            for _ in range(3):
+                worker.observe("product-list", "GET", "200", 0.01, RequestStats())
+            worker.flush(directory)
+            write_snapshot(
+                os.path.join(directory, "999999999-old.json"), worker.snapshot()
+            )
+            self.client.get(PRODUCTS_URL)
+
+            metrics = self.scrape()
+
+            total = (
+                'http_requests_total{route="product-list",method="GET",status="200"} 7'
+            )
+            self.assertIn(total, metrics)
+            self.assertFalse(
+                os.path.exists(os.path.join(directory, "999999999-old.json"))
+            )
+            self.assertTrue(os.path.exists(os.path.join(directory, ARCHIVE_NAME)))
+            # Folding the exited worker in does not change the totals.
+            self.assertIn(total, self.scrape())
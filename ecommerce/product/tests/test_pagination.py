@@ -0,0 +1,133 @@
+import json
+from base64 import urlsafe_b64encode
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from ..models import Brand, Product, Comment
+
+PRODUCTS_URL = reverse("product-list")
+COMMENTS_URL = reverse("comment-list")
+
+
+def walk(client, url, params=None, link="next"):
+    res = client.get(url, params)
+    pages = [res]
+    while res.data[link]:
+        res = client.get(res.data[link])
+        pages.append(res)
+    return pages
+
+
+def forge_cursor(ordering, position):
+    cursor = {"o": ordering, "p": position, "r": False}
+    return urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+class ProductKeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        brand = Brand.objects.create(name="Brand Name")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {index % 4}", price=index % 3 * 10, brand=brand
+            )
+            for index in range(11)
+        ]
+
+    def assertWalkOrder(self, ordering, key):
+        pages = walk(self.client, PRODUCTS_URL, {"ordering": ordering, "page_size": 3})
+        ids = [item["id"] for page in pages for item in page.data["results"]]
+        expected = sorted(self.products, key=key)
+        self.assertEqual(ids, [product.id for product in expected])
+        self.assertEqual(len(pages), 4)
+        return pages
+
+    def test_default_ordering_by_id(self):
+        res = self.client.get(PRODUCTS_URL, {"page_size": 5})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [product.id for product in self.products[:5]],
+        )
+        self.assertIsNone(res.data["previous"])
+        self.assertIsNotNone(res.data["next"])
+
+    def test_walk_price_with_id_tie_break(self):
+        self.assertWalkOrder("price", lambda p: (p.price, p.id))
+        self.assertWalkOrder("-price", lambda p: (-p.price, -p.id))
+
+    def test_walk_name_with_id_tie_break(self):
+        self.assertWalkOrder("name", lambda p: (p.name, p.id))
+
+    def test_previous_links_walk_back(self):
+        pages = self.assertWalkOrder("price", lambda p: (p.price, p.id))
+        last = pages[-1]
+        back = walk(self.client, last.data["previous"], link="previous")
+        self.assertEqual(
+            [page.data["results"] for page in back],
+            [page.data["results"] for page in reversed(pages[:-1])],
+        )
+
+    def test_invalid_cursor(self):
+        res = self.client.get(PRODUCTS_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_invalid_values(self):
+        for position in (["x", 1], ["NaN1", 1], [10, "x"], [10, [1]]):
+            cursor = forge_cursor(["price", "id"], position)
+            res = self.client.get(PRODUCTS_URL, {"ordering": "price", "cursor": cursor})
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, position)
+
+        cursor = forge_cursor(["-created_at", "-id"], ["not a date", 1])
+        res = self.client.get(COMMENTS_URL, {"cursor": cursor})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_rejected_for_other_ordering(self):
+        res = self.client.get(PRODUCTS_URL, {"ordering": "price", "page_size": 3})
+        cursor = res.data["next"].split("cursor=")[1].split("&")[0]
+
+        res = self.client.get(PRODUCTS_URL, {"ordering": "name", "cursor": cursor})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_offset_mode_for_staff(self):
+        admin_user = get_user_model().objects.create_superuser(
+            email="user@admin.com", name="Admin User", password="passadminuser"
+        )
+        self.client.force_authenticate(admin_user)
+
+        res = self.client.get(PRODUCTS_URL, {"offset": 9, "page_size": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 11)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [product.id for product in self.products[9:]],
+        )
+
+    def test_offset_mode_ignored_for_non_staff(self):
+        res = self.client.get(PRODUCTS_URL, {"offset": 9, "page_size": 5})
+        self.assertNotIn("count", res.data)
+        self.assertEqual(len(res.data["results"]), 5)
+
+
+class CommentKeysetPaginationTest(APITestCase):
+    def test_comments_newest_first(self):
+        brand = Brand.objects.create(name="Brand Name")
+        product = Product.objects.create(name="Product", brand=brand)
+        comments = [
+            Comment.objects.create(
+                product=product,
+                rating=3,
+                user=get_user_model().objects.create_user(
+                    email=f"user{index}@user.com", name="User", password="pass"
+                ),
+            )
+            for index in range(5)
+        ]
+
+        pages = walk(APIClient(), COMMENTS_URL, {"page_size": 2})
+
+        ids = [item["id"] for page in pages for item in page.data["results"]]
+        expected = sorted(comments, key=lambda c: (c.created_at, c.id), reverse=True)
+        self.assertEqual(ids, [comment.id for comment in expected])
@@ -88,8 +88,11 @@ class AdminUserTest(APITestCase):
         self.comment1 = Comment.objects.create(
             user=self.admin_user, product=self.product, rating=4
         )
+        self.another_user = get_user_model().objects.create_user(
+            email="another@user.com", name="Another User", password="passanother"
+        )
         self.comment2 = Comment.objects.create(
-            user=self.admin_user, product=self.product, rating=3
+            user=self.another_user, product=self.product, rating=3
         )
 
     def test_create_product_success(self):
@@ -0,0 +1,109 @@
+from rest_framework.test import APITestCase, APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from ..cache import get_cache, bump_versions
+from ..models import Category, Brand, Product, Comment
+
+
+def create_users(count):
+    return [
+        get_user_model().objects.create_user(
+            email=f"user{index}@user.com", name=f"User {index}", password="pass"
+        )
+        for index in range(count)
+    ]
+
+
+class CatalogueQueryCountTest(APITestCase):
+    """Query counts must not grow with the number of rows returned."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.users = create_users(5)
+        self.category = Category.objects.create(name="Parent")
+        Category.objects.create(name="Child", parent=self.category)
+        self.brand = Brand.objects.create(name="Brand Name")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {index}", brand=self.brand, category=self.category
+            )
+            for index in range(5)
+        ]
+        for product in self.products:
+            for user in self.users:
+                Comment.objects.create(product=product, user=user, rating=3)
+
+    def get(self, url, params=None):
+        # Drop cached responses but keep in-process maps such as category ranges.
+        bump_versions("products", *(f"product:{p.id}" for p in self.products))
+        return self.client.get(url, params)
+
+    def test_category_endpoints(self):
+        with self.assertNumQueries(1):
+            self.get(reverse("category-list"))
+        with self.assertNumQueries(1):
+            self.get(reverse("category-detail", args=[self.category.id]))
+
+    def test_brand_endpoints(self):
+        with self.assertNumQueries(1):
+            self.get(reverse("brand-list"))
+        with self.assertNumQueries(1):
+            self.get(reverse("brand-detail", args=[self.brand.id]))
+
+    def test_product_list(self):
+        with self.assertNumQueries(1):
+            res = self.get(reverse("product-list"))
+        self.assertEqual(len(res.data["results"]), 5)
+
+        params = {"category": "parent,child", "ordering": "-price"}
+        self.get(reverse("product-list"), params)
+        with self.assertNumQueries(1):
+            res = self.get(reverse("product-list"), {**params, "average_rating_min": 1})
+        self.assertEqual(len(res.data["results"]), 5)
+
+    def test_product_detail(self):
+        with self.assertNumQueries(2) as queries:
+            res = self.get(reverse("product-detail", args=[self.products[0].id]))
+        self.assertEqual(len(res.data["comments"]), 5)
+        self.assertNotIn("search_vector", queries.captured_queries[0]["sql"])
+        self.assertEqual(res.data["comments"][0]["user"], self.users[0].name)
+
+    def test_comment_endpoints(self):
+        with self.assertNumQueries(1):
+            res = self.get(reverse("comment-list"), {"page_size": 25})
+        self.assertEqual(len(res.data["results"]), 25)
+
+        comment = Comment.objects.first()
+        with self.assertNumQueries(1):
+            self.get(reverse("comment-detail", args=[comment.id]))
+
+    def test_comment_create_and_update(self):
+        user = get_user_model().objects.create_user(
+            email="new@user.com", name="New User", password="pass"
+        )
+        self.client.force_authenticate(user)
+        payload = {"product": self.products[0].id, "rating": 5, "comment_text": "Hi"}
+
+        with self.assertNumQueries(5):
+            res = self.client.post(reverse("comment-list"), payload)
+
+        with self.assertNumQueries(5):
+            self.client.patch(
+                reverse("comment-detail", args=[res.data["id"]]), {"rating": 1}
+            )
+
+    def test_product_write(self):
+        admin_user = get_user_model().objects.create_superuser(
+            email="user@admin.com", name="Admin User", password="passadminuser"
+        )
+        self.client.force_authenticate(admin_user)
+        payload = {"name": "New", "brand": self.brand.id, "category": self.category.id}
+
+        with self.assertNumQueries(3):
+            res = self.client.post(reverse("product-list"), payload)
+
+        with self.assertNumQueries(2):
+            self.client.patch(
+                reverse("product-detail", args=[res.data["id"]]), {"price": 5}
+            )
@@ -0,0 +1,124 @@
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from ..models import Brand, Product, Comment
+
+
+def create_user(email="rating@user.com"):
+    return get_user_model().objects.create_user(
+        email=email, name="Rating User", password="passratinguser"
+    )
+
+
+class RatingAggregatesTest(TestCase):
+    def setUp(self):
+        brand = Brand.objects.create(name="Brand Name")
+        self.product = Product.objects.create(name="Product", brand=brand)
+        self.other_product = Product.objects.create(name="Other", brand=brand)
+        self.user = create_user()
+        self.another_user = create_user(email="another@user.com")
+
+    def assertRatings(self, product, rating_sum, rating_count):
+        product.refresh_from_db()
+        self.assertEqual(product.rating_sum, rating_sum)
+        self.assertEqual(product.rating_count, rating_count)
+
+    def test_create_comment_updates_aggregates(self):
+        Comment.objects.create(product=self.product, user=self.user, rating=4)
+        Comment.objects.create(product=self.product, user=self.another_user, rating=3)
+
+        self.assertRatings(self.product, 7, 2)
+        self.assertEqual(self.product.average_rating, 3.5)
+        self.assertEqual(self.product.number_of_ratings, 2)
+
+    def test_update_comment_rating(self):
+        comment = Comment.objects.create(product=self.product, user=self.user, rating=4)
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.rating = 1
+        comment.save()
+        comment.rating = 2
+        comment.save()
+
+        self.assertRatings(self.product, 2, 1)
+        self.assertEqual(self.product.average_rating, 2)
+
+    def test_average_rating_is_rounded(self):
+        third_user = create_user(email="third@user.com")
+        for user, rating in [(self.user, 5), (self.another_user, 5), (third_user, 4)]:
+            Comment.objects.create(product=self.product, user=user, rating=rating)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.average_rating, Decimal("4.67"))
+
+    def test_move_comment_to_other_product(self):
+        comment = Comment.objects.create(product=self.product, user=self.user, rating=5)
+        comment.product = self.other_product
+        comment.save()
+
+        self.assertRatings(self.product, 0, 0)
+        self.assertRatings(self.other_product, 5, 1)
+
+    def test_delete_comment(self):
+        comment = Comment.objects.create(product=self.product, user=self.user, rating=4)
+        Comment.objects.create(product=self.product, user=self.another_user, rating=2)
+        comment.delete()
+
+        self.assertRatings(self.product, 2, 1)
+
+        Comment.objects.all().delete()
+        self.assertRatings(self.product, 0, 0)
+        self.assertEqual(self.product.average_rating, 0)
+
+    def test_bulk_create_and_queryset_update(self):
+        Comment.objects.bulk_create(
+            [
+                Comment(product=self.product, user=self.user, rating=5),
+                Comment(product=self.product, user=self.another_user, rating=3),
+            ]
+        )
+        self.assertRatings(self.product, 8, 2)
+
+        Comment.objects.filter(user=self.user).update(rating=1)
+        self.assertRatings(self.product, 4, 2)
+
+        Comment.objects.filter(user=self.user).update(product=self.other_product)
+        self.assertRatings(self.product, 3, 1)
+        self.assertRatings(self.other_product, 1, 1)
+        self.assertEqual(self.product.average_rating, 3)
+        self.assertEqual(self.other_product.average_rating, 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        Comment.objects.create(product=self.product, user=self.user, rating=4)
+        Product.objects.filter(pk=self.product.pk).update(
+            rating_sum=0, rating_count=9, average_rating=0
+        )
+
+        out = StringIO()
+        call_command("rebuild_product_ratings", stdout=out)
+
+        self.assertRatings(self.product, 4, 1)
+        self.assertRatings(self.other_product, 0, 0)
+        self.assertEqual(self.product.average_rating, 4)
+        self.assertIn("2 products", out.getvalue())
+
+    def test_filter_and_order_by_average_rating(self):
+        third = Product.objects.create(name="Third", brand=self.product.brand)
+        Comment.objects.create(product=self.product, user=self.user, rating=2)
+        Comment.objects.create(product=self.other_product, user=self.user, rating=5)
+        Comment.objects.create(product=third, user=self.another_user, rating=4)
+
+        url = reverse("product-list")
+        res = self.client.get(url, {"average_rating_min": 3.5})
+        self.assertEqual(
+            {product["id"] for product in res.data["results"]},
+            {self.other_product.id, third.id},
+        )
+
+        res = self.client.get(url, {"ordering": "-average_rating"})
+        self.assertEqual(
+            [product["average_rating"] for product in res.data["results"]],
+            [5.0, 4.0, 2.0],
+        )
@@ -0,0 +1,115 @@
+from rest_framework.test import APITestCase, APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from ..cache import get_cache
+from ..models import Category, Brand, Product, Comment
+
+PRODUCTS_URL = reverse("product-list")
+
+
+def detail_url(product_id):
+    return reverse("product-detail", args=[product_id])
+
+
+class ProductResponseCacheTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Phones")
+        self.brand = Brand.objects.create(name="Acme")
+        self.product = Product.objects.create(
+            name="Phone", price=100, brand=self.brand, category=self.category
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@user.com", name="testuser", password="testpassword"
+        )
+
+    def test_repeated_list_skips_database(self):
+        first = self.client.get(PRODUCTS_URL, {"name": "pho", "ordering": "price"})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(
+                PRODUCTS_URL, {"ordering": "price", "name": "pho", "unknown": "1"}
+            )
+
+        self.assertEqual(first.data, second.data)
+
+    def test_repeated_detail_skips_database(self):
+        first = self.client.get(detail_url(self.product.id))
+
+        with self.assertNumQueries(0):
+            second = self.client.get(detail_url(self.product.id))
+
+        self.assertEqual(first.data, second.data)
+
+    def test_product_change_invalidates(self):
+        self.client.get(PRODUCTS_URL)
+        self.client.get(detail_url(self.product.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = 250
+            self.product.save()
+
+        res = self.client.get(PRODUCTS_URL)
+        self.assertEqual(res.data["results"][0]["price"], "250.00")
+        res = self.client.get(detail_url(self.product.id))
+        self.assertEqual(res.data["price"], "250.00")
+
+    def test_versions_are_bumped_on_commit(self):
+        self.client.get(detail_url(self.product.id))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.product.price = 250
+            self.product.save()
+            # Until the write commits, readers keep the committed version.
+            res = self.client.get(detail_url(self.product.id))
+            self.assertEqual(res.data["price"], "100.00")
+
+        for callback in callbacks:
+            callback()
+        res = self.client.get(detail_url(self.product.id))
+        self.assertEqual(res.data["price"], "250.00")
+
+    def test_comment_change_invalidates(self):
+        self.client.get(PRODUCTS_URL)
+        self.client.get(detail_url(self.product.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(product=self.product, user=self.user, rating=4)
+
+        res = self.client.get(PRODUCTS_URL)
+        self.assertEqual(res.data["results"][0]["number_of_ratings"], 1)
+        res = self.client.get(detail_url(self.product.id))
+        self.assertEqual(len(res.data["comments"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.filter(product=self.product).update(comment_text="Edited")
+        res = self.client.get(detail_url(self.product.id))
+        self.assertEqual(res.data["comments"][0]["comment_text"], "Edited")
+
+    def test_brand_and_category_change_invalidates_filtered_list(self):
+        res = self.client.get(PRODUCTS_URL, {"brand": "acme", "category": "phones"})
+        self.assertEqual(len(res.data["results"]), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brand.name = "Other"
+            self.brand.save()
+        res = self.client.get(PRODUCTS_URL, {"brand": "acme", "category": "phones"})
+        self.assertEqual(len(res.data["results"]), 0)
+
+        res = self.client.get(PRODUCTS_URL, {"category": "phones"})
+        self.assertEqual(len(res.data["results"]), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = "Tablets"
+            self.category.save()
+        res = self.client.get(PRODUCTS_URL, {"category": "phones"})
+        self.assertEqual(len(res.data["results"]), 0)
+
+    def test_category_delete_invalidates_detail(self):
+        self.client.get(detail_url(self.product.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+
+        res = self.client.get(detail_url(self.product.id))
+        self.assertIsNone(res.data["category"])
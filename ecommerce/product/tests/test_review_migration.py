@@ -0,0 +1,62 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+BEFORE = [("product", "0011_product_rating_aggregates")]
+AFTER = [("product", "0012_catalogue_indexes")]
+
+
+class DuplicateReviewMigrationTest(TransactionTestCase):
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets[0]).apps
+
+    def setUp(self):
+        apps = self.migrate(BEFORE)
+        User = apps.get_model("user", "User")
+        Brand = apps.get_model("product", "Brand")
+        Product = apps.get_model("product", "Product")
+        self.Comment = apps.get_model("product", "Comment")
+
+        user = User.objects.create(email="user@user.com", name="User")
+        brand = Brand.objects.create(name="Brand")
+        self.product = Product.objects.create(
+            name="Phone", brand=brand, rating_sum=9, rating_count=3
+        )
+        self.reviews = [
+            self.Comment.objects.create(
+                product=self.product, user=user, rating=rating, comment_text="Hi"
+            )
+            for rating in (5, 1, 3)
+        ]
+        self.pair = f"(product {self.product.pk}, user {user.pk}: 3 reviews)"
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicates_stop_the_migration_until_removed(self):
+        with self.assertRaisesMessage(CommandError, self.pair):
+            self.migrate(AFTER)
+        self.assertEqual(self.Comment.objects.count(), 3)
+
+        out = StringIO()
+        call_command("remove_duplicate_reviews", "--dry-run", stdout=out)
+        self.assertIn("2 duplicate reviews found.", out.getvalue())
+        self.assertEqual(self.Comment.objects.count(), 3)
+
+        out = StringIO()
+        call_command("remove_duplicate_reviews", stdout=out)
+        self.assertIn(f"review {self.reviews[1].pk} ", out.getvalue())
+        self.assertEqual(
+            list(self.Comment.objects.values_list("pk", flat=True)),
+            [self.reviews[0].pk],
+        )
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (5, 1))
+
+        self.migrate(AFTER)
@@ -0,0 +1,139 @@
+from threading import Event, Thread
+from unittest import mock
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.urls import reverse
+from ..cache import get_cache
+from ..models import Category, Brand, Product
+from ..search import InvertedIndex, get_inverted_index
+
+SEARCH_URL = reverse("product-search")
+
+
+class ProductSearchTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        electronics = Category.objects.create(name="Electronics")
+        phones = Category.objects.create(name="Phones", parent=electronics)
+        acme = Brand.objects.create(name="Acme")
+        globex = Brand.objects.create(name="Globex")
+        self.phone = Product.objects.create(
+            name="Galaxy Phone",
+            description="A smartphone with a large display",
+            brand=acme,
+            category=phones,
+            price=500,
+        )
+        self.case = Product.objects.create(
+            name="Leather Case",
+            description="Protective case for your galaxy phone",
+            brand=globex,
+            category=electronics,
+            price=20,
+            in_stock=False,
+        )
+        self.lamp = Product.objects.create(
+            name="Desk Lamp", description="Warm light", brand=acme, price=30
+        )
+
+    def search(self, **params):
+        res = self.client.get(SEARCH_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["results"]
+
+    def test_name_match_ranks_above_description_match(self):
+        results = self.search(q="galaxy")
+        self.assertEqual(
+            [item["id"] for item in results], [self.phone.id, self.case.id]
+        )
+        self.assertGreater(results[0]["rank"], results[1]["rank"])
+
+    def test_prefix_matching_and_all_terms_required(self):
+        self.assertEqual(
+            [item["id"] for item in self.search(q="gal")],
+            [
+                self.phone.id,
+                self.case.id,
+            ],
+        )
+        self.assertEqual(
+            [item["id"] for item in self.search(q="galaxy leath")], [self.case.id]
+        )
+
+    def test_brand_and_category_path_are_searchable(self):
+        self.assertEqual(
+            {item["id"] for item in self.search(q="acme")},
+            {self.phone.id, self.lamp.id},
+        )
+        self.assertEqual(
+            {item["id"] for item in self.search(q="electronics")},
+            {self.phone.id, self.case.id},
+        )
+
+    def test_headline_highlights_matches(self):
+        result = self.search(q="smart")[0]
+        self.assertIn("<b>smartphone</b>", result["headline"])
+        self.assertEqual(result["name"], self.phone.name)
+
+    def test_filters_and_limit(self):
+        self.assertEqual(
+            [item["id"] for item in self.search(q="galaxy", in_stock="false")],
+            [self.case.id],
+        )
+        self.assertEqual(len(self.search(q="galaxy", limit=1)), 1)
+
+    def test_index_follows_catalogue_changes(self):
+        self.assertEqual(self.search(q="tablet"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lamp.name = "Tablet Stand"
+            self.lamp.save()
+
+        self.assertEqual(
+            [item["id"] for item in self.search(q="tablet")], [self.lamp.id]
+        )
+
+    def test_index_is_rebuilt_only_for_searchable_changes(self):
+        self.search(q="galaxy")
+        lamp = Product.objects.get(pk=self.lamp.pk)
+
+        with mock.patch(
+            "product.search.InvertedIndex.build", side_effect=InvertedIndex.build
+        ) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                lamp.price = 35
+                lamp.save()
+            self.search(q="galaxy")
+            build.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                lamp.description = "Galaxy themed"
+                lamp.save()
+            self.assertEqual(len(self.search(q="galaxy")), 3)
+            build.assert_called_once()
+
+    def test_searches_use_the_old_index_during_a_rebuild(self):
+        old = get_inverted_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lamp.name = "Tablet Stand"
+            self.lamp.save()
+        building, release = Event(), Event()
+
+        def build():
+            building.set()
+            release.wait(5)
+            return InvertedIndex([])
+
+        with mock.patch("product.search.InvertedIndex.build", side_effect=build):
+            rebuild = Thread(target=get_inverted_index)
+            rebuild.start()
+            building.wait(5)
+            # Does not wait for the build in the other thread.
+            self.assertIs(get_inverted_index(), old)
+            release.set()
+            rebuild.join(5)
+        self.assertIsNot(get_inverted_index(), old)
+
+    def test_empty_query(self):
+        self.assertEqual(self.search(q="  "), [])
@@ -0,0 +1,125 @@
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+from rest_framework.request import Request
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from ..cache import get_cache
+from ..models import Category, Brand, Product, Comment
+from ..serializers import CommentSerializer, ProductSerializer
+
+PRODUCTS_URL = reverse("product-list")
+COMMENTS_URL = reverse("comment-list")
+
+
+def detail_url(product_id):
+    return reverse("product-detail", args=[product_id])
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@user.com", name="Test User", password="pass"
+        )
+        category = Category.objects.create(name="Category")
+        brand = Brand.objects.create(name="Brand Name")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {index}",
+                description="Long description",
+                price=index * 10,
+                brand=brand,
+                category=category,
+                image="products/image.jpg" if index % 2 else None,
+            )
+            for index in range(5)
+        ]
+        for product in self.products[:3]:
+            Comment.objects.create(
+                product=product, user=self.user, rating=4, comment_text="Nice"
+            )
+
+    def get_with_sql(self, url, params=None):
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        return res, queries[0]["sql"]
+
+    def test_fast_path_matches_model_serializer(self):
+        request = Request(APIRequestFactory().get(PRODUCTS_URL))
+        products = Product.objects.order_by("id")
+        expected = ProductSerializer(
+            products, many=True, context={"request": request}
+        ).data
+        res = self.client.get(PRODUCTS_URL)
+        self.assertEqual(res.data["results"], expected)
+
+        comments = Comment.objects.order_by("-created_at", "-id")
+        expected = CommentSerializer(comments, many=True).data
+        res = self.client.get(COMMENTS_URL)
+        self.assertEqual(res.data["results"], expected)
+
+    def test_fields_narrow_output_and_columns(self):
+        res, sql = self.get_with_sql(PRODUCTS_URL, {"fields": "name,price"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"][1], {"name": "Product 1", "price": "10.00"}
+        )
+        self.assertIn('"price"', sql)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"image"', sql)
+
+    def test_renamed_source_and_file_field(self):
+        res = self.client.get(PRODUCTS_URL, {"fields": "image,number_of_ratings"})
+
+        first, second = res.data["results"][:2]
+        self.assertEqual(first, {"image": None, "number_of_ratings": 1})
+        self.assertTrue(second["image"].endswith("/products/image.jpg"))
+
+    def test_unknown_field_rejected(self):
+        res = self.client.get(PRODUCTS_URL, {"fields": "name,secret"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", str(res.data["fields"]))
+
+    def test_pagination_and_ordering_with_fields(self):
+        params = {"fields": "name", "ordering": "-price", "page_size": 2}
+        names = []
+        res = self.client.get(PRODUCTS_URL, params)
+        while True:
+            names += [item["name"] for item in res.data["results"]]
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(names, [f"Product {index}" for index in range(4, -1, -1)])
+        self.assertEqual(list(res.data["results"][0]), ["name"])
+
+    def test_fields_vary_cached_response(self):
+        self.client.get(PRODUCTS_URL, {"fields": "name"})
+        res = self.client.get(PRODUCTS_URL, {"fields": "price"})
+
+        self.assertEqual(list(res.data["results"][0]), ["price"])
+
+    def test_comment_user_field(self):
+        res, sql = self.get_with_sql(COMMENTS_URL, {"fields": "id,user"})
+
+        self.assertEqual(res.data["results"][0]["user"], "Test User")
+        self.assertNotIn('"comment_text"', sql)
+
+        res, sql = self.get_with_sql(COMMENTS_URL, {"fields": "rating"})
+        self.assertEqual(res.data["results"][0], {"rating": 4})
+        self.assertNotIn("JOIN", sql)
+
+    def test_retrieve_with_fields(self):
+        product = self.products[0]
+        with self.assertNumQueries(1):
+            res = self.client.get(detail_url(product.id), {"fields": "id,name"})
+        self.assertEqual(res.data, {"id": product.id, "name": product.name})
+
+        res = self.client.get(detail_url(product.id), {"fields": "comments"})
+        self.assertEqual(res.data["comments"][0]["comment_text"], "Nice")
@@ -0,0 +1,69 @@
+import json
+from hashlib import sha1
+from django.conf import settings
+from django.db.models import Count
+from .cache import get_cache, get_versions
+from .models import Category, Product
+
+""" Nested category tree: one ordered (tree_id, lft) query, built in linear time """
+
+TREE_KEY = "catalogue:category-tree:{}"
+
+
+def build_category_tree(depth=None, with_counts=False):
+    """
+    Return the category forest as nested dicts.
+
+    `depth` limits the number of levels returned. `product_count` covers the
+    whole subtree, so it is computed over every level even when `depth` hides
+    some of them.
+    """
+    rows = Category.objects.order_by("tree_id", "lft")
+    if depth is not None and not with_counts:
+        rows = rows.filter(level__lt=depth)
+    rows = list(rows.values("id", "name", "parent_id", "level"))
+
+    nodes = {}
+    for row in rows:
+        node = {"id": row["id"], "name": row["name"], "children": []}
+        if with_counts:
+            node["product_count"] = 0
+        nodes[row["id"]] = node
+
+    if with_counts:
+        direct = Product.objects.filter(category__isnull=False).values_list(
+            "category_id"
+        )
+        for category_id, count in direct.annotate(count=Count("id")).order_by():
+            nodes[category_id]["product_count"] = count
+        # Children come after their parent in (tree_id, lft) order, so a
+        # reverse pass rolls every count up before its parent is reached.
+        for row in reversed(rows):
+            if row["parent_id"] is not None:
+                parent = nodes[row["parent_id"]]
+                parent["product_count"] += nodes[row["id"]]["product_count"]
+
+    roots = []
+    for row in rows:
+        if depth is not None and row["level"] >= depth:
+            continue
+        node = nodes[row["id"]]
+        if row["parent_id"] is None:
+            roots.append(node)
+        else:
+            nodes[row["parent_id"]]["children"].append(node)
+    return roots
+
+
+def get_category_tree(depth=None, with_counts=False):
+    """`build_category_tree`, cached under the "categories" (and "products") version."""
+    scopes = ["categories", "products"] if with_counts else ["categories"]
+    raw = json.dumps([get_versions(*scopes), depth, with_counts])
+    key = TREE_KEY.format(sha1(raw.encode()).hexdigest())
+
+    cache = get_cache()
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_category_tree(depth, with_counts)
+        cache.set(key, tree, settings.CATALOGUE_CACHE_TIMEOUT)
+    return tree
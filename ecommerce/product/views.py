@@ -1,4 +1,8 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.db.models import Prefetch
 from .models import Category, Brand, Product, Comment
 from .serializers import (
     CategorySerializer,
@@ -9,39 +13,123 @@ from .serializers import (
 )
 from .permissions import IsAdminOrReadOnly, IsCommentUserOrReadOnly
 from .filters import ProductFilter, CommentFilter
+from .cache import VersionedCacheMixin
+from ecommerce.viewsets import (
+    AsyncReadViewSetMixin,
+    ConditionalGetMixin,
+    SparseFieldsetMixin,
+)
+from .search import search_products
+from .tree import get_category_tree
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(
+    ConditionalGetMixin, AsyncReadViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = None
+    # Inserting or moving a node shifts other nodes' tree fields in bulk.
+    stamp_fields = ("tree_id", "lft", "rght", "level")
+
+    @action(detail=False, methods=["get"])
+    def tree(self, request):
+        """/api/category/tree/?depth=&counts=true (nested categories for menus)"""
+        depth = request.query_params.get("depth")
+        if depth is not None:
+            if not depth.isdigit() or int(depth) < 1:
+                raise ValidationError({"depth": "Must be a positive integer."})
+            depth = int(depth)
+        counts = request.query_params.get("counts", "").lower() in ("1", "true")
+        return Response(get_category_tree(depth, counts))
 
 
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(ConditionalGetMixin, AsyncReadViewSetMixin, viewsets.ModelViewSet):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = None
 
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(
+    VersionedCacheMixin,
+    ConditionalGetMixin,
+    SparseFieldsetMixin,
+    AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
+    # Only search reads the tsvector.
+    queryset = Product.objects.defer("search_vector")
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = ProductFilter
-    ordering_fields = ["name", "price"]
+    ordering_fields = ["name", "price", "average_rating"]
+    ordering = ["id"]
+    sparse_field_sources = {"number_of_ratings": "rating_count"}
+    values_list_fast_path = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if self.action == "retrieve" and (fields is None or "comments" in fields):
+            comments = Comment.objects.select_related("user").order_by("created_at")
+            queryset = queryset.prefetch_related(
+                Prefetch("comments", queryset=comments)
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return ProductDetailSerializer
         return ProductSerializer
 
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """/api/products/search/?q=&limit= (accepts the ProductFilter parameters too)"""
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            limit = 20
+        queryset = DjangoFilterBackend().filter_queryset(
+            request, self.get_queryset(), self
+        )
+        results = search_products(queryset, request.query_params.get("q", ""), limit)
+
+        serializer = self.get_serializer(
+            [product for product, _, _ in results], many=True
+        )
+        data = [
+            {**item, "rank": round(rank, 4), "headline": headline}
+            for item, (_, rank, headline) in zip(self.serialize(serializer), results)
+        ]
+        return Response({"results": data})
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(
+    ConditionalGetMixin,
+    SparseFieldsetMixin,
+    AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsCommentUserOrReadOnly]
 
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = CommentFilter
+    ordering_fields = ["created_at"]
+    ordering = ["-created_at"]
+    sparse_field_sources = {"user": "user__name"}
+    values_list_fast_path = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        # `values()` rows already join the user's name.
+        if self.row_columns is None and self.action != "create":
+            if fields is None or "user" in fields:
+                queryset = queryset.select_related("user")
+        return queryset
@@ -1,10 +1,22 @@
 from django.contrib import admin
+from django.contrib.admin.forms import AdminAuthenticationForm
 from django.contrib.auth.admin import (
     UserAdmin as BaseUserAdmin,
 )
+from django.core.exceptions import ValidationError
+from .hashers import BUSY_MESSAGE
 from .models import User
 
 
+class LoginForm(AdminAuthenticationForm):
+    """Admin login that says "busy" when the hashing pool turned it away."""
+
+    def get_invalid_login_error(self):
+        if getattr(self.request, "hashing_pool_saturated", False):
+            return ValidationError(BUSY_MESSAGE, code="busy")
+        return super().get_invalid_login_error()
+
+
 class CustomUserAdmin(BaseUserAdmin):
     ordering = ["id"]
 
@@ -45,4 +57,5 @@ class CustomUserAdmin(BaseUserAdmin):
     )
 
 
+admin.site.login_form = LoginForm
 admin.site.register(User, CustomUserAdmin)
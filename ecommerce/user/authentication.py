@@ -0,0 +1,168 @@
+import copy
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+""" Token -> user lookups: per-process LRU, then the Django cache, then the database """
+
+TOKEN_KEY = "auth:token:{}"
+VERSION_KEY = "auth:token-version:{}"
+
+
+class LRUCache:
+    """A bounded, thread-safe mapping whose entries expire after `timeout` seconds."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class TokenCache:
+    """
+    Two-level token cache with hit/miss counters.
+
+    The local LRU saves unpickling the token and user from the shared cache.
+    Entries of both levels carry the token's version from the shared cache,
+    read before the database lookup; `invalidate` bumps it, so a revoked
+    token stops working in every process at once, and a copy read from the
+    database just before the revocation committed is never served.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(
+            settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_LOCAL_TIMEOUT
+        )
+        self.counter_lock = Lock()
+        self.reset_stats()
+
+    @property
+    def shared(self):
+        return caches[settings.TOKEN_CACHE_ALIAS]
+
+    @staticmethod
+    def make_keys(token_key):
+        # Raw tokens never end up in the cache backend.
+        digest = sha256(token_key.encode()).hexdigest()
+        return TOKEN_KEY.format(digest), VERSION_KEY.format(digest)
+
+    def count(self, name):
+        with self.counter_lock:
+            self.counters[name] += 1
+
+    def get_version(self, version_key):
+        version = self.shared.get(version_key)
+        if version is None:
+            # An evicted version restarts from the clock, never from a value
+            # an older entry might still carry.
+            version = time.time_ns()
+            if not self.shared.add(version_key, version, timeout=None):
+                version = self.shared.get(version_key, version)
+        return version
+
+    def get(self, token_key):
+        """Return `(token or None, version)`; pass the version on to `set`."""
+        key, version_key = self.make_keys(token_key)
+        version = self.get_version(version_key)
+        entry = self.local.get(key)
+        if entry is not None and entry[1] == version:
+            self.count("local_hits")
+            return entry[0], version
+
+        entry = self.shared.get(key)
+        if entry is not None and entry[1] == version:
+            self.count("shared_hits")
+            self.local.set(key, entry)
+            return entry[0], version
+
+        self.count("misses")
+        return None, version
+
+    def set(self, token_key, token, version):
+        key, _ = self.make_keys(token_key)
+        entry = (token, version)
+        self.shared.set(key, entry, settings.TOKEN_CACHE_TIMEOUT)
+        self.local.set(key, entry)
+
+    def invalidate(self, *token_keys):
+        """Make every cached copy of these tokens stale, in all processes."""
+        for token_key in token_keys:
+            key, version_key = self.make_keys(token_key)
+            try:
+                self.shared.incr(version_key)
+            except ValueError:
+                self.shared.set(version_key, time.time_ns(), timeout=None)
+            self.shared.delete(key)
+            self.local.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.counter_lock:
+            self.counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def stats(self):
+        with self.counter_lock:
+            stats = dict(self.counters)
+        stats["local_entries"] = len(self.local)
+        return stats
+
+
+token_cache = TokenCache()
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """`TokenAuthentication` that only reads `Token` and `User` on a cache miss."""
+
+    def authenticate_credentials(self, key):
+        token, version = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token, version)
+        elif not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        # Every request gets its own instances, so nothing a view does to
+        # `request.user` leaks into the cached copy.
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return token.user, token
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from .hashers import (
+    BUSY_MESSAGE,
+    HashingPoolSaturated,
+    get_hashing_pool,
+    verify_and_rehash,
+)
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    `ModelBackend` that hashes on the shared hashing pool.
+
+    Queries stay on the request thread; only the CPU-bound verification and
+    any rehash with the current hasher settings run on the pool.
+
+    A saturated pool fails the login with `PermissionDenied`, which
+    `authenticate()` turns into `None` rather than a 500, and marks the
+    request `hashing_pool_saturated` so callers can answer "busy" instead
+    of "wrong password".
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            return self.authenticate_on_pool(username, password)
+        except HashingPoolSaturated:
+            if request is not None:
+                request.hashing_pool_saturated = True
+            raise PermissionDenied(BUSY_MESSAGE)
+
+    def authenticate_on_pool(self, username, password):
+        pool = get_hashing_pool()
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash once anyway so unknown e-mails take as long as known ones.
+            pool.run(UserModel().set_password, password)
+            return
+
+        is_correct, new_password = pool.run(verify_and_rehash, password, user.password)
+        if new_password is not None:
+            user.password = new_password
+            user.save(update_fields=["password"])
+        if is_correct and self.user_can_authenticate(user):
+            return user
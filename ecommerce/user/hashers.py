@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from threading import BoundedSemaphore, Lock
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    ScryptPasswordHasher,
+    make_password,
+    verify_password,
+)
+
+""" Hasher costs come from settings; changing them rehashes passwords on next login """
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * n * r bytes; leave headroom above OpenSSL's
+        # 32 MiB default so larger work factors do not fail.
+        return 2 * 128 * self.work_factor * self.block_size
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+BUSY_MESSAGE = "Too many sign-ins in progress, please try again shortly."
+
+
+class HashingPoolSaturated(Exception):
+    pass
+
+
+class HashingPool:
+    """
+    Runs password hashing on a bounded thread pool.
+
+    `hashlib.scrypt` and argon2 release the GIL, so at most `max_workers`
+    hashes run at once. Calls beyond `max_workers + max_pending`, or that
+    wait longer than `timeout` seconds, raise `HashingPoolSaturated`
+    instead of tying up the request worker.
+    """
+
+    def __init__(self, max_workers, max_pending, timeout):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self.slots = BoundedSemaphore(max_workers + max_pending)
+        self.timeout = timeout
+
+    def run(self, function, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HashingPoolSaturated
+        try:
+            future = self.executor.submit(self.call, function, args)
+        except BaseException:
+            self.slots.release()
+            raise
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingPoolSaturated
+
+    def call(self, function, args):
+        try:
+            return function(*args)
+        finally:
+            self.slots.release()
+
+
+_pool = None
+_pool_lock = Lock()
+
+
+def get_hashing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HashingPool(
+                settings.PASSWORD_HASHING_WORKERS,
+                settings.PASSWORD_HASHING_MAX_PENDING,
+                settings.PASSWORD_HASHING_TIMEOUT,
+            )
+        return _pool
+
+
+def verify_and_rehash(password, encoded):
+    """Return whether `password` matches and, if the hash is outdated, a new one."""
+    is_correct, must_update = verify_password(password, encoded)
+    if is_correct and must_update:
+        return True, make_password(password)
+    return is_correct, None
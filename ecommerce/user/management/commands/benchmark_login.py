@@ -0,0 +1,57 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from user.hashers import verify_and_rehash
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    """Django command to measure password verifications per second per core."""
+
+    help = (
+        "Verify a password repeatedly on a thread pool for each configured hasher "
+        "and report logins/second overall and per worker. Database lookups are "
+        "not included."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument(
+            "--hasher",
+            action="append",
+            dest="hashers",
+            help="Hasher class path (repeatable, default: PASSWORD_HASHERS).",
+        )
+
+    def measure(self, encoded, options):
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            started = time.perf_counter()
+            futures = [
+                executor.submit(verify_and_rehash, PASSWORD, encoded)
+                for _ in range(options["logins"])
+            ]
+            for future in futures:
+                if future.result() != (True, None):
+                    raise AssertionError("Verification failed or asked for a rehash.")
+            return options["logins"] / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Workers: {options['workers']}, logins: {options['logins']}")
+        for path in options["hashers"] or settings.PASSWORD_HASHERS:
+            # The measured hasher is made the preferred one, so a correct
+            # password never triggers a rehash.
+            with override_settings(PASSWORD_HASHERS=[path]):
+                hasher = get_hasher()
+                rate = self.measure(hasher.encode(PASSWORD, hasher.salt()), options)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{hasher.algorithm}: {rate:.1f} logins/s, "
+                    f"{rate / options['workers']:.1f} per worker"
+                )
+            )
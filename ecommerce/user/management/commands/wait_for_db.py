@@ -8,28 +8,49 @@ from django.db.utils import (
 )  # Django'nun veritabanı ile ilgili bir işlem sırasında karşılaşılan bir hatayı temsil eder
 from django.core.management.base import (
     BaseCommand,
+    CommandError,
 )  # Kendi django komutlarimizi olusturmamizi saglar. Bir class'in parametresi olarak kullanilir.
 
 
 class Command(BaseCommand):
     """Django command to wait for database."""
 
+    help = "Wait for the database, retrying with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--initial-delay", type=float, default=0.5)
+        parser.add_argument("--max-delay", type=float, default=10.0)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=120.0,
+            help="Give up after this many seconds (0 waits forever).",
+        )
+
     def handle(
         self, *args, **options
     ):  # BaseCommand class'inin icine handle adinda bir func olusturulur.
         self.stdout.write(
             "Waiting for database..."
         )  # Django'nun yönetim komutlarında konsola çıktı vermek için kullanılır.
-        db_up = False
-        while db_up is False:  # db_up'in degeri false iken:
+        delay = options["initial_delay"]
+        deadline = time.monotonic() + options["timeout"]
+        while True:
             try:
                 self.check(
                     databases=["default"]
                 )  # BaseCommand sınıfının bir yöntemini çağırır. veritabanının erişilebilir olup olmadığını kontrol etmek için kullanılır.
-                db_up = True  # DB erisilir ise db_up'in degerini True yapar
+                break
             except (Psycopg2OpError, OperationalError):
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
-            self.stdout.write(
-                self.style.SUCCESS("Database available!")
-            )  # try except blogu tamalandiktan sonra yani DB erisilebilir oldugunda burayi yazdirir. style.SUCCESS yesil renkte basarili anlamina gelen bir cikti verir.
+                if options["timeout"] and time.monotonic() + delay > deadline:
+                    raise CommandError("Database unavailable, giving up.")
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:g} seconds..."
+                )
+                time.sleep(delay)
+                # Double the wait each time so a slow database is not
+                # hammered by every container starting at once.
+                delay = min(delay * 2, options["max_delay"])
+        self.stdout.write(
+            self.style.SUCCESS("Database available!")
+        )  # try except blogu tamalandiktan sonra yani DB erisilebilir oldugunda burayi yazdirir. style.SUCCESS yesil renkte basarili anlamina gelen bir cikti verir.
@@ -1,5 +1,15 @@
 from rest_framework import serializers
+from rest_framework.exceptions import Throttled
 from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth.hashers import make_password
+from .hashers import BUSY_MESSAGE, HashingPoolSaturated, get_hashing_pool
+
+
+def hash_password(password):
+    try:
+        return get_hashing_pool().run(make_password, password)
+    except HashingPoolSaturated:
+        raise Throttled(wait=1, detail=BUSY_MESSAGE)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -27,7 +37,7 @@ class UserSerializer(serializers.ModelSerializer):
         validated_data.pop("password2", None)
         password = validated_data.pop("password")
         user = self.Meta.model(**validated_data)
-        user.set_password(password)
+        user.password = hash_password(password)
         user.save()
         return user
 
@@ -38,7 +48,7 @@ class UserSerializer(serializers.ModelSerializer):
         user = super().update(instance, validated_data)
 
         if password:
-            user.set_password(password)
+            user.password = hash_password(password)
             user.save()
 
         return user
@@ -53,12 +63,15 @@ class AuthTokenSerializer(serializers.Serializer):
     def validate(self, attrs):
         email = attrs.get("email")
         password = attrs.get("password")
+        request = self.context.get("request")
 
         user = authenticate(
-            request=self.context.get("request"),
+            request=request,
             username=email,
             password=password,
         )
+        if getattr(request, "hashing_pool_saturated", False):
+            raise Throttled(wait=1, detail=BUSY_MESSAGE)
 
         if not user:
             msg = "Unable to authenticate with provided credentials"
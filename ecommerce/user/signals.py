@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, raw=False, **kwargs):
+    # Deactivation, password changes and profile edits must not be served
+    # from a cached copy of the user. Invalidating before the commit would
+    # let a concurrent request cache the old row again.
+    if raw or created:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list("key", flat=True))
+    if keys:
+        transaction.on_commit(lambda: token_cache.invalidate(*keys))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: token_cache.invalidate(key))
@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..authentication import LRUCache, TokenCache, token_cache
+
+
+class CachingTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="token@user.com",
+            name="Token User",
+            password="userpass123",
+        )
+        self.token = Token.objects.create(user=self.user)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.me_url = reverse("user:me")
+
+    def test_token_lookup_is_cached(self):
+        res = self.client.get(self.me_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.me_url)
+        self.assertEqual(res.data["email"], self.user.email)
+        self.assertEqual(
+            token_cache.stats(),
+            {"local_hits": 1, "shared_hits": 0, "misses": 1, "local_entries": 1},
+        )
+
+    def test_shared_cache_serves_other_processes(self):
+        self.client.get(self.me_url)
+        token_cache.local.clear()
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.me_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(token_cache.stats()["shared_hits"], 1)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.me_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        res = self.client.get(self.me_url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalidation_waits_for_commit(self):
+        self.client.get(self.me_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(token_cache.stats()["local_entries"], 1)
+
+        callbacks[0]()
+        res = self.client.get(self.me_url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_reaches_other_processes(self):
+        self.client.get(self.me_url)
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+
+        # Another worker's cache invalidates; this one's LRU still holds the token.
+        TokenCache().invalidate(self.token.key)
+
+        res = self.client.get(self.me_url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_refreshes_cached_user(self):
+        self.client.get(self.me_url)
+
+        payload = {
+            "name": "New Name",
+            "password": "newpassword123",
+            "password2": "newpassword123",
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.me_url, payload, format="json")
+
+        res = self.client.get(self.me_url)
+        self.assertEqual(res.data["name"], "New Name")
+        self.assertEqual(token_cache.stats()["misses"], 2)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.me_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+
+        res = self.client.get(self.me_url)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_lru_evicts_oldest_and_expires(self):
+        lru = LRUCache(max_entries=2, timeout=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3))
+
+        lru.timeout = -1
+        lru.set("d", 4)
+        self.assertIsNone(lru.get("d"))
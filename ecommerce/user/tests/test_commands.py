@@ -0,0 +1,38 @@
+from io import StringIO
+from unittest.mock import patch
+from psycopg2 import OperationalError as Psycopg2OpError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+
+@patch("user.management.commands.wait_for_db.time.sleep")
+@patch("user.management.commands.wait_for_db.Command.check")
+class WaitForDbTests(SimpleTestCase):
+    def test_database_ready(self, patched_check, patched_sleep):
+        patched_check.return_value = True
+
+        call_command("wait_for_db", stdout=StringIO())
+
+        patched_check.assert_called_once_with(databases=["default"])
+        patched_sleep.assert_not_called()
+
+    def test_backoff_doubles_up_to_max_delay(self, patched_check, patched_sleep):
+        patched_check.side_effect = (
+            [Psycopg2OpError] * 2 + [OperationalError] * 3 + [True]
+        )
+
+        call_command("wait_for_db", "--max-delay=3", stdout=StringIO())
+
+        self.assertEqual(patched_check.call_count, 6)
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.5, 1, 2, 3, 3],
+        )
+
+    def test_gives_up_after_timeout(self, patched_check, patched_sleep):
+        patched_check.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", "--timeout=0.1", stdout=StringIO())
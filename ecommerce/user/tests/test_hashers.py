@@ -0,0 +1,105 @@
+from threading import Event, Thread
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..hashers import HashingPool, HashingPoolSaturated
+
+
+@override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2**10)
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.login_url = reverse("user:login")
+        self.user = get_user_model().objects.create_user(
+            email="hash@user.com",
+            name="Hash User",
+            password="userpass123",
+        )
+
+    def login(self):
+        payload = {"email": self.user.email, "password": "userpass123"}
+        return self.client.post(self.login_url, payload, format="json")
+
+    def test_new_passwords_use_preferred_hasher(self):
+        self.assertTrue(self.user.password.startswith("scrypt$1024$"))
+
+    def test_login_rehashes_outdated_algorithm(self):
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            password=make_password("userpass123", hasher="pbkdf2_sha256")
+        )
+
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$1024$"))
+
+    def test_login_rehashes_when_cost_changes(self):
+        with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2**11):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$2048$"))
+
+    def test_failed_login_keeps_hash(self):
+        encoded = self.user.password
+        payload = {"email": self.user.email, "password": "wrongpass"}
+
+        res = self.client.post(self.login_url, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, encoded)
+
+    def test_saturated_pool_throttles_login(self):
+        pool = HashingPool(max_workers=1, max_pending=0, timeout=5)
+        pool.slots.acquire()
+
+        with mock.patch("user.backends.get_hashing_pool", return_value=pool):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_saturated_pool_fails_admin_login_gracefully(self):
+        pool = HashingPool(max_workers=1, max_pending=0, timeout=5)
+        pool.slots.acquire()
+        payload = {"username": self.user.email, "password": "userpass123"}
+
+        with mock.patch("user.backends.get_hashing_pool", return_value=pool):
+            res = self.client.post(reverse("admin:login"), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertContains(res, "Too many sign-ins in progress")
+
+
+class HashingPoolTests(TestCase):
+    def test_rejects_when_full_and_frees_slots(self):
+        pool = HashingPool(max_workers=1, max_pending=0, timeout=5)
+        started, release = Event(), Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        worker = Thread(target=pool.run, args=(block,))
+        worker.start()
+        started.wait()
+        with self.assertRaises(HashingPoolSaturated):
+            pool.run(sum, [1, 2])
+
+        release.set()
+        worker.join()
+        self.assertEqual(pool.run(sum, [1, 2]), 3)
+
+    def test_timeout_raises_saturated(self):
+        pool = HashingPool(max_workers=1, max_pending=0, timeout=0.01)
+        release = Event()
+
+        with self.assertRaises(HashingPoolSaturated):
+            pool.run(release.wait)
+        release.set()
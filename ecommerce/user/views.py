@@ -1,4 +1,5 @@
-from rest_framework import generics, permissions, authentication
+from rest_framework import generics, permissions
+from .authentication import CachingTokenAuthentication
 from .serializers import UserSerializer, AuthTokenSerializer
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
@@ -10,7 +11,7 @@ class RegisterView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachingTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):